@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+오프라인 벤치마크용 로컬 대역 서버 3종
+• FakeUDF     : /news/ 목록(쪽 나눔)·RSS + 기사 페이지 (bench/fixtures/article.html 기반, ETag 지원)
+• FakeWP      : /wp-json/wp/v2/posts·tags·media (지연·429 비율 조절)
+• FakeOpenAI  : /v1/chat/completions (요청 모양에 따라 정해진 응답, TPM 한도 흉내)
+
+각 서버는 호출 수를 (메서드, 경로 패턴)별로 센다.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import itertools
+import threading
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_RU_WORDS = ("экономика рост цены зарплата завод экспорт налог бюджет санкции граница "
+             "выборы суд закон министр армия учения пенсия банк кредит рубль курс "
+             "больница школа урожай погода дорога транспорт энергия газ нефть калий").split()
+_BY_WORDS = ["Беларусь", "Минск", "Лукашенко", "Гомель", "Брест"]
+
+
+# ────────── 공통 핸들러 ──────────
+class _Server:
+    """ThreadingHTTPServer + 호출 카운터 + 지연 주입"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls   = Counter()
+        self.lock    = threading.Lock()
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *a):
+                pass
+
+            def send(self, code, body=b"", ctype="application/json; charset=utf-8", headers=None):
+                if not isinstance(body, (bytes, str)):
+                    body = json.dumps(body, ensure_ascii=False)
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(code)
+                if code != 304:
+                    self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def body(self) -> bytes:
+                n = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(n) if n else b""
+
+            def handle_any(self, method):
+                u = urlparse(self.path)
+                q = {k: v[0] for k, v in parse_qs(u.query).items()}
+                with outer.lock:
+                    outer.calls[(method, outer.route(u.path))] += 1
+                if outer.latency:
+                    time.sleep(outer.latency)
+                outer.handle(self, method, u.path, q)
+
+            def do_GET(self):
+                self.handle_any("GET")
+
+            def do_POST(self):
+                self.handle_any("POST")
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def route(self, path: str) -> str:
+        return re.sub(r"\d+", "{id}", path)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ────────── udf.name ──────────
+class FakeUDF(_Server):
+    """
+    articles 개의 기사 (최신순 목록, page_size개씩 /news/page/N/ 로 나뉨)와 기사 페이지.
+    offtopic 비율만큼은 벨라루스 키워드가 없는 기사.
+    feed_size > 0 이면 최신 feed_size건 RSS(/news/rss.xml)와 <link rel="alternate"> 제공.
+    dup 비율만큼은 바로 앞 기사를 단어 몇 개만 바꿔 새 URL로 다시 올린 기사
+    """
+
+    def __init__(self, articles: int = 20, offtopic: float = 0.0, latency: float = 0.0,
+                 page_size: int = 0, feed_size: int = 0, dup: float = 0.0):
+        super().__init__(latency)
+        with open(os.path.join(FIXTURES, "article.html"), encoding="utf-8") as f:
+            self.template = f.read()
+        self.rnd = random.Random(42)
+        self.ratio = offtopic
+        self.page_size = page_size or articles
+        self.feed_size = feed_size
+        self.dup_ratio = dup
+        self.ids, self.offtopic, self.dups = [], set(), {}
+        self.t0 = time.time() - 86400
+        self.publish_more(articles)
+
+    def publish_more(self, n: int):
+        """새 기사 n건을 목록 맨 앞에 추가 (폭주 흉내)"""
+        start = max(self.ids, default=299999) + 1
+        new = list(range(start, start + n))
+        self.offtopic |= {i for i in new if self.rnd.random() < self.ratio}
+        for i in new:
+            if i > start and self.rnd.random() < self.dup_ratio:
+                self.dups[i] = self.dups.get(i - 1, i - 1)
+        self.ids = new[::-1] + self.ids
+
+    def route(self, path: str) -> str:
+        if path.rstrip("/") == "/news":
+            return "/news/"
+        if path.startswith("/news/page/"):
+            return "/news/page/{n}/"
+        if path.endswith(".xml"):
+            return "/news/rss.xml"
+        if path.startswith("/uploads/"):
+            return "/uploads/{img}"
+        return "/news/{article}"
+
+    def article_html(self, aid: int) -> str:
+        src = self.dups.get(aid, aid)
+        rnd = random.Random(src)
+        words = _RU_WORDS + ([] if src in self.offtopic else _BY_WORDS)
+        texts = [[rnd.choice(words) for _ in range(rnd.randint(30, 60))]
+                 for _ in range(rnd.randint(6, 12))]
+        if src != aid:                      # 재게시: 단어 3개만 바꿈
+            edit = random.Random(aid)
+            for _ in range(3):
+                t = edit.choice(texts)
+                t[edit.randrange(len(t))] = edit.choice(words)
+        paras = "".join(
+            "<p style=\"text-align: justify;\"><span>" + " ".join(t).capitalize() + ".</span></p>"
+            for t in texts)
+        title = " ".join(rnd.choice(words) for _ in range(7)).capitalize()
+        page = re.sub(r'(<h1 class="newtitle">).*?(</h1>)', lambda m: m.group(1) + title + m.group(2),
+                      self.template, count=1, flags=re.S)
+        return re.sub(r'(<div id="zooming">).*?(<p><strong>Читайте)',
+                      lambda m: m.group(1) + f'<p><img data-src="/uploads/{aid}.jpg"></p>' + paras + m.group(2),
+                      page, count=1, flags=re.S)
+
+    def listing(self, n: int) -> str:
+        ids = self.ids[(n - 1) * self.page_size:n * self.page_size]
+        links = "".join(
+            f'<div class="article1"><div class="article_title_news">'
+            f'<a href="/news/belarus/{i}-story.html?utm_source=bench">s{i}</a></div></div>'
+            for i in ids)
+        head = ('<link rel="alternate" type="application/rss+xml" href="/news/rss.xml">'
+                if self.feed_size else "")
+        return f"<html><head>{head}</head><body>{links}</body></html>"
+
+    def feed(self) -> str:
+        items = "".join(
+            f"<item><title>s{i}</title><link>{self.base}/news/belarus/{i}-story.html</link>"
+            f"<pubDate>{formatdate(self.t0 + (i - 300000) * 60, usegmt=True)}</pubDate></item>"
+            for i in self.ids[:self.feed_size])
+        return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+    def handle(self, h, method, path, q):
+        etag = '"udf-%d"' % len(self.ids)
+        if h.headers.get("If-None-Match") == etag:
+            return h.send(304)
+        if path.rstrip("/") == "/news":
+            return h.send(200, self.listing(1), "text/html; charset=utf-8", {"ETag": etag})
+        m = re.match(r"/news/page/(\d+)/?$", path)
+        if m:
+            n = int(m.group(1))
+            if (n - 1) * self.page_size >= len(self.ids):
+                return h.send(404, "", "text/html; charset=utf-8")
+            return h.send(200, self.listing(n), "text/html; charset=utf-8", {"ETag": etag})
+        if path == "/news/rss.xml" and self.feed_size:
+            return h.send(200, self.feed(), "application/rss+xml; charset=utf-8", {"ETag": etag})
+        m = re.match(r"/uploads/(\d+)\.jpg$", path)
+        if m:
+            # 네 건 중 한 건은 같은 사진(통신사 사진 재사용 흉내) → 해시 중복
+            aid = int(m.group(1))
+            seed = 0 if aid % 4 == 0 else aid
+            return h.send(200, b"\xff\xd8\xff\xe0" + random.Random(seed).randbytes(30_000),
+                          "image/jpeg", {"ETag": etag})
+        m = re.match(r"/news/\w+/(\d+)-", path)
+        if m and int(m.group(1)) in self.ids:
+            return h.send(200, self.article_html(int(m.group(1))),
+                          "text/html; charset=utf-8", {"ETag": etag})
+        h.send(404, {"code": "not_found"})
+
+
+# ────────── WordPress REST ──────────
+class FakeWP(_Server):
+    """
+    posts·tags·media·batch/v1(태그 생성만) 최소 구현. rate_429 확률로 429(Retry-After: 0) 응답.
+    batch=False면 WP 5.6 미만처럼 /batch/v1이 404
+    """
+
+    def __init__(self, latency: float = 0.0, rate_429: float = 0.0, seed_tags: int = 0,
+                 batch: bool = True):
+        super().__init__(latency)
+        self.rate_429 = rate_429
+        self.rnd      = random.Random(7)
+        self.posts    = {}
+        self.media    = {}
+        self.tags     = {i: {"id": i, "name": f"기존태그{i}"} for i in range(1, seed_tags + 1)}
+        self.next_id  = 1000
+        self.batch    = batch
+
+    def route(self, path: str) -> str:
+        return re.sub(r".*/wp-json", "", re.sub(r"/\d+", "/{id}", path))
+
+    def _page(self, h, items, q):
+        pp, page = int(q.get("per_page", 10)), int(q.get("page", 1))
+        pages = max(1, -(-len(items) // pp))
+        if page > pages:
+            return h.send(400, {"code": "rest_post_invalid_page_number"})
+        h.send(200, items[(page - 1) * pp: page * pp],
+               headers={"X-WP-Total": str(len(items)), "X-WP-TotalPages": str(pages)})
+
+    def _create_tag(self, data: dict) -> tuple[int, dict]:
+        for t in self.tags.values():
+            if t["name"] == data.get("name"):
+                return 400, {"code": "term_exists", "data": {"term_id": t["id"]}}
+        tid = max(self.tags, default=0) + 1
+        self.tags[tid] = {"id": tid, "name": data.get("name"), "slug": data.get("slug", "")}
+        return 201, self.tags[tid]
+
+    def handle(self, h, method, path, q):
+        raw  = h.body() if method == "POST" else b""
+        data = json.loads(raw or b"{}") if not path.endswith("/media") else {}
+        if self.rate_429 and self.rnd.random() < self.rate_429:
+            return h.send(429, {"code": "too_many_requests"}, headers={"Retry-After": "0"})
+        with self.lock:
+            if path.endswith("/wp/v2/posts") and method == "GET":
+                items = sorted(self.posts.values(), key=lambda p: (p["modified"], p["id"]))
+                if "search" in q:
+                    items = [p for p in items if q["search"] in p["content"]["rendered"]]
+                if "tags" in q:
+                    items = [p for p in items if int(q["tags"]) in p["tags"]][::-1]
+                if "modified_after" in q:
+                    items = [p for p in items if p["modified"] > q["modified_after"]]
+                return self._page(h, items, q)
+            if path.endswith("/wp/v2/posts") and method == "POST":
+                pid, self.next_id = self.next_id, self.next_id + 1
+                self.posts[pid] = {
+                    "id": pid, "link": f"{self.base}/?p={pid}", "slug": data.get("slug", ""),
+                    "modified": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "title": {"rendered": data.get("title", "")},
+                    "content": {"rendered": data.get("content", "")},
+                    "tags": data.get("tags", []), "meta": data.get("meta", {}),
+                    "featured_media": data.get("featured_media", 0),
+                }
+                return h.send(201, self.posts[pid])
+            m = re.search(r"/wp/v2/posts/(\d+)$", path)
+            if m and method == "GET":
+                post = self.posts.get(int(m.group(1)))
+                if not post:
+                    return h.send(404, {"code": "rest_post_invalid_id"})
+                return h.send(200, {**post, "content": {**post["content"],
+                                                        "raw": post["content"]["rendered"]}})
+            if m and method == "POST":
+                post = self.posts.get(int(m.group(1)))
+                if not post:
+                    return h.send(404, {"code": "rest_post_invalid_id"})
+                for k, v in data.items():
+                    post[k] = {"rendered": v} if k in ("title", "content") else v
+                post["modified"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+                return h.send(200, post)
+            if path.endswith("/wp/v2/media") and method == "POST":
+                mid, self.next_id = self.next_id, self.next_id + 1
+                name = re.search(r'filename="([^"]+)"', h.headers.get("Content-Disposition", ""))
+                self.media[mid] = {"id": mid, "size": len(raw),
+                                   "source_url": f"{self.base}/wp-content/uploads/{mid}-"
+                                                 f"{name.group(1) if name else 'image.jpg'}"}
+                return h.send(201, self.media[mid])
+            if path.endswith("/wp/v2/tags") and method == "GET":
+                items = sorted(self.tags.values(), key=lambda t: t["id"],
+                               reverse=q.get("order") == "desc")
+                if "search" in q:
+                    items = [t for t in items if q["search"] in t["name"]]
+                return self._page(h, items, q)
+            if path.endswith("/wp/v2/tags") and method == "POST":
+                return h.send(*self._create_tag(data))
+            if path.endswith("/batch/v1") and method == "POST" and self.batch:
+                reqs = data.get("requests", [])
+                if len(reqs) > 25:
+                    return h.send(400, {"code": "rest_batch_max_requests_exceeded"})
+                out = []
+                for r in reqs:
+                    if r.get("method") == "POST" and r.get("path") == "/wp/v2/tags":
+                        status, body = self._create_tag(r.get("body") or {})
+                    else:
+                        status, body = 400, {"code": "rest_batch_not_allowed"}
+                    out.append({"status": status, "body": body, "headers": {}})
+                return h.send(207, {"responses": out})
+        h.send(404, {"code": "rest_no_route"})
+
+
+# ────────── OpenAI chat completions ──────────
+BODY = """<h1>{title}</h1>
+<small>UDF • 2024.05.12 • 읽음 9,312</small>
+<h3>💡 본문 정리</h3>
+<p>{filler}</p>
+<h2>✍️ 편집자 주 — 이 기사, 이렇게 읽어요</h2>
+<p>{filler}</p>
+<h3>📝 개요</h3>
+<p>{filler}</p>
+[gpt_latest_data]
+<h3>💬 전문가 전망</h3>
+<p>{filler}</p>
+<ul><li><strong>Q.</strong> 앞으로 어떻게 될까요?</li><li><strong>A.</strong> 지켜봐야 해요</li></ul>
+[gpt_related_qna]
+<p>🏷️ 태그: 루카셴코,민스크,경제,제재,수출,물가</p>
+<p>출처: UDF.name 원문<br>Photo: UDF.name<br>by. LEE🌳</p>
+<p class="related"></p>"""
+
+META = {"title": "벨라루스 경제 소식이에요 📈", "tags": ["경제", "민스크", "수출", "물가", "제재"],
+        "focus_keyphrase": "벨라루스 경제 성장 전망", "seo_title": "벨라루스 경제 성장 전망",
+        "slug": "belarus-economy-outlook",
+        "meta_description": "벨라루스 정부가 올해 경제 성장률을 발표했는데, 전문가들은 제재와 물가를 근거로 "
+                            "수치의 신뢰성을 따져 보고 있어요. 앞으로의 전망과 쟁점을 정리했어요."}
+
+
+class FakeOpenAI(_Server):
+    """
+    요청 모양으로 응답 종류를 고름 (rewrite·구조화·메타·Q&A 일괄·제목 등).
+    latency는 모델별 {"gpt-4o": 초, "gpt-4o-mini": 초}.
+    tpm을 주면 모델별 분당 토큰 한도(프롬프트 글자/3 + max_tokens)를 흉내 내
+    x-ratelimit-*-tokens 헤더를 붙이고 넘치면 429
+    """
+
+    def __init__(self, latency: dict = None, short_ratio: float = 0.0, tpm: dict = None):
+        super().__init__(0.0)
+        self.model_latency = latency or {}
+        self.short_ratio   = short_ratio
+        self.rnd           = random.Random(11)
+        self.tpm           = tpm or {}
+        self.window        = {}          # 모델 → [(시각, 토큰)]
+        self.throttled     = Counter()
+        self.n_meta        = itertools.count(1)
+
+    def route(self, path: str) -> str:
+        return path
+
+    def meta(self) -> dict:
+        """부를 때마다 slug가 달라짐 (실제 GPT처럼 같은 기사도 워커마다 다른 메타 → 덮어쓰기가 보이도록)"""
+        return {**META, "slug": f"{META['slug']}-{next(self.n_meta)}"}
+
+    def reply(self, data: dict) -> str:
+        msgs   = data.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in msgs)
+        fmt    = data.get("response_format")
+        if any(m.get("role") == "assistant" for m in msgs):
+            return "<h3>💬 전문가 전망</h3>\n<p>" + "이어 쓴 전망이에요! " * 30 + "</p>"
+        if fmt and '"body"' in prompt:
+            return json.dumps({**self.meta(), "body": BODY.format(title="제목", filler="본문이에요. " * 80),
+                               "tags": ["루카셴코", "민스크", "경제", "제재", "수출", "물가"]},
+                              ensure_ascii=False)
+        if fmt and "answers" in prompt:
+            n = len(re.findall(r"^\d+\. ", prompt, re.M))
+            return json.dumps({"answers": [{"i": i, "text": "근거가 있어요. 숫자도 있죠. 전망도 밝아요!"}
+                                           for i in range(n)]}, ensure_ascii=False)
+        if fmt:
+            return json.dumps(self.meta(), ensure_ascii=False)
+        if "초점 키프레이즈" in prompt or "focus_keyphrase" in prompt:
+            return json.dumps(self.meta(), ensure_ascii=False)
+        if data.get("max_tokens", 0) >= 1000:
+            short = self.rnd.random() < self.short_ratio
+            return BODY.format(title="Лукашенко заявил", filler="본문이에요. " * (10 if short else 80))
+        return "짧은 답이 더 풍성해졌어요. 근거도 있죠. 전망도 보여요!"
+
+    def _quota(self, data: dict) -> tuple[bool, dict]:
+        """(허용 여부, x-ratelimit 헤더)"""
+        model = data.get("model")
+        limit = self.tpm.get(model)
+        if not limit:
+            return True, {}
+        cost = (sum(len(str(m.get("content", ""))) for m in data.get("messages", [])) // 3
+                + int(data.get("max_tokens") or 1000))
+        now = time.monotonic()
+        with self.lock:
+            win = [(t, n) for t, n in self.window.get(model, []) if now - t < 60]
+            used = sum(n for _, n in win)
+            ok = used + cost <= limit
+            if ok:
+                win.append((now, cost))
+                used += cost
+            else:
+                self.throttled[model] += 1
+            self.window[model] = win
+            reset = 60 - (now - win[0][0]) if win else 0
+        return ok, {"x-ratelimit-limit-tokens": str(int(limit)),
+                    "x-ratelimit-remaining-tokens": str(max(0, int(limit - used))),
+                    "x-ratelimit-reset-tokens": f"{reset:.1f}s",
+                    "x-ratelimit-remaining-requests": "1000"}
+
+    def handle(self, h, method, path, q):
+        data = json.loads(h.body() or b"{}")
+        ok, rl = self._quota(data)
+        if not ok:
+            return h.send(429, {"error": {"type": "tokens", "code": "rate_limit_exceeded"}},
+                          headers={**rl, "Retry-After": rl["x-ratelimit-reset-tokens"][:-1]})
+        delay = self.model_latency.get(data.get("model"), 0.0)
+        if delay:
+            time.sleep(delay)
+        text  = self.reply(data)
+        usage = {"prompt_tokens": sum(len(str(m.get("content", ""))) for m in data.get("messages", [])) // 3,
+                 "completion_tokens": len(text) // 2}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        h.send(200, {"id": "bench", "model": data.get("model"),
+                     "choices": [{"index": 0, "finish_reason": "stop",
+                                  "message": {"role": "assistant", "content": text}}],
+                     "usage": usage}, headers=rl)
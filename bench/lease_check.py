@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+임대 저장소 계약 검사 (leases.py의 acquire·renew·release·finish·prune)
+• 기본: SqliteLeaseStore(임시 파일)와 lease_server.py를 거친 HttpLeaseStore 둘 다
+• --store 모듈:팩토리 → LEASE_STORE로 연결할 저장소, --url → 이미 떠 있는 임대 서버
+  (prune 검사가 오래된 기록을 지우므로 시험용 저장소에만)
+• 검사: 배타적 획득·limit·순서, 연장은 소유자만, 만료 후 회수, 반납, 완료 표시 뒤 재획득 불가,
+  prune, 여러 스레드가 동시에 잡아도 겹치지 않음
+• 하나라도 어긋나면 종료 코드 1
+
+사용법:
+    python3 bench/lease_check.py
+    python3 bench/lease_check.py --store mymod:make_store
+    LEASE_TOKEN=... python3 bench/lease_check.py --url http://lease-host:8765
+"""
+
+import os
+import sys
+import time
+import uuid
+import logging
+import argparse
+import tempfile
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TTL = 0.5
+
+
+def cases(store) -> list[tuple[str, bool]]:
+    """(검사 이름, 통과 여부). 키에 실행마다 다른 접두어를 붙여 기존 기록과 겹치지 않게"""
+    p = uuid.uuid4().hex[:8]
+    k = [f"{p}-{i}" for i in range(6)]
+    out = []
+
+    def check(name: str, ok: bool):
+        out.append((name, bool(ok)))
+
+    check("빈 키는 limit까지 앞에서부터", store.acquire(k[:3], "a", 60, 2) == k[:2])
+    check("남이 가진 키는 건너뜀", store.acquire(k[:3], "b", 60) == [k[2]])
+    check("내 키는 다시 잡힘", store.acquire(k[:2], "a", 60) == k[:2])
+    check("연장은 소유자 키만", sorted(store.renew(k[:3], "a", 60)) == k[:2])
+    check("남의 키는 연장 안 됨", store.renew([k[0]], "b", 60) == [])
+
+    store.acquire([k[3]], "a", TTL)
+    time.sleep(TTL * 2)
+    check("만료된 키는 다른 워커가 회수", store.acquire([k[3]], "b", 60) == [k[3]])
+    check("회수당한 키는 연장 안 됨", store.renew([k[3]], "a", 60) == [])
+
+    store.release([k[0]], "a")
+    check("반납한 키는 바로 잡힘", store.acquire([k[0]], "b", 60) == [k[0]])
+    store.release([k[1]], "b")
+    check("남의 키는 반납 안 됨", store.acquire([k[1]], "c", 60) == [])
+
+    store.finish(k[2], "a", 7)
+    check("완료 표시(소유자 무관) 뒤 연장 안 됨", store.renew([k[2]], "b", 60) == [])
+    store.finish(k[4], "c")
+    time.sleep(TTL * 2)
+    check("완료된 키는 만료 뒤에도 못 잡음", store.acquire([k[2], k[4]], "d", 60) == [])
+
+    time.sleep(0.05)
+    check("prune이 오래된 완료 표시를 지움", store.prune(0) >= 2)
+    check("prune 뒤에는 다시 잡힘", store.acquire([k[2]], "d", 60) == [k[2]])
+
+    keys = [f"{p}-race-{i}" for i in range(60)]
+    with ThreadPoolExecutor(6) as ex:
+        got = list(ex.map(lambda w: store.acquire(keys, f"w{w}", 60, 8), range(6)))
+    flat = [x for g in got for x in g]
+    check("동시에 잡아도 겹치지 않음", len(flat) == len(set(flat)) == 6 * 8)
+
+    store.release(k + keys, "a")
+    return out
+
+
+def run(label: str, store) -> bool:
+    t = time.perf_counter()
+    res = cases(store)
+    failed = [n for n, ok in res if not ok]
+    print(f"\n■ {label}  ({time.perf_counter() - t:.1f}s)")
+    for name, ok in res:
+        print(f"  {'✅' if ok else '❌'} {name}")
+    return not failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--store", help="검사할 팩토리 (LEASE_STORE 형식 모듈:팩토리)")
+    ap.add_argument("--url", help="이미 떠 있는 임대 서버 주소 (LEASE_URL)")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s │ %(levelname)s │ %(message)s")
+
+    sys.path.insert(0, os.getcwd())             # --store 모듈은 실행한 디렉터리에서도 찾음
+    os.chdir(tempfile.mkdtemp(prefix="lease-check-"))
+    import leases
+    import lease_server
+
+    ok = True
+    if args.store:
+        mod, _, attr = args.store.partition(":")
+        ok &= run(args.store, getattr(importlib.import_module(mod), attr or "store")())
+    elif args.url:
+        ok &= run(args.url, leases.HttpLeaseStore(args.url))
+    else:
+        ok &= run("SqliteLeaseStore", leases.SqliteLeaseStore("leases.db"))
+        srv = lease_server.make_server(leases.SqliteLeaseStore("server-leases.db"), "127.0.0.1", 0, "check")
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{srv.server_address[1]}"
+        ok &= run(f"HttpLeaseStore → lease_server ({url})", leases.HttpLeaseStore(url, "check"))
+        denied = leases.HttpLeaseStore(url, "wrong")
+        try:
+            denied.acquire(["x"], "a", 60)
+            ok = False
+            print("  ❌ 잘못된 토큰이 거부되지 않음")
+        except Exception:
+            print("  ✅ 잘못된 토큰은 거부")
+        srv.shutdown()
+    print("\n" + ("모두 통과" if ok else "계약 위반 있음"))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+기사 1건당 파싱 CPU 시간 벤치마크 (네트워크 없음)
+• 백엔드별(html.parser / lxml) parse_html() + 메타용 평문 추출 비용 비교
+• before: 평문을 generate_meta()에서 다시 파싱하던 방식 / after: ParsedArticle 재사용
+
+사용법:
+    python3 bench/parse_bench.py                      # 기본 fixture, 200회
+    python3 bench/parse_bench.py -n 500 page1.html page2.html
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# udf.name.py는 import 시 환경 변수를 검사하므로 더미 값으로 채움 (네트워크는 쓰지 않음)
+for k in ("WP_USERNAME", "WP_APP_PASSWORD", "OPENAI_API_KEY"):
+    os.environ.setdefault(k, "bench")
+
+import html_doc
+from bs4 import BeautifulSoup
+
+
+def load_udf():
+    spec = importlib.util.spec_from_file_location("udf_name", os.path.join(ROOT, "udf.name.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def backends() -> list[str]:
+    out = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        out.append("lxml")
+    except ImportError:
+        print("※ lxml 미설치 → html.parser만 측정 (pip install lxml)")
+    return out
+
+
+def cpu_ms(fn, n: int) -> float:
+    t = time.process_time()
+    for _ in range(n):
+        fn()
+    return (time.process_time() - t) * 1000 / n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("pages", nargs="*",
+                    default=[os.path.join(ROOT, "bench", "fixtures", "article.html")])
+    ap.add_argument("-n", type=int, default=200, help="페이지당 반복 횟수")
+    args = ap.parse_args()
+
+    udf   = load_udf()
+    pages = [open(p, encoding="utf-8").read() for p in args.pages]
+    url   = "https://udf.name/news/belarus/280000-bench.html"
+
+    print(f"{'backend':<12} {'before ms':>10} {'after ms':>10} {'절감':>7}")
+    for backend in backends():
+        html_doc.PARSER = backend
+
+        def before():
+            # 예전 흐름: parse() 후 generate_meta()가 본문을 html.parser로 다시 파싱
+            for p in pages:
+                art = udf.parse_html(url, p)
+                BeautifulSoup(art["html"], "html.parser").get_text(" ", strip=True)
+
+        def after():
+            for p in pages:
+                art = udf.parse_html(url, p)
+                html_doc.article_text(art)
+
+        b = cpu_ms(before, args.n) / len(pages)
+        a = cpu_ms(after, args.n) / len(pages)
+        print(f"{backend:<12} {b:>10.2f} {a:>10.2f} {(1 - a / b) * 100:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+본문 렌더링(render) 골든 출력 검사 + 기사 1건당 CPU·메모리 벤치마크 (네트워크·GPT 없음)
+• bench/fixtures/render/<이름>.txt = GPT 출력, <이름>.html = 기대 본문 (골든)
+• renderer.render() 결과가 골든과 글자 단위로 같은지, 예전 BeautifulSoup 경로(legacy)와
+  DOM이 같은지 확인 → 다르면 diff 출력 후 종료 코드 1
+• before(legacy: 줄 루프 re.match + soup 파싱·직렬화) / after(renderer) 의
+  CPU ms·tracemalloc 최대 메모리 비교
+• Q&A 확장·한국어 제목은 결정적인 가짜 콜백 사용
+
+사용법:
+    python3 bench/render_bench.py              # 검사 + 벤치마크
+    python3 bench/render_bench.py --update     # 골든 다시 쓰기 (출력이 의도대로 바뀌었을 때만)
+"""
+
+import os
+import re
+import sys
+import time
+import difflib
+import argparse
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import html_doc
+import renderer
+from bs4 import BeautifulSoup
+
+CASES_DIR = os.path.join(ROOT, "bench", "fixtures", "render")
+URL = "https://udf.name/news/belarus/280000-bench.html"
+# 이름 → (대표 이미지, 구조화 모드 제목)
+CASES = {
+    "markdown_fenced": ("https://udf.name/uploads/posts/2024-05/img_0.jpg", None),
+    "crlf_entities":   ("https://udf.name/x.jpg", None),
+    "no_h1":           (None, None),
+    "structured":      ("https://udf.name/y.jpg", "구조화 모드 제목 & <기호>"),
+}
+
+
+def expand(texts: list[str]) -> dict[int, str]:
+    # 짝수 번호만 확장 (나머지는 실패해 원문 유지하는 경우)
+    return {i: f"A. 확장 {i}: {t[:12]} & 근거가 있어요. 전망도 <밝아요>!"
+            for i, t in enumerate(texts) if i % 2 == 0}
+
+
+def retitle(orig: str, context: str) -> str:
+    return f"한국어 제목 · {orig[:16]} ({len(context)}자)"
+
+
+# ────────── 예전 경로 (비교용) ──────────
+def legacy(txt: str, image: str, title: str = None) -> tuple[str, str]:
+    hidden  = f'<a href="{URL}" style="display:none">src</a>\n'
+    img_tag = f'<p><img src="{image}" alt=""></p>\n' if image else ""
+    lines = []
+    for line in txt.splitlines():
+        s = line.lstrip()
+        if s.startswith("```") or s.startswith("📰") or "소제목" in s:
+            continue
+        m = re.match(r'^(#{1,6})\s*(.*)$', s)
+        if m:
+            level = min(len(m.group(1)), 3)
+            lines.append(f"<h{level}>{m.group(2).strip()}</h{level}>")
+            continue
+        lines.append(line)
+    soup = html_doc.fragment("\n".join(lines))
+
+    thin = []
+    for li in soup.find_all("li"):
+        strong = li.find("strong")
+        if strong and strong.get_text(strip=True).startswith("A.") and \
+                len(re.findall(r"[.!?]", li.get_text())) < 2:
+            thin.append(li)
+    done = expand([li.get_text(" ", strip=True) for li in thin]) if thin else {}
+    for i, text in done.items():
+        li, strong = thin[i], thin[i].find("strong")
+        li.clear()
+        li.append(strong)
+        li.append(" ")
+        li.append(re.sub(r"^A\.\s*", "", text))
+
+    h1 = soup.find("h1")
+    if not title:
+        orig = h1.get_text(strip=True) if h1 else "원문 제목"
+        title = retitle(orig, html_doc.text_of(soup))
+    if h1:
+        h1.decompose()
+    new_h1 = soup.new_tag("h1")
+    new_h1.string = title
+    soup.insert(0, new_h1)
+    if img_tag:
+        img = soup.find("img")
+        if img and not img.find_next_sibling("em"):
+            cap = soup.new_tag("em")
+            cap.string = "Photo: UDF.name"
+            img.insert_after(cap)
+    return title, hidden + img_tag + str(soup)
+
+
+def current(txt: str, image: str, title: str = None) -> tuple[str, str]:
+    return renderer.render(txt, url=URL, image=image, fallback_title="원문 제목", title=title,
+                           expand=expand, retitle=retitle)
+
+
+# ────────── 검사 ──────────
+def dom(html: str) -> str:
+    return BeautifulSoup(html, "html.parser").decode()
+
+
+def check(inputs: dict, update: bool) -> bool:
+    ok = True
+    for name, (image, title) in CASES.items():
+        got_title, got = current(inputs[name], image, title)
+        old_title, old = legacy(inputs[name], image, title)
+        path = os.path.join(CASES_DIR, name + ".html")
+        if update:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(got)
+        with open(path, encoding="utf-8") as f:
+            golden = f.read()
+        problems = []
+        if got != golden:
+            problems.append("골든과 다름:\n" + "".join(difflib.unified_diff(
+                golden.splitlines(True), got.splitlines(True), "golden", "renderer")))
+        if got_title != old_title or dom(got) != dom(old):
+            problems.append("legacy와 DOM 다름:\n" + "".join(difflib.unified_diff(
+                dom(old).splitlines(True), dom(got).splitlines(True), "legacy", "renderer")))
+        print(f"  {'✅' if not problems else '❌'} {name}")
+        for p in problems:
+            print(p)
+        ok &= not problems
+    return ok
+
+
+# ────────── 벤치마크 ──────────
+def measure(fn, inputs: dict, n: int) -> tuple[float, float]:
+    """(기사당 CPU ms, 케이스 중 최대 메모리 KB)"""
+    t = time.process_time()
+    for _ in range(n):
+        for name, (image, title) in CASES.items():
+            fn(inputs[name], image, title)
+    cpu = (time.process_time() - t) * 1000 / (n * len(CASES))
+
+    peak = 0
+    for name, (image, title) in CASES.items():
+        tracemalloc.start()
+        fn(inputs[name], image, title)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return cpu, peak / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=200, help="케이스당 반복 횟수")
+    ap.add_argument("--update", action="store_true", help="골든 파일 다시 쓰기")
+    args = ap.parse_args()
+
+    inputs = {}
+    for name in CASES:
+        with open(os.path.join(CASES_DIR, name + ".txt"), encoding="utf-8", newline="") as f:
+            inputs[name] = f.read()
+
+    print("골든 출력 검사:")
+    if not check(inputs, args.update):
+        sys.exit(1)
+
+    b = measure(legacy, inputs, args.n)
+    a = measure(current, inputs, args.n)
+    print(f"\n{'':<8} {'CPU ms':>9} {'peak KB':>9}")
+    print(f"{'before':<8} {b[0]:>9.3f} {b[1]:>9.1f}")
+    print(f"{'after':<8} {a[0]:>9.3f} {a[1]:>9.1f}")
+    print(f"{'절감':<8} {(1 - a[0] / b[0]) * 100:>8.1f}% {(1 - a[1] / b[1]) * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
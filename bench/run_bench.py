@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+main() 처리량 오프라인 벤치마크 (운영 belatri.info·유료 API 호출 없음)
+• bench/fake_servers.py 의 udf.name · WordPress · OpenAI 대역 서버를 띄우고
+  환경 변수로 udf.name.py를 그쪽에 연결한 뒤 main()을 그대로 실행
+• 보고: 분당 게시 기사 수, 단계별 지연 백분위(p50/p90/p99), 기사당 HTTP 호출 수
+
+사용법:
+    python3 bench/run_bench.py                       # 기사 20건, 기본 지연
+    python3 bench/run_bench.py -n 50 --gpt4o-latency 3 --wp-429 0.05 --rerun
+    python3 bench/run_bench.py -n 30 --page-size 10 --feed-size 10 --rerun --burst 25   # 폭주 보충
+    GPT_STRUCTURED=1 python3 bench/run_bench.py --json result.json
+    python3 bench/run_bench.py -n 30 --workers 3 --kill 1     # 같은 호스트의 워커 여러 개 (임대 파일 공유)
+    python3 bench/run_bench.py -n 30 --workers 3 --kill 1 --lease-server   # 임대 서버 경유 (여러 호스트 구성)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import signal
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+import functools
+import importlib.util
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from fake_servers import FakeUDF, FakeWP, FakeOpenAI
+import metrics
+import ratelimit
+
+# 단계별 시간을 재는 udf.name.py 함수들 (모듈 전역을 감싸므로 내부 호출도 측정됨)
+STAGES = ["fetch_links", "parse", "rewrite", "render", "ensure_depth", "korean_title",
+          "generate_meta", "tag_id", "publish", "push_meta"]
+
+
+def percentile(xs: list[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    k = (len(xs) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+def load_udf(timings: dict):
+    spec = importlib.util.spec_from_file_location(
+        "udf_name", os.path.join(os.path.dirname(ROOT), "udf.name.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+
+    def timed(name, fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            t = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                timings[name].append(time.perf_counter() - t)
+        return wrapper
+
+    for name in STAGES:
+        if hasattr(mod, name):
+            setattr(mod, name, timed(name, getattr(mod, name)))
+    return mod
+
+
+def report(title: str, elapsed: float, published: int, timings: dict, servers: dict) -> dict:
+    per_min = published / elapsed * 60 if elapsed else 0.0
+    print(f"\n── {title} ──")
+    print(f"게시 {published}건 / {elapsed:.2f}s → {per_min:.1f} 기사/분")
+    print(f"{'stage':<14} {'n':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    stages = {}
+    for name in STAGES:
+        xs = timings.get(name, [])
+        if not xs:
+            continue
+        row = {"n": len(xs), **{f"p{p}": percentile(xs, p) * 1000 for p in (50, 90, 99)}}
+        stages[name] = row
+        print(f"{name:<14} {row['n']:>4} {row['p50']:>9.1f} {row['p90']:>9.1f} {row['p99']:>9.1f}")
+
+    calls = {}
+    print("HTTP 호출 (기사당):")
+    for host, srv in servers.items():
+        total = sum(srv.calls.values())
+        calls[host] = {f"{m} {r}": n for (m, r), n in sorted(srv.calls.items())}
+        per = total / published if published else float(total)
+        print(f"  {host:<7} 총 {total:>4}  기사당 {per:>6.2f}")
+        for (m, r), n in sorted(srv.calls.items()):
+            print(f"      {m:<4} {r:<34} {n:>4}")
+
+    # 토큰은 metrics span 누계 (중첩 span은 바깥 단계에도 합산되므로 compose가 기사 전체)
+    tokens = {}
+    print("GPT 토큰 (프롬프트/완성):")
+    for name, v in sorted(metrics.snapshot()["stages"].items()):
+        if v.get("prompt_tokens") or v.get("completion_tokens"):
+            tokens[name] = {"prompt": int(v["prompt_tokens"]), "completion": int(v["completion_tokens"])}
+            print(f"  {name:<14} {tokens[name]['prompt']:>8} / {tokens[name]['completion']:<8}")
+    throttled = {k: v for k, v in metrics.snapshot()["counters"].items() if k.startswith("throttled")}
+    if throttled or servers["openai"].throttled:
+        print("스로틀: 서버 429", dict(servers["openai"].throttled), "/ limiter 감속", throttled)
+    limiters = ratelimit.snapshot()
+    if limiters:
+        print("limiter 상태 (동시 요청 상한 · 진행 중 · TPM·사용 비율):")
+        for name, st in sorted(limiters.items()):
+            print(f"  {name:<28} " + "  ".join(f"{k}={v}" for k, v in st.items()))
+    return {"published": published, "elapsed_s": elapsed, "articles_per_min": per_min,
+            "stages_ms": stages, "http_calls": calls, "tokens": tokens, "throttled": throttled,
+            "limiters": limiters}
+
+
+def run_workers(n: int, kill: int, ttl: float, verbose: bool, wp_srv, kill_after: float = 0.0,
+                lease_url: str = None) -> tuple[float, dict]:
+    """
+    udf.name.py를 별도 프로세스 n개로 동시에 실행 (각자 작업 디렉터리·state.db, 임대 파일 또는 lease_url 임대 서버만 공유).
+    kill개는 처리 도중 SIGKILL → 임대 만료 후 나머지 워커가 회수하는지 다시 한 바퀴 돌려 확인,
+    마지막으로 죽었던 워커를 같은 state.db로 두 번 재시작 → 남은 체크포인트가 다른 워커의 글을 덮어쓰지 않는지 확인
+    """
+    shared = os.path.abspath("leases.db")
+    script = os.path.join(os.path.dirname(ROOT), "udf.name.py")
+    out = None if verbose else subprocess.DEVNULL
+
+    def spawn(i: int) -> subprocess.Popen:
+        cwd = os.path.abspath(f"worker-{i}")
+        os.makedirs(cwd, exist_ok=True)
+        env = {**os.environ, "LEASE_TTL_SECONDS": str(ttl), "WORKER_ID": f"w{i}"}
+        env.update({"LEASE_URL": lease_url, "LEASE_TOKEN": "bench"} if lease_url else {"LEASE_DB": shared})
+        return subprocess.Popen([sys.executable, script], cwd=cwd, env=env, stdout=out, stderr=out)
+
+    def snapshot() -> dict:
+        return {pid: (p.get("slug"), p["title"]["rendered"]) for pid, p in wp_srv.posts.items()}
+
+    t = time.perf_counter()
+    procs = [spawn(i) for i in range(n)]
+    if kill:
+        time.sleep(kill_after or ttl / 3)
+        for p in procs[:kill]:
+            p.send_signal(signal.SIGKILL)
+    for p in procs:
+        p.wait()
+    restart = {}
+    if kill:
+        time.sleep(ttl)                 # 죽은 워커의 임대가 만료될 때까지
+        for p in [spawn(i) for i in range(kill, n)]:
+            p.wait()
+        pending = 0
+        for i in range(kill):
+            db = os.path.join(f"worker-{i}", "state.db")
+            if not os.path.exists(db):
+                continue
+            with sqlite3.connect(db) as c:
+                pending += c.execute("SELECT COUNT(*) FROM articles WHERE stage != 'done'").fetchone()[0]
+        before = snapshot()
+        for _ in range(2):              # 첫 실행이 바로잡은 체크포인트를 다음 실행의 메타 재시도가 처리
+            for p in [spawn(i) for i in range(kill)]:
+                p.wait()
+        after = snapshot()
+        changed = sorted(pid for pid in before if after.get(pid) != before[pid])
+        restart = {"pending_checkpoints": pending, "changed_posts": changed,
+                   "new_posts": len(after) - len(before)}
+    return time.perf_counter() - t, restart
+
+
+def duplicates(wp_srv) -> int:
+    """같은 원문 URL로 두 번 이상 게시된 글 수"""
+    srcs = [re.search(r'<a href="([^"]+)" style="display:none">', p["content"]["rendered"])
+            for p in wp_srv.posts.values()]
+    srcs = [m.group(1) for m in srcs if m]
+    return len(srcs) - len(set(srcs))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", "--articles", type=int, default=20, help="목록에 올릴 기사 수")
+    ap.add_argument("--offtopic", type=float, default=0.0, help="벨라루스 무관 기사 비율")
+    ap.add_argument("--dup", type=float, default=0.0, help="앞 기사를 거의 그대로 다시 올린 기사 비율")
+    ap.add_argument("--udf-latency", type=float, default=0.02, help="udf.name 응답 지연(초)")
+    ap.add_argument("--wp-latency", type=float, default=0.05, help="WP REST 응답 지연(초)")
+    ap.add_argument("--wp-429", type=float, default=0.0, help="WP 429 응답 확률")
+    ap.add_argument("--gpt4o-latency", type=float, default=1.0, help="gpt-4o 응답 지연(초)")
+    ap.add_argument("--mini-latency", type=float, default=0.3, help="gpt-4o-mini 응답 지연(초)")
+    ap.add_argument("--tpm", default="", help='OpenAI 분당 토큰 한도 흉내 ("gpt-4o=40000,gpt-4o-mini=200000")')
+    ap.add_argument("--short", type=float, default=0.0, help="rewrite가 짧게 나올 확률")
+    ap.add_argument("--seed-tags", type=int, default=0, help="WP에 미리 있는 태그 수")
+    ap.add_argument("--page-size", type=int, default=0, help="목록 한 쪽당 기사 수 (0: 한 쪽에 전부)")
+    ap.add_argument("--feed-size", type=int, default=0, help="RSS 항목 수 (0: 피드 없음 → 스크래핑)")
+    ap.add_argument("--rerun", action="store_true", help="두 번째 실행(새 기사 없음)도 측정")
+    ap.add_argument("--burst", type=int, default=0, help="두 번째 실행 전에 새로 올라올 기사 수")
+    ap.add_argument("--workers", type=int, default=1, help="동시에 돌릴 워커 프로세스 수 (2 이상이면 별도 프로세스)")
+    ap.add_argument("--kill", type=int, default=0, help="처리 도중 강제 종료할 워커 수 (--workers와 함께)")
+    ap.add_argument("--kill-after", type=float, default=0.0,
+                    help="시작 후 강제 종료까지 초 (기본 TTL/3, 체크포인트가 쌓인 뒤 죽이려면 늘림)")
+    ap.add_argument("--lease-server", action="store_true",
+                    help="워커가 임대 파일 대신 lease_server.py(HTTP)로 임대 (여러 호스트 구성)")
+    ap.add_argument("--lease-ttl", type=float, default=3.0, help="워커 모드 임대 TTL(초)")
+    ap.add_argument("--json", help="결과를 JSON 파일로 저장")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        stream=sys.stdout, format="%(asctime)s │ %(levelname)s │ %(message)s")
+
+    udf_srv = FakeUDF(args.articles, args.offtopic, args.udf_latency, args.page_size, args.feed_size,
+                      args.dup)
+    wp_srv  = FakeWP(args.wp_latency, args.wp_429, args.seed_tags)
+    tpm     = {k.strip(): float(v) for k, _, v in (x.partition("=") for x in args.tpm.split(",") if "=" in x)}
+    ai_srv  = FakeOpenAI({"gpt-4o": args.gpt4o_latency, "gpt-4o-mini": args.mini_latency}, args.short, tpm)
+    servers = {"udf": udf_srv, "wp": wp_srv, "openai": ai_srv}
+
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    # 상태 파일(state.db·캐시)은 임시 디렉터리에, 모든 엔드포인트는 대역 서버로
+    os.chdir(tempfile.mkdtemp(prefix="udf-bench-"))
+    os.environ.update({
+        "WP_URL":             wp_srv.base,
+        "UDF_BASE":           udf_srv.base + "/news/",
+        "OPENAI_API_URL":     ai_srv.base + "/v1/chat/completions",
+        "WP_USERNAME":        "bench",
+        "WP_APP_PASSWORD":    "bench",
+        "OPENAI_API_KEY":     "bench",
+        "HTTP_BACKOFF":       os.getenv("HTTP_BACKOFF", "0.05"),
+        "HTTP_HOST_INTERVAL": os.getenv("HTTP_HOST_INTERVAL", ""),
+    })
+
+    results = {"args": vars(args)}
+    if args.workers > 1:
+        lease_url = None
+        if args.lease_server:
+            # 벤치 프로세스 안에서 띄운 임대 서버 (같은 leases.db 파일 → 아래 워커별 집계는 그대로)
+            import leases
+            import lease_server
+            lsrv = lease_server.make_server(leases.SqliteLeaseStore("leases.db"), "127.0.0.1", 0, "bench")
+            threading.Thread(target=lsrv.serve_forever, daemon=True).start()
+            lease_url = f"http://127.0.0.1:{lsrv.server_address[1]}"
+        elapsed, restart = run_workers(args.workers, args.kill, args.lease_ttl, args.verbose, wp_srv,
+                                       args.kill_after, lease_url)
+        published = len(wp_srv.posts)
+        results["workers"] = report(f"워커 {args.workers}개 (강제 종료 {args.kill})", elapsed, published,
+                                    {}, servers)
+        results["workers"]["duplicates"] = duplicates(wp_srv)
+        with sqlite3.connect("leases.db") as c:
+            split = dict(c.execute("SELECT owner, COUNT(*) FROM leases WHERE post_id IS NOT NULL "
+                                   "GROUP BY owner ORDER BY owner").fetchall())
+        results["workers"]["by_worker"] = split
+        print(f"워커별 게시(임대 완료 표시): {split}")
+        print(f"원문 {len(wp_srv.posts) - results['workers']['duplicates']}건 / 중복 게시 "
+              f"{results['workers']['duplicates']}건")
+        if restart:
+            results["workers"]["restart"] = restart
+            changed = restart["changed_posts"]
+            print(f"죽은 워커 재시작: 남아 있던 체크포인트 {restart['pending_checkpoints']}건 → "
+                  f"slug·제목이 바뀐 글 {len(changed)}건{f' {changed}' if changed else ''}"
+                  f" / 새 글 {restart['new_posts']}건")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+        for srv in servers.values():
+            srv.close()
+        return
+
+    timings = defaultdict(list)
+    udf = load_udf(timings)
+
+    t = time.perf_counter()
+    udf.main()
+    elapsed = time.perf_counter() - t
+    published = len(wp_srv.posts)
+    results["cold"] = report("1차 실행 (새 기사)", elapsed, published, timings, servers)
+
+    if args.rerun:
+        for srv in servers.values():
+            srv.calls.clear()
+        timings.clear()
+        metrics.reset()
+        udf_srv.publish_more(args.burst)
+        before = len(wp_srv.posts)
+        t = time.perf_counter()
+        udf.main()
+        published = len(wp_srv.posts) - before   # 429로 거절된 POST는 빼고 실제 만들어진 글만
+        title = f"2차 실행 (새 기사 {args.burst}건)" if args.burst else "2차 실행 (새 기사 없음)"
+        results["warm"] = report(title, time.perf_counter() - t, published, timings, servers)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    for srv in servers.values():
+        srv.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+기사별 단계 체크포인트 (state.db articles 테이블)
+• 단계: parsed → rewritten → tagged → posted → done(Yoast 메타까지 완료)
+• 단계마다 산출물(원문·GPT 결과·태그 ID·post id)을 누적 저장 → 재시작 시 마지막 완료 단계 다음부터
+  (게시 후 죽어도 다시 게시하지 않고, GPT 결과가 있으면 다시 부르지 않음)
+• 실패는 (단계, 오류, 시도 횟수)로 기록 → --retry 로 실패한 단계만 다시
+"""
+
+import os
+import json
+import time
+import zlib
+import logging
+import state_store
+
+# ────────── 환경 변수 ──────────
+MAX_ATTEMPTS = int(os.getenv("CHECKPOINT_MAX_ATTEMPTS", "5"))     # 자동 재개 상한
+KEEP_DAYS    = float(os.getenv("CHECKPOINT_KEEP_DAYS", "14"))      # 완료 기록 보관 기간
+
+STAGES = ("parsed", "rewritten", "tagged", "posted", "done")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url        TEXT PRIMARY KEY,
+    stage      TEXT,
+    data       BLOB,
+    post_id    INTEGER,
+    failed     TEXT,
+    error      TEXT,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_stage ON articles(stage);
+"""
+
+
+def _conn():
+    state_store.ensure_schema(_SCHEMA)
+    return state_store.conn()
+
+
+def _pack(data: dict) -> bytes:
+    return zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(blob) -> dict:
+    return json.loads(zlib.decompress(blob)) if blob else {}
+
+
+def reached(rec: dict | None, stage: str) -> bool:
+    """rec가 stage 이상까지 끝났는지"""
+    return bool(rec and rec["stage"] in STAGES and STAGES.index(rec["stage"]) >= STAGES.index(stage))
+
+
+# ────────── 읽기 ──────────
+def load(url: str) -> dict | None:
+    """{"stage", "data", "post_id", "failed", "error", "attempts"} 또는 None"""
+    row = _conn().execute(
+        "SELECT stage, data, post_id, failed, error, attempts FROM articles WHERE url=?",
+        (url,)).fetchone()
+    if not row:
+        return None
+    return {"stage": row[0], "data": _unpack(row[1]), "post_id": row[2],
+            "failed": row[3], "error": row[4], "attempts": row[5]}
+
+
+def pending(failed: str = None, limit_attempts: bool = True) -> list[tuple[str, str | None]]:
+    """
+    아직 done이 아닌 (URL, 마지막 완료 단계) 목록 (오래된 순).
+    failed를 주면 그 단계에서 실패한 것만, limit_attempts면 MAX_ATTEMPTS 넘은 것 제외
+    """
+    sql, args = "SELECT url, stage FROM articles WHERE COALESCE(stage, '') != 'done'", []
+    if failed:
+        sql += " AND failed=?"
+        args.append(failed)
+    if limit_attempts:
+        sql += " AND attempts < ?"
+        args.append(MAX_ATTEMPTS)
+    return [(r[0], r[1]) for r in _conn().execute(sql + " ORDER BY updated_at", args)]
+
+
+def gave_up(url: str) -> bool:
+    """자동 재시도 상한(MAX_ATTEMPTS)을 넘긴 기사 → --retry 로만 다시"""
+    row = _conn().execute(
+        "SELECT attempts FROM articles WHERE url=? AND COALESCE(stage, '') != 'done'",
+        (url,)).fetchone()
+    return bool(row and row[0] >= MAX_ATTEMPTS)
+
+
+def summary() -> dict:
+    """단계별·실패 단계별 건수"""
+    out = {}
+    for stage, failed, n in _conn().execute(
+            "SELECT COALESCE(stage, '-'), COALESCE(failed, ''), COUNT(*) FROM articles GROUP BY 1, 2"):
+        out[f"{stage}" + (f" (실패: {failed})" if failed else "")] = n
+    return out
+
+
+# ────────── 쓰기 ──────────
+def save(url: str, stage: str, post_id: int = None, **data):
+    """stage 완료 기록 + 산출물 누적 (실패 표시·시도 횟수는 지움)"""
+    with state_store.tx() as c:
+        row = c.execute("SELECT data FROM articles WHERE url=?", (url,)).fetchone()
+        merged = {**(_unpack(row[0]) if row else {}), **data}
+        c.execute(
+            "INSERT INTO articles(url, stage, data, post_id, updated_at) VALUES(?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET stage=excluded.stage, data=excluded.data, "
+            "  post_id=COALESCE(excluded.post_id, post_id), failed=NULL, error=NULL, attempts=0, "
+            "  updated_at=excluded.updated_at",
+            (url, stage, _pack(merged), post_id, time.time()))
+
+
+def attach(url: str, **data):
+    """단계는 그대로 두고 산출물만 추가 (예: 업로드한 이미지)"""
+    with state_store.tx() as c:
+        row = c.execute("SELECT data FROM articles WHERE url=?", (url,)).fetchone()
+        if row is None:
+            return
+        c.execute("UPDATE articles SET data=? WHERE url=?",
+                  (_pack({**_unpack(row[0]), **data}), url))
+
+
+def fail(url: str, step: str, error):
+    """step(rewrite·publish·meta 등) 실패 기록, 시도 횟수 +1"""
+    _conn().execute(
+        "INSERT INTO articles(url, failed, error, attempts, updated_at) VALUES(?, ?, ?, 1, ?) "
+        "ON CONFLICT(url) DO UPDATE SET failed=excluded.failed, error=excluded.error, "
+        "  attempts=attempts+1, updated_at=excluded.updated_at",
+        (url, step, str(error)[:500], time.time()))
+
+
+def drop(url: str):
+    """이 워커의 기록 삭제 (예: 임대를 잃어 다른 워커가 맡은 기사 → 나중에 이어서 처리하지 않도록)"""
+    _conn().execute("DELETE FROM articles WHERE url=?", (url,))
+
+
+def reset_attempts(urls: list[str]):
+    with state_store.tx() as c:
+        c.executemany("UPDATE articles SET attempts=0 WHERE url=?", [(u,) for u in urls])
+
+
+def prune():
+    """KEEP_DAYS 지난 완료 기록 정리"""
+    cur = _conn().execute("DELETE FROM articles WHERE stage='done' AND updated_at < ?",
+                          (time.time() - KEEP_DAYS * 86400,))
+    if cur.rowcount:
+        logging.debug("🧹 완료 체크포인트 %d건 정리", cur.rowcount)
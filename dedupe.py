@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+거의 같은 기사(재게시·업데이트·통신사 중복) 찾기 — GPT 호출 전
+• parse()가 본문 평문의 64비트 SimHash(단어 3-gram)를 계산
+• state.db fingerprints 테이블 + 밴드 LSH(해밍 거리 ≤ MAX_DISTANCE면 적어도 한 밴드가 같음)
+  → 후보만 꺼내 거리 확인, 전체 비교 없음
+• 이미 게시된 글(post_id 있음) 또는 이번 실행에서 먼저 처리 중인 글과 가까우면 중복
+• 중복으로 판정된 URL도 기록 → 다음 실행 목록에서 바로 제외
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+import state_store
+
+# ────────── 환경 변수 ──────────
+MAX_DISTANCE = int(os.getenv("DEDUPE_MAX_DISTANCE", "6"))     # 64비트 중 다른 비트 수 상한
+MIN_WORDS    = int(os.getenv("DEDUPE_MIN_WORDS", "40"))       # 이보다 짧은 본문은 지문 없음
+KEEP_DAYS    = float(os.getenv("DEDUPE_KEEP_DAYS", "30"))
+MODE         = os.getenv("DEDUPE_MODE", "skip")               # skip | update | off
+
+BITS  = 64
+BANDS = MAX_DISTANCE + 1        # 비둘기집: 다른 비트가 MAX_DISTANCE개면 적어도 한 밴드는 그대로
+_EDGES = [BITS * i // BANDS for i in range(BANDS + 1)]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url        TEXT PRIMARY KEY,
+    simhash    INTEGER NOT NULL,
+    post_id    INTEGER,
+    dup_of     TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprint_bands (
+    band INTEGER NOT NULL,
+    key  INTEGER NOT NULL,
+    url  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprint_bands_key ON fingerprint_bands(band, key);
+CREATE INDEX IF NOT EXISTS fingerprint_bands_url ON fingerprint_bands(url);
+"""
+
+_WORD_RE = re.compile(r"\w+")
+_claims  = {}                   # 이번 실행에서 처리 중인 url → simhash (아직 post_id 없음)
+_lock    = threading.Lock()
+
+
+# ────────── 지문 ──────────
+def simhash(text: str) -> int | None:
+    """평문 → 64비트 SimHash (단어가 MIN_WORDS 미만이면 None)"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    n = len(words) - 2
+    # 3-gram 해시를 "0101…" 64자씩 이어 붙여 비트 자리별로 1 개수를 셈 (자리별 슬라이스 → C 속도)
+    rows = "".join(format(int.from_bytes(hashlib.blake2b(" ".join(words[i:i + 3]).encode("utf-8"),
+                                                         digest_size=8).digest(), "big"), "064b")
+                   for i in range(n)).encode("ascii")
+    fp = 0
+    for b in range(BITS):
+        if rows[b::BITS].count(b"1") * 2 > n:
+            fp |= 1 << (BITS - 1 - b)
+    return fp
+
+
+def distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _bands(fp: int) -> list[tuple[int, int]]:
+    return [(i, fp >> lo & ((1 << (hi - lo)) - 1)) for i, (lo, hi) in enumerate(zip(_EDGES, _EDGES[1:]))]
+
+
+def _signed(fp: int) -> int:            # SQLite INTEGER는 부호 있는 64비트
+    return fp - (1 << BITS) if fp >= 1 << (BITS - 1) else fp
+
+
+def _unsigned(v: int) -> int:
+    return v + (1 << BITS) if v < 0 else v
+
+
+# ────────── 인덱스 ──────────
+def _conn():
+    state_store.ensure_schema(_SCHEMA)
+    return state_store.conn()
+
+
+def _candidates(fp: int) -> list[tuple[str, int, int | None]]:
+    """밴드가 하나라도 같은 (url, simhash, post_id)"""
+    c = _conn()
+    out = {}
+    for band, key in _bands(fp):
+        for url, h, pid in c.execute(
+                "SELECT f.url, f.simhash, f.post_id FROM fingerprint_bands b "
+                "JOIN fingerprints f USING(url) WHERE b.band=? AND b.key=? AND f.dup_of IS NULL",
+                (band, key)):
+            out[url] = (url, _unsigned(h), pid)
+    return list(out.values())
+
+
+def _store(url: str, fp: int, post_id: int = None, dup_of: str = None):
+    _conn()
+    with state_store.tx() as c:
+        c.execute("INSERT OR REPLACE INTO fingerprints(url, simhash, post_id, dup_of, created_at) "
+                  "VALUES(?, ?, ?, ?, ?)", (url, _signed(fp), post_id, dup_of, time.time()))
+        c.execute("DELETE FROM fingerprint_bands WHERE url=?", (url,))
+        if dup_of is None:
+            c.executemany("INSERT INTO fingerprint_bands(band, key, url) VALUES(?, ?, ?)",
+                          [(b, k, url) for b, k in _bands(fp)])
+
+
+def known_duplicate(url: str) -> bool:
+    """이전 실행에서 중복으로 판정한 URL"""
+    row = _conn().execute("SELECT dup_of FROM fingerprints WHERE url=?", (url,)).fetchone()
+    return bool(row and row[0])
+
+
+def claim(url: str, fp: int | None) -> dict | None:
+    """
+    url이 이미 게시된 글·이번 실행에서 먼저 잡은 글과 가까운지 확인.
+    가까우면 {"url", "post_id", "distance"} (중복 기록), 아니면 None (이번 실행 동안 선점)
+    """
+    if fp is None or MODE == "off":
+        return None
+    with _lock:
+        best = None
+        near = [(u, h, pid) for u, h, pid in _candidates(fp) if pid] + \
+               [(u, h, None) for u, h in _claims.items()]
+        for u, h, pid in near:
+            d = distance(fp, h)
+            if u != url and d <= MAX_DISTANCE and (best is None or d < best["distance"]):
+                best = {"url": u, "post_id": pid, "distance": d}
+        if best is None:
+            _claims[url] = fp
+            return None
+    if best["post_id"]:
+        _store(url, fp, dup_of=best["url"])
+    return best
+
+
+def remember(url: str, fp: int | None, post_id: int):
+    """게시 완료 → 이후 기사와 비교할 지문으로 저장"""
+    with _lock:
+        _claims.pop(url, None)
+    if fp is not None:
+        _store(url, fp, post_id=post_id)
+
+
+def begin_run():
+    """실행마다 선점 초기화 (게시 못 한 글과 겹친 기사는 다음 실행에서 다시 비교)"""
+    with _lock:
+        _claims.clear()
+
+
+def prune():
+    cut = time.time() - KEEP_DAYS * 86400
+    _conn()
+    with state_store.tx() as c:
+        c.execute("DELETE FROM fingerprint_bands WHERE url IN "
+                  "(SELECT url FROM fingerprints WHERE created_at < ?)", (cut,))
+        n = c.execute("DELETE FROM fingerprints WHERE created_at < ?", (cut,)).rowcount
+    if n:
+        logging.debug("🧹 오래된 기사 지문 %d건 정리", n)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+새 기사 URL 찾기
+• udf.name RSS/Atom 피드 우선 (UDF_FEEDS, 없으면 목록 페이지 <link rel="alternate">에서 찾아 state.db에 기억)
+• 피드 실패·비어 있음 → 기존처럼 /news/ 목록 첫 페이지 스크래핑
+• 피드·첫 페이지가 지난 실행 이후 구간을 다 덮지 못하면(폭주) 목록 페이지를 뒤로 넘기며
+  이미 아는 URL이 나올 때까지 보충 (동시 BACKFILL_WORKERS장, 최대 BACKFILL_PAGES장)
+• 마지막으로 본 최신 글 시각(discovery.since)을 state.db meta에 저장
+"""
+
+import os
+import time
+import calendar
+import logging
+from urllib.parse import urljoin, urlparse, urlunparse
+from concurrent.futures import ThreadPoolExecutor
+import feedparser
+from requests.exceptions import RequestException
+import http_cache
+import html_doc
+import state_store
+
+# ────────── 환경 변수 ──────────
+UDF_BASE         = os.getenv("UDF_BASE", "https://udf.name/news/")
+FEEDS            = [u.strip() for u in os.getenv("UDF_FEEDS", "").split(",") if u.strip()]
+PAGE_FMT         = os.getenv("UDF_PAGE_FMT", "{base}page/{n}/")     # 목록 n쪽 URL
+BACKFILL_PAGES   = int(os.getenv("BACKFILL_PAGES", "10"))
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "2"))
+FEED_RECHECK_HOURS = float(os.getenv("FEED_RECHECK_HOURS", "24"))   # 피드 없음 판정 재확인 주기
+HEADERS          = {"User-Agent": "UDFCrawler/3.8"}
+
+LIST_SELECTOR = "div.article1 div.article_title_news a[href]"
+FEED_TYPES    = ("application/rss+xml", "application/atom+xml")
+
+_norm = lambda u: urlunparse(urlparse(u)._replace(query="", params="", fragment=""))
+
+
+# ────────── 목록 페이지 ──────────
+def _get(url: str) -> str | None:
+    try:
+        # 목록·피드는 매번 재검증(ttl=0) → 바뀐 게 없으면 304
+        r = http_cache.get(url, headers=HEADERS, timeout=15, ttl=0)
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        return r.text
+    except RequestException as e:
+        logging.warning("목록 요청 실패(%s): %s", url, e)
+        return None
+
+
+def page_url(n: int) -> str:
+    return UDF_BASE if n <= 1 else PAGE_FMT.format(base=UDF_BASE, n=n)
+
+
+def scrape(html: str) -> list[str]:
+    """목록 HTML → 기사 URL (페이지 순서 유지)"""
+    soup = html_doc.soup(html)
+    return list(dict.fromkeys(
+        _norm(urljoin(UDF_BASE, a["href"])) for a in soup.select(LIST_SELECTOR)))
+
+
+def feed_links(html: str) -> list[str]:
+    """목록 HTML의 <link rel="alternate" type="application/rss+xml"> 주소"""
+    soup = html_doc.soup(html)
+    return [urljoin(UDF_BASE, l["href"])
+            for l in soup.find_all("link", href=True)
+            if "alternate" in (l.get("rel") or []) and l.get("type") in FEED_TYPES]
+
+
+# ────────── 피드 ──────────
+def _entry_time(e) -> float | None:
+    t = e.get("published_parsed") or e.get("updated_parsed")
+    return calendar.timegm(t) if t else None
+
+
+def read_feeds(feeds: list[str]) -> list[tuple[str, float | None]] | None:
+    """피드 항목 (URL, 게시 시각) 최신순. 하나도 못 읽으면 None"""
+    items, ok = {}, False
+    for f in feeds:
+        text = _get(f)
+        if text is None:
+            continue
+        d = feedparser.parse(text)
+        if d.bozo and not d.entries:
+            logging.warning("피드 파싱 실패(%s): %s", f, d.get("bozo_exception"))
+            continue
+        ok = True
+        for e in d.entries:
+            link = e.get("link")
+            if link and _norm(link).startswith(UDF_BASE.rstrip("/")):
+                u = _norm(link)
+                items[u] = max(filter(None, (items.get(u), _entry_time(e))), default=None)
+    if not ok or not items:
+        return None
+    return sorted(items.items(), key=lambda kv: kv[1] or 0, reverse=True)
+
+
+def _feeds(fetch_first) -> list[str]:
+    """
+    UDF_FEEDS > state.db에 기억한 주소 > 목록 페이지에서 찾기.
+    못 찾은 결과도 기억하되 FEED_RECHECK_HOURS가 지나면 다시 찾아봄
+    """
+    if FEEDS:
+        return FEEDS
+    cached = state_store.get_meta("discovery.feeds")
+    if cached and (cached["urls"] or time.time() - cached["at"] < FEED_RECHECK_HOURS * 3600):
+        return cached["urls"]
+    html = fetch_first()
+    if html is None:
+        return []
+    found = feed_links(html)
+    state_store.set_meta("discovery.feeds", {"urls": found, "at": time.time()})
+    if found:
+        logging.info("📡 피드 발견: %s", ", ".join(found))
+    return found
+
+
+# ────────── 보충(backfill) ──────────
+def backfill(known, start: int = 2) -> list[str]:
+    """
+    목록 start쪽부터 BACKFILL_WORKERS장씩 동시에 받아 아는 URL이 나오는 쪽에서 멈춤.
+    반환: 새 URL (목록 순서)
+    """
+    out, n = [], start
+    with ThreadPoolExecutor(max(1, BACKFILL_WORKERS), thread_name_prefix="backfill") as pool:
+        while n <= BACKFILL_PAGES:
+            batch = list(range(n, min(n + BACKFILL_WORKERS, BACKFILL_PAGES + 1)))
+            pages = list(pool.map(lambda i: _get(page_url(i)), batch))
+            stop = False
+            for i, html in zip(batch, pages):
+                links = scrape(html) if html else []
+                if not links:
+                    stop = True
+                    break
+                new = [u for u in links if not known(u)]
+                out += new
+                if len(new) < len(links):
+                    stop = True
+                    break
+            if stop:
+                break
+            n += len(batch)
+        else:
+            logging.warning("⚠️ 보충 %d쪽까지 아는 기사가 없음 (BACKFILL_PAGES 상한)", BACKFILL_PAGES)
+    if out:
+        logging.info("⏪ 목록 %d쪽부터 보충: 새 기사 %d건", start, len(out))
+    return out
+
+
+# ────────── 진입점 ──────────
+def discover(known=None) -> list[str]:
+    """
+    새로 처리할 후보 URL (최신순, 중복 없음).
+    known(url) → 이미 처리/게시된 URL인지 (없으면 모두 새 것으로 보고 보충 안 함)
+    """
+    since = state_store.get_meta("discovery.since")
+    first = {}
+
+    def fetch_first():                      # 목록 첫 페이지는 한 번만 받기
+        if "html" not in first:
+            first["html"] = _get(UDF_BASE)
+        return first["html"]
+
+    feeds = _feeds(fetch_first)
+    entries = read_feeds(feeds) if feeds else None
+    if entries is not None:
+        links = [u for u, _ in entries]
+        newest = max((t for _, t in entries if t), default=None)
+        oldest = min((t for _, t in entries if t), default=None)
+        # 피드 창의 가장 오래된 글이 지난 실행의 최신 글보다 새로우면 그 사이가 비었을 수 있음
+        gap = since is not None and oldest is not None and oldest > since
+    else:
+        if feeds:
+            logging.info("피드를 읽지 못해 목록 스크래핑으로 대체")
+        html = fetch_first()
+        links = scrape(html) if html else []
+        newest, gap = time.time(), False
+
+    if known is not None and links:
+        fresh = [u for u in links if not known(u)]
+        # 첫 실행(since 없음)은 보충하지 않음 → 옛 기사를 한꺼번에 올리지 않도록
+        if since is not None and (gap or len(fresh) == len(links)):
+            # 피드는 목록과 창이 다르므로 1쪽부터, 스크래핑은 이미 본 1쪽 다음부터
+            links += backfill(known, start=1 if entries is not None else 2)
+    if links and newest:
+        state_store.set_meta("discovery.since", max(newest, since or 0))
+    return list(dict.fromkeys(links))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenAI chat completions 공용 호출 + 결과 캐시
+• 모든 GPT 호출(rewrite·korean_title·ensure_depth·generate_meta)이 여기를 거침
+• 요청 본문(model + messages + 파라미터)의 SHA-256을 키로 응답 JSON을 SQLite에 보관
+  → 게시 실패 후 재실행·재시도 때 같은 요청은 30–90초 기다리지 않고 즉시 재사용
+• 전체 크기 상한을 넘으면 오래 안 쓴 항목부터 삭제
+• 모델별 ratelimit.Limiter로 동시 요청 수·분당 토큰 예산을 맞춤 (gpt-4o와 gpt-4o-mini 따로)
+"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+import metrics
+import ratelimit
+import http_client
+import state_store
+
+# ────────── 환경 변수 ──────────
+OPENAI_API = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
+OPEN_KEY   = os.getenv("OPENAI_API_KEY")
+CACHE_DB   = os.getenv("GPT_CACHE_DB", "gpt_cache.db")
+CACHE_MAX  = int(float(os.getenv("GPT_CACHE_MAX_MB", "100")) * 1024 * 1024)
+CACHE_ON   = os.getenv("GPT_CACHE", "1") != "0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key         TEXT PRIMARY KEY,
+    model       TEXT,
+    response    BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS completions_accessed ON completions(accessed_at);
+"""
+
+_evict_lock = threading.Lock()
+
+
+# ────────── 캐시 ──────────
+def _conn():
+    state_store.ensure_schema(_SCHEMA, CACHE_DB)
+    return state_store.conn(CACHE_DB)
+
+
+def cache_key(data: dict) -> str:
+    blob = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> dict | None:
+    row = _conn().execute("SELECT response FROM completions WHERE key=?", (key,)).fetchone()
+    if not row:
+        return None
+    _conn().execute("UPDATE completions SET accessed_at=? WHERE key=?", (time.time(), key))
+    return json.loads(zlib.decompress(row[0]))
+
+
+def _cache_put(key: str, model: str, resp: dict):
+    blob = zlib.compress(json.dumps(resp, ensure_ascii=False).encode("utf-8"))
+    now  = time.time()
+    _conn().execute(
+        "INSERT OR REPLACE INTO completions(key, model, response, size, created_at, accessed_at) "
+        "VALUES(?, ?, ?, ?, ?, ?)", (key, model, blob, len(blob), now, now))
+    _evict()
+
+
+def _evict():
+    with _evict_lock:
+        c = _conn()
+        total = c.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= CACHE_MAX:
+            return
+        drop, freed = [], 0
+        for key, size in c.execute("SELECT key, size FROM completions ORDER BY accessed_at"):
+            if total - freed <= CACHE_MAX * 0.9:
+                break
+            drop.append((key,))
+            freed += size
+        c.executemany("DELETE FROM completions WHERE key=?", drop)
+        logging.debug("🗑️ GPT 캐시 %d건 정리 (%.1f MB)", len(drop), freed / 1e6)
+
+
+def forget(data: dict):
+    """쓸 수 없는 응답(JSON 파싱 실패 등)이 다음 실행에 재사용되지 않도록 삭제"""
+    if CACHE_ON:
+        _conn().execute("DELETE FROM completions WHERE key=?", (cache_key(data),))
+
+
+# ────────── 호출 ──────────
+def _headers() -> dict:
+    return {"Authorization": f"Bearer {OPEN_KEY}", "Content-Type": "application/json"}
+
+
+def chat(data: dict, timeout: float = 60, cache: bool = True) -> dict:
+    """chat/completions 응답 JSON (캐시 적중 시 네트워크 없음)"""
+    key = cache_key(data) if CACHE_ON and cache else None
+    if key:
+        hit = _cache_get(key)
+        if hit is not None:
+            logging.debug("  ♻️ GPT 캐시 적중 (%s)", data.get("model"))
+            metrics.record_tokens(None, cached=True)
+            return hit
+
+    lim = ratelimit.model(data.get("model") or "")
+    ticket = lim.tokens.reserve(ratelimit.estimate_tokens(data))
+    usage = None
+    try:
+        r = http_client.post(OPENAI_API, headers=_headers(), json=data, timeout=timeout,
+                             limiter=lim)
+        r.raise_for_status()
+        resp = r.json()
+        usage = resp.get("usage")
+    finally:
+        lim.tokens.settle(ticket, (usage or {}).get("total_tokens"))
+    metrics.record_tokens(usage)
+    if key:
+        _cache_put(key, data.get("model"), resp)
+    return resp
+
+
+def content(resp: dict) -> str:
+    return resp["choices"][0]["message"]["content"]
+
+
+def finish_reason(resp: dict) -> str | None:
+    return resp["choices"][0].get("finish_reason")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 파싱 공용 헬퍼
+• 파서 백엔드 선택: HTML_PARSER=html.parser(기본) | lxml (설치돼 있을 때만, 없으면 자동 대체)
+• ParsedArticle: parse() 결과 dict + DOM·평문을 한 번만 계산해 재사용
+"""
+
+import os
+import re
+import logging
+from bs4 import BeautifulSoup
+
+# ────────── 파서 선택 ──────────
+PARSER = os.getenv("HTML_PARSER", "html.parser")
+
+if PARSER == "lxml":
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        logging.warning("HTML_PARSER=lxml 이지만 lxml 미설치 → html.parser 사용")
+        PARSER = "html.parser"
+
+_WS = re.compile(r"\s+")
+
+
+def soup(markup: str, parser: str = None) -> BeautifulSoup:
+    return BeautifulSoup(markup, parser or PARSER)
+
+
+def fragment(markup: str) -> BeautifulSoup:
+    """
+    GPT 출력처럼 <html>/<body> 없는 조각용.
+    lxml은 조각을 <html><body>로 감싸 버리므로 str() 결과가 달라지지 않게 html.parser 고정
+    """
+    return BeautifulSoup(markup, "html.parser")
+
+
+def text_of(node) -> str:
+    """태그/문서/HTML 문자열 → 공백 정리된 평문"""
+    if isinstance(node, str):
+        node = soup(node)
+    return _WS.sub(" ", node.get_text(" ", strip=True))
+
+
+# ────────── 파싱된 기사 ──────────
+class ParsedArticle(dict):
+    """
+    parse() 결과. 기존 dict 키(title·html·image·url·cat)는 그대로 두고
+    본문 DOM(.doc)과 평문(["text"])을 함께 들고 다님
+    """
+
+    def __init__(self, doc=None, **fields):
+        super().__init__(**fields)
+        self.doc = doc
+
+    @property
+    def text(self) -> str:
+        if "text" not in self:
+            self["text"] = text_of(self.doc if self.doc is not None else self["html"])
+        return self["text"]
+
+
+def article_text(article: dict) -> str:
+    """ParsedArticle이면 캐시된 평문, 일반 dict면 html에서 추출"""
+    if isinstance(article, ParsedArticle):
+        return article.text
+    return article.get("text") or text_of(article["html"])
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+조건부 GET 디스크 캐시 (udf.name 목록·기사 페이지용)
+• ETag / Last-Modified 저장 → If-None-Match / If-Modified-Since 로 재검증, 304면 캐시 본문 사용
+• TTL 안의 항목은 네트워크 없이 바로 반환 (재처리 시 기사 재다운로드 방지)
+• 본문은 zlib 압축해 SQLite에 보관, 전체 크기 상한 넘으면 오래 안 쓴 것부터 삭제
+"""
+
+import os
+import time
+import zlib
+import logging
+import threading
+import requests
+import http_client
+import state_store
+
+# ────────── 환경 변수 ──────────
+DB_PATH   = os.getenv("HTTP_CACHE_DB", "http_cache.db")
+TTL       = float(os.getenv("HTTP_CACHE_TTL", "86400"))          # 재검증 없이 쓰는 시간(초)
+MAX_BYTES = int(float(os.getenv("HTTP_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    encoding      TEXT,
+    body          BLOB NOT NULL,
+    size          INTEGER NOT NULL,
+    fetched_at    REAL NOT NULL,
+    accessed_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS http_cache_accessed ON http_cache(accessed_at);
+"""
+
+_evict_lock = threading.Lock()
+
+
+class CachedPage:
+    """requests.Response 중 호출부가 쓰는 부분(status_code·text·content·raise_for_status)만 흉내"""
+
+    def __init__(self, url, content: bytes, encoding: str, from_cache: bool, revalidated: bool):
+        self.url         = url
+        self.status_code = 200
+        self.ok          = True
+        self.content     = content
+        self.encoding    = encoding or "utf-8"
+        self.from_cache  = from_cache     # 본문을 캐시에서 꺼냈는지
+        self.revalidated = revalidated    # 304로 재검증했는지
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def raise_for_status(self):
+        pass
+
+
+def _conn():
+    state_store.ensure_schema(_SCHEMA, DB_PATH)
+    return state_store.conn(DB_PATH)
+
+
+def _store(url: str, r: requests.Response):
+    body = zlib.compress(r.content, 6)
+    now  = time.time()
+    _conn().execute(
+        "INSERT OR REPLACE INTO http_cache"
+        "(url, etag, last_modified, encoding, body, size, fetched_at, accessed_at) "
+        "VALUES(?, ?, ?, ?, ?, ?, ?, ?)",
+        (url, r.headers.get("ETag"), r.headers.get("Last-Modified"),
+         r.encoding or r.apparent_encoding, body, len(body), now, now))
+    _evict()
+
+
+def _evict():
+    """전체 크기가 상한을 넘으면 accessed_at 오래된 순으로 삭제"""
+    with _evict_lock:
+        c = _conn()
+        total = c.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= MAX_BYTES:
+            return
+        drop, freed = [], 0
+        for url, size in c.execute("SELECT url, size FROM http_cache ORDER BY accessed_at"):
+            if total - freed <= MAX_BYTES * 0.9:
+                break
+            drop.append((url,))
+            freed += size
+        c.executemany("DELETE FROM http_cache WHERE url=?", drop)
+        logging.debug("🗑️ HTTP 캐시 %d건 정리 (%.1f MB)", len(drop), freed / 1e6)
+
+
+def get(url: str, *, ttl: float = None, headers: dict = None, **kw):
+    """
+    캐시를 거친 GET.
+    - ttl 안이면 네트워크 없이 캐시 반환 (ttl=0 → 항상 재검증)
+    - 200 → 저장 후 반환, 304 → 캐시 본문 반환, 그 밖의 응답은 requests.Response 그대로
+    """
+    ttl = TTL if ttl is None else ttl
+    row = _conn().execute(
+        "SELECT etag, last_modified, encoding, body, fetched_at FROM http_cache WHERE url=?",
+        (url,)).fetchone()
+    now = time.time()
+
+    if row and now - row[4] < ttl:
+        _conn().execute("UPDATE http_cache SET accessed_at=? WHERE url=?", (now, url))
+        return CachedPage(url, zlib.decompress(row[3]), row[2], True, False)
+
+    hdrs = dict(headers or {})
+    if row:
+        if row[0]:
+            hdrs["If-None-Match"] = row[0]
+        if row[1]:
+            hdrs["If-Modified-Since"] = row[1]
+
+    r = http_client.get(url, headers=hdrs, **kw)
+    if r.status_code == 304 and row:
+        _conn().execute("UPDATE http_cache SET fetched_at=?, accessed_at=? WHERE url=?",
+                        (now, now, url))
+        return CachedPage(url, zlib.decompress(row[3]), row[2], True, True)
+    if r.status_code == 200:
+        _store(url, r)
+    return r
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+공용 HTTP 클라이언트
+• 호스트별 requests.Session + keep-alive 커넥션 풀 → TCP/TLS 핸드셰이크 재사용
+• 공통 기본 타임아웃
+• 429·5xx·연결 오류 시 지터 섞인 지수 백오프 재시도 (Retry-After 우선)
+• 호스트별 최소 요청 간격(예의상 속도 제한) → 고정 sleep 대체
+• 호스트별(또는 호출부가 넘긴 모델별) AIMD 동시 요청 제한 → 429·503·x-ratelimit-* 에 맞춰 자동 조절
+• 429는 서버가 처리하지 않았다는 뜻이므로 재시도 0회로 부른 생성 요청도 RETRIES까지 재시도
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+import metrics
+import ratelimit
+
+# ────────── 환경 변수 ──────────
+TIMEOUT     = float(os.getenv("HTTP_TIMEOUT", "20"))
+RETRIES     = int(os.getenv("HTTP_RETRIES", "3"))
+BACKOFF     = float(os.getenv("HTTP_BACKOFF", "1.0"))      # 첫 재시도 기준 대기(초)
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+POOL_SIZE   = int(os.getenv("HTTP_POOL_SIZE", "10"))       # 호스트당 동시 keep-alive 연결 수
+# "호스트=초,호스트=초" 형식, 요청 시작 사이 최소 간격
+HOST_INTERVAL = {
+    h.strip(): float(v)
+    for h, _, v in (x.partition("=") for x in
+                    os.getenv("HTTP_HOST_INTERVAL", "udf.name=1.0").split(",") if "=" in x)
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_sessions  = {}
+_lock      = threading.Lock()
+_next_at   = {}             # 호스트 → 다음 요청 허용 시각(monotonic)
+_pace_lock = threading.Lock()
+
+
+# ────────── 세션 풀 ──────────
+def session(url: str) -> requests.Session:
+    """스킴+호스트 단위로 하나씩 만들어 재사용"""
+    p   = urlparse(url)
+    key = f"{p.scheme}://{p.netloc}"
+    s = _sessions.get(key)
+    if s is None:
+        with _lock:
+            s = _sessions.get(key)
+            if s is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                s.mount(key, adapter)
+                _sessions[key] = s
+    return s
+
+
+def close():
+    with _lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
+
+
+# ────────── 호스트별 속도 제한 ──────────
+def _pace(url: str):
+    """HOST_INTERVAL에 등록된 호스트는 요청 시작 간격을 보장 (스레드 간 공유)"""
+    host = urlparse(url).hostname or ""
+    gap  = HOST_INTERVAL.get(host)
+    if not gap:
+        return
+    with _pace_lock:
+        now  = time.monotonic()
+        slot = max(now, _next_at.get(host, 0.0))
+        _next_at[host] = slot + gap
+    if slot > now:
+        time.sleep(slot - now)
+
+
+# ────────── 계측 ──────────
+def _record(url: str, resp: requests.Response):
+    """요청·응답 바이트를 현재 metrics span에 기록"""
+    body = resp.request.body if resp.request is not None else None
+    sent = len(body) if body else 0
+    metrics.record_http(urlparse(url).hostname or "", sent + len(resp.content))
+
+
+# ────────── 재시도 ──────────
+def _retry_after(resp: requests.Response) -> float | None:
+    v = resp.headers.get("Retry-After")
+    if not v:
+        return None
+    try:
+        return max(0.0, float(v))
+    except ValueError:
+        return None     # HTTP-date 형식은 무시하고 백오프 사용
+
+
+def _backoff(attempt: int) -> float:
+    """full jitter: 0 ~ min(MAX, BASE·2^n)"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF * 2 ** attempt))
+
+
+def request(method: str, url: str, *, retries: int = None, timeout: float = None,
+            limiter=None, **kw) -> requests.Response:
+    """
+    세션 풀을 거쳐 요청.
+    - 429·5xx → 재시도, 마지막 응답은 그대로 반환 (raise_for_status는 호출부 몫)
+    - 연결 오류·타임아웃 → 재시도 후 마지막 예외 전파
+    - limiter: ratelimit.Limiter (없으면 호스트별 기본) — 슬롯을 얻은 뒤 보내고 응답으로 상한 조정
+    """
+    retries = RETRIES if retries is None else retries
+    timeout = TIMEOUT if timeout is None else timeout
+    lim = limiter or ratelimit.host(urlparse(url).hostname or "")
+    s = session(url)
+
+    for attempt in range(max(retries, RETRIES) + 1):
+        _pace(url)
+        lim.acquire()
+        try:
+            resp = s.request(method, url, timeout=timeout, **kw)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            lim.release()
+            if attempt >= retries:
+                raise
+            wait = _backoff(attempt)
+            logging.debug("↻ %s %s 연결 오류(%s) → %.1fs 후 재시도", method, url, e, wait)
+            time.sleep(wait)
+            continue
+        except BaseException:
+            lim.release()
+            raise
+
+        _record(url, resp)
+        lim.feedback(resp)
+        budget = max(retries, RETRIES) if resp.status_code == 429 else retries
+        lim.release()
+        if resp.status_code not in RETRY_STATUS or attempt >= budget:
+            return resp
+        wait = _retry_after(resp)
+        wait = min(BACKOFF_MAX, wait) if wait is not None else _backoff(attempt)
+        logging.debug("↻ %s %s → %d, %.1fs 후 재시도", method, url, resp.status_code, wait)
+        resp.close()
+        time.sleep(wait)
+
+
+def get(url: str, **kw) -> requests.Response:
+    return request("GET", url, **kw)
+
+
+def post(url: str, **kw) -> requests.Response:
+    return request("POST", url, **kw)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+임대 서버 – 여러 호스트의 워커가 함께 쓰는 임대 저장소 (leases.SqliteLeaseStore를 HTTP로)
+• 한 호스트에서 하나만 실행, 임대 파일(--db)은 이 호스트의 로컬 디스크 → SQLite 파일 잠금을 믿을 수 있음
+• 만료 판단은 이 서버의 시계 하나로 → 워커 호스트끼리 시계가 달라도 임대가 겹치지 않음
+• POST /acquire /renew /release /finish /prune — JSON 본문은 SqliteLeaseStore 메서드 인자, 응답 {"result": ...}
+• 저장소 호출은 전용 스레드 하나에서 차례로 (SQLite 연결 하나, 요청 스레드마다 연결을 만들지 않음)
+• LEASE_TOKEN을 주면 Authorization: Bearer 토큰 확인 (워커도 같은 LEASE_TOKEN)
+
+사용법:
+    python3 lease_server.py --port 8765 --db /var/lib/udf/leases.db
+    LEASE_URL=http://<이 호스트>:8765 python3 udf.name.py --daemon        # 각 워커 호스트에서
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import leases
+
+# ────────── 환경 변수 ──────────
+PORT  = int(os.getenv("LEASE_PORT", "8765"))
+TOKEN = os.getenv("LEASE_TOKEN", "")
+
+METHODS = ("acquire", "renew", "release", "finish", "prune")
+
+
+def make_server(store, host: str = "0.0.0.0", port: int = PORT, token: str = TOKEN) -> ThreadingHTTPServer:
+    """store(임대 저장소 5개 메서드)를 HTTP로 내놓는 서버 (serve_forever는 호출부 몫)"""
+    calls = ThreadPoolExecutor(1, thread_name_prefix="lease-store")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *a):
+            logging.debug("%s " + fmt, self.address_string(), *a)
+
+        def send(self, code: int, body: dict):
+            raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n) if n else b""
+            if token and self.headers.get("Authorization") != f"Bearer {token}":
+                return self.send(401, {"error": "unauthorized"})
+            name = self.path.strip("/")
+            if name not in METHODS:
+                return self.send(404, {"error": f"unknown method: {name}"})
+            try:
+                args = json.loads(raw or b"{}")
+                result = calls.submit(lambda: getattr(store, name)(**args)).result()
+            except (TypeError, ValueError) as e:
+                return self.send(400, {"error": str(e)})
+            except sqlite3.Error as e:
+                # 잠금 대기 초과 등 → 5xx라 워커(http_client)가 재시도
+                logging.warning("임대 저장소 오류(%s): %s", name, e)
+                return self.send(503, {"error": str(e)})
+            self.send(200, {"result": result})
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    srv.daemon_threads = True
+    return srv
+
+
+def main():
+    ap = argparse.ArgumentParser(description="여러 호스트의 워커가 함께 쓰는 임대 서버")
+    ap.add_argument("--host", default="0.0.0.0", help="받을 주소")
+    ap.add_argument("--port", type=int, default=PORT, help="포트 (LEASE_PORT)")
+    ap.add_argument("--db", default=leases.LEASE_DB, help="임대 파일 — 이 호스트의 로컬 디스크 (LEASE_DB)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s │ %(levelname)s │ %(message)s")
+    if not TOKEN:
+        logging.warning("⚠️ LEASE_TOKEN 없음 → 누구나 임대를 바꿀 수 있음 (내부망에서만)")
+    srv = make_server(leases.SqliteLeaseStore(args.db), args.host, args.port, TOKEN)
+    logging.info("🔒 임대 서버 시작 %s:%d (%s)", args.host, args.port, os.path.abspath(args.db))
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    srv.server_close()
+    logging.info("👋 임대 서버 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+여러 호스트에서 동시에 돌릴 때 기사 단위 작업 선점 (URL별 임대)
+• 처리 전에 claim()으로 URL마다 임대(소유 워커·만료 시각)를 잡은 것만 처리
+  → 같은 todo를 본 다른 워커는 건너뜀 (seen·wp_exists 확인만으로는 경쟁 상태)
+• 하트비트 스레드가 TTL/3마다 잡고 있는 임대를 연장, 워커가 죽으면 만료 후 다른 워커가 회수
+• 게시 직전 holds()로 임대가 아직 내 것인지 다시 확인, 게시 직후 finish()로 완료 표시
+  (완료된 URL은 KEEP_DAYS 동안 누구도 다시 잡지 못함)
+• 저장소
+  - 기본: SQLite 파일(LEASE_DB, rollback journal) → 같은 호스트의 여러 프로세스끼리만 안전
+    (네트워크 파일시스템 위 SQLite는 파일 잠금을 믿을 수 없어 임대가 겹칠 수 있음)
+  - 여러 호스트: 한 호스트에서 lease_server.py를 띄우고 모든 워커에 LEASE_URL(+LEASE_TOKEN)
+    → HttpLeaseStore, 만료 판단은 서버 시계 하나
+  - 그 밖(DB 서버·Redis 등): LEASE_STORE="모듈:팩토리" — 팩토리는 인자 없이 불려
+    acquire·renew·release·finish·prune(SqliteLeaseStore와 같은 시그니처·의미)을 가진 객체를 돌려줌.
+    bench/lease_check.py --store 모듈:팩토리 로 계약을 확인한 뒤 연결
+"""
+
+import os
+import time
+import uuid
+import socket
+import logging
+import importlib
+import threading
+import metrics
+import ratelimit
+import http_client
+import state_store
+
+# ────────── 환경 변수 ──────────
+LEASE_DB    = os.getenv("LEASE_DB", "leases.db")             # 같은 호스트의 워커들이 함께 보는 파일
+LEASE_URL   = os.getenv("LEASE_URL", "")                        # lease_server.py 주소 (여러 호스트)
+LEASE_TOKEN = os.getenv("LEASE_TOKEN", "")
+LEASE_STORE = os.getenv("LEASE_STORE", "")                      # "모듈:팩토리" (LEASE_URL보다 우선)
+TTL         = float(os.getenv("LEASE_TTL_SECONDS", "600"))      # 하트비트가 끊기고 회수까지 걸리는 시간
+KEEP_DAYS   = float(os.getenv("LEASE_KEEP_DAYS", "14"))         # 완료 표시 보관 기간
+BATCH       = int(os.getenv("LEASE_BATCH", "8"))                # 한 번에 잡는 기사 수 (워커끼리 나눠 갖도록)
+WORKER_ID   = os.getenv("WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+# ────────── 저장소 ──────────
+class SqliteLeaseStore:
+    """
+    leases 테이블 하나. 모든 변경은 BEGIN IMMEDIATE 트랜잭션 → 같은 호스트의 여러 프로세스가 써도 원자적.
+    WAL은 공유 메모리(-shm)에 기대므로 쓰지 않고 rollback journal(DELETE)로 엶 — state.db와 다른 파일이어야 함.
+    다른 저장소는 같은 메서드 5개만 구현하면 됨. 시각은 이 프로세스의 벽시계
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS leases (
+        key        TEXT PRIMARY KEY,
+        owner      TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        done_at    REAL,
+        post_id    INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS leases_expires ON leases(expires_at);
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or LEASE_DB
+        if os.path.abspath(self.path) == os.path.abspath(state_store.DB_PATH):
+            raise ValueError("LEASE_DB는 state.db(WAL)와 다른 파일이어야 합니다")
+        state_store.use_journal(self.path, "DELETE")
+        state_store.ensure_schema(self._SCHEMA, self.path)
+
+    def acquire(self, keys: list[str], owner: str, ttl: float, limit: int = 0) -> list[str]:
+        """비어 있거나 만료됐거나 이미 내 것인 키를 앞에서부터 최대 limit개(0: 전부) 잡음 → 잡은 키"""
+        now, held, reclaimed = time.time(), [], 0
+        with state_store.tx(self.path) as c:
+            for key in keys:
+                if limit and len(held) >= limit:
+                    break
+                row = c.execute("SELECT owner, expires_at, done_at FROM leases WHERE key=?",
+                                (key,)).fetchone()
+                if row is None:
+                    c.execute("INSERT INTO leases(key, owner, expires_at) VALUES(?, ?, ?)",
+                              (key, owner, now + ttl))
+                elif row[2] is None and (row[0] == owner or row[1] < now):
+                    reclaimed += row[0] != owner
+                    c.execute("UPDATE leases SET owner=?, expires_at=? WHERE key=?",
+                              (owner, now + ttl, key))
+                else:
+                    continue
+                held.append(key)
+        if reclaimed:
+            metrics.incr("lease_reclaimed", reclaimed)
+            logging.info("♻️ 만료된 임대 %d건 회수 (멈춘 워커의 기사)", reclaimed)
+        return held
+
+    def renew(self, keys: list[str], owner: str, ttl: float) -> list[str]:
+        """아직 내 것인 키만 연장 → 연장된 키 (만료돼도 다른 워커가 안 잡았으면 그대로 내 것)"""
+        now, held = time.time(), []
+        with state_store.tx(self.path) as c:
+            for key in keys:
+                if c.execute("UPDATE leases SET expires_at=? WHERE key=? AND owner=? AND done_at IS NULL",
+                             (now + ttl, key, owner)).rowcount:
+                    held.append(key)
+        return held
+
+    def release(self, keys: list[str], owner: str):
+        """처리 못 한 키 반납 → 다른 워커가 바로 잡을 수 있음"""
+        with state_store.tx(self.path) as c:
+            c.executemany("DELETE FROM leases WHERE key=? AND owner=? AND done_at IS NULL",
+                          [(k, owner) for k in keys])
+
+    def finish(self, key: str, owner: str, post_id: int = None):
+        """완료 표시 (소유자와 상관없이 — 이미 게시된 글을 다른 워커가 다시 잡지 않도록)"""
+        now = time.time()
+        with state_store.tx(self.path) as c:
+            c.execute(
+                "INSERT INTO leases(key, owner, expires_at, done_at, post_id) VALUES(?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner=excluded.owner, done_at=excluded.done_at, "
+                "  post_id=COALESCE(excluded.post_id, post_id)",
+                (key, owner, now, now, post_id))
+
+    def prune(self, keep_seconds: float) -> int:
+        """오래된 완료 표시·오래 전에 만료된 임대 정리"""
+        cut = time.time() - keep_seconds
+        with state_store.tx(self.path) as c:
+            return c.execute("DELETE FROM leases WHERE COALESCE(done_at, expires_at) < ?",
+                             (cut,)).rowcount
+
+
+class HttpLeaseStore:
+    """lease_server.py에 같은 메서드 5개를 HTTP로. 재시도해도 안전 (내 임대 다시 잡기·반납·완료 표시는 멱등)"""
+
+    def __init__(self, url: str = None, token: str = None):
+        self.url   = (url or LEASE_URL).rstrip("/")
+        self.token = LEASE_TOKEN if token is None else token
+        # WP 등과 같은 호스트여도 동시 요청 상한은 따로 → 하트비트가 기사 요청 뒤에 줄 서지 않게
+        self.limiter = ratelimit.host("lease-server")
+
+    def _call(self, name: str, **args):
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        r = http_client.post(f"{self.url}/{name}", json=args, headers=headers, timeout=10,
+                              limiter=self.limiter)
+        r.raise_for_status()
+        return r.json()["result"]
+
+    def acquire(self, keys: list[str], owner: str, ttl: float, limit: int = 0) -> list[str]:
+        return self._call("acquire", keys=keys, owner=owner, ttl=ttl, limit=limit)
+
+    def renew(self, keys: list[str], owner: str, ttl: float) -> list[str]:
+        return self._call("renew", keys=keys, owner=owner, ttl=ttl)
+
+    def release(self, keys: list[str], owner: str):
+        self._call("release", keys=keys, owner=owner)
+
+    def finish(self, key: str, owner: str, post_id: int = None):
+        self._call("finish", key=key, owner=owner, post_id=post_id)
+
+    def prune(self, keep_seconds: float) -> int:
+        return self._call("prune", keep_seconds=keep_seconds)
+
+
+def _make_store():
+    if LEASE_STORE:
+        mod, _, attr = LEASE_STORE.partition(":")
+        return getattr(importlib.import_module(mod), attr or "store")()
+    if LEASE_URL:
+        return HttpLeaseStore()
+    return SqliteLeaseStore()
+
+
+# ────────── 이 워커의 임대 ──────────
+_store = None
+_held  = set()
+_lock  = threading.Lock()
+_beat  = None
+
+
+def store():
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = _make_store()
+    return _store
+
+
+def _heartbeat():
+    while True:
+        time.sleep(TTL / 3)
+        with _lock:
+            keys = list(_held)
+        if not keys:
+            continue
+        try:
+            kept = set(store().renew(keys, WORKER_ID, TTL))
+        except Exception as e:
+            logging.warning("임대 연장 실패: %s", e)
+            continue
+        lost = [k for k in keys if k not in kept]
+        if lost:
+            with _lock:
+                _held.difference_update(lost)
+            metrics.incr("lease_lost", len(lost))
+            logging.warning("🔓 임대 %d건을 잃음 (연장이 늦어 다른 워커가 회수)", len(lost))
+
+
+def claim(urls: list[str], limit: int = 0) -> list[str]:
+    """urls 앞에서부터 이 워커가 잡은 것 최대 limit개 (순서 유지). 처음 부르면 하트비트 시작"""
+    global _beat
+    if not urls:
+        return []
+    got = set(store().acquire(list(dict.fromkeys(urls)), WORKER_ID, TTL, limit))
+    with _lock:
+        _held.update(got)
+        if _beat is None:
+            _beat = threading.Thread(target=_heartbeat, name="lease-heartbeat", daemon=True)
+            _beat.start()
+    return [u for u in urls if u in got]
+
+
+def holds(url: str) -> bool:
+    """게시 직전 확인: 임대를 연장해 보고 아직 내 것인지"""
+    with _lock:
+        if url not in _held:
+            return False
+    if store().renew([url], WORKER_ID, TTL):
+        return True
+    with _lock:
+        _held.discard(url)
+    metrics.incr("lease_lost")
+    return False
+
+
+def finish(url: str, post_id: int = None):
+    with _lock:
+        _held.discard(url)
+    store().finish(url, WORKER_ID, post_id)
+
+
+def release(urls: list[str] = None):
+    """urls(생략 시 잡고 있는 전부) 반납 — 실행 끝·종료 때"""
+    with _lock:
+        keys = [u for u in (urls if urls is not None else list(_held)) if u in _held]
+        _held.difference_update(keys)
+    if keys:
+        store().release(keys, WORKER_ID)
+
+
+def prune():
+    n = store().prune(KEEP_DAYS * 86400)
+    if n:
+        logging.debug("🧹 오래된 임대 기록 %d건 정리", n)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+대표 이미지 → WP 미디어 라이브러리
+• 원본 이미지를 받아 SHA-256으로 로컬 인덱스(state.db)와 대조 → 같은 이미지는 한 번만 /wp/v2/media 업로드
+• 이미 받은 원본 URL은 다운로드도 생략
+• 결과 {"id", "url"} → publish()가 featured_media 지정 + 본문 <img>를 WP 사본(wp-image-ID)으로 교체
+  (WP가 srcset·썸네일 크기를 붙여 줌)
+• 실패하면 None → 기존처럼 원본 링크 사용
+"""
+
+import os
+import hashlib
+import logging
+import mimetypes
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse, unquote
+import requests
+import metrics
+import http_client
+import state_store
+
+# ────────── 환경 변수 ──────────
+WP_URL    = os.getenv("WP_URL", "https://belatri.info").rstrip("/")
+USER      = os.getenv("WP_USERNAME")
+APP_PW    = os.getenv("WP_APP_PASSWORD")
+MEDIA_API = f"{WP_URL}/wp-json/wp/v2/media"
+MAX_BYTES = int(float(os.getenv("MEDIA_MAX_MB", "10")) * 1024 * 1024)
+HEADERS   = {"User-Agent": "UDFCrawler/3.8"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    sha256     TEXT PRIMARY KEY,
+    media_id   INTEGER NOT NULL,
+    wp_url     TEXT NOT NULL,
+    created_at REAL NOT NULL DEFAULT (strftime('%s','now'))
+);
+CREATE TABLE IF NOT EXISTS media_sources (
+    url    TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL
+);
+"""
+
+_locks = defaultdict(threading.Lock)      # 같은 해시 동시 업로드 방지
+_locks_guard = threading.Lock()
+
+
+# ────────── 인덱스 ──────────
+def _conn():
+    state_store.ensure_schema(_SCHEMA)
+    return state_store.conn()
+
+
+def _by_hash(sha: str) -> dict | None:
+    row = _conn().execute("SELECT media_id, wp_url FROM media WHERE sha256=?", (sha,)).fetchone()
+    return {"id": row[0], "url": row[1]} if row else None
+
+
+def _by_source(url: str) -> dict | None:
+    row = _conn().execute(
+        "SELECT m.media_id, m.wp_url FROM media_sources s JOIN media m USING(sha256) WHERE s.url=?",
+        (url,)).fetchone()
+    return {"id": row[0], "url": row[1]} if row else None
+
+
+def _remember(url: str, sha: str, media: dict = None):
+    with state_store.tx() as c:
+        if media:
+            c.execute("INSERT OR REPLACE INTO media(sha256, media_id, wp_url) VALUES(?, ?, ?)",
+                      (sha, media["id"], media["url"]))
+        c.execute("INSERT OR REPLACE INTO media_sources(url, sha256) VALUES(?, ?)", (url, sha))
+
+
+# ────────── 다운로드·업로드 ──────────
+def _download(url: str) -> tuple[bytes, str]:
+    r = http_client.get(url, headers=HEADERS, timeout=20)
+    r.raise_for_status()
+    ctype = r.headers.get("Content-Type", "").split(";")[0].strip()
+    if not ctype.startswith("image/"):
+        raise ValueError(f"이미지 아님 ({ctype or '형식 없음'})")
+    if len(r.content) > MAX_BYTES:
+        raise ValueError(f"이미지 너무 큼 ({len(r.content) / 1e6:.1f} MB)")
+    return r.content, ctype
+
+
+def _filename(url: str, sha: str, ctype: str) -> str:
+    name = os.path.basename(unquote(urlparse(url).path))
+    if not os.path.splitext(name)[1]:
+        name = sha[:16] + (mimetypes.guess_extension(ctype) or ".jpg")
+    return name.replace('"', "")
+
+
+def _upload(data: bytes, filename: str, ctype: str) -> dict:
+    # 5xx 뒤에 첨부가 이미 만들어졌을 수 있으므로 재시도하지 않음 (게시 요청과 같은 원칙)
+    r = http_client.post(
+        MEDIA_API, data=data, auth=(USER, APP_PW), timeout=60, retries=0,
+        headers={"Content-Type": ctype,
+                 "Content-Disposition": f'attachment; filename="{filename}"'})
+    r.raise_for_status()
+    j = r.json()
+    return {"id": j["id"], "url": j.get("source_url") or j.get("guid", {}).get("rendered", "")}
+
+
+@metrics.traced("media")
+def ingest(article: dict) -> dict | None:
+    """article['image'] → WP 미디어 {"id", "url"} (없거나 실패하면 None)"""
+    src = article.get("image")
+    if not src:
+        return None
+    try:
+        hit = _by_source(src)
+        if hit:
+            logging.debug("  ♻️ 이미지 재사용(원본 URL): media %d", hit["id"])
+            return hit
+        data, ctype = _download(src)
+        sha = hashlib.sha256(data).hexdigest()
+        with _locks_guard:
+            lock = _locks[sha]
+        with lock:
+            hit = _by_hash(sha)
+            if hit:
+                logging.debug("  ♻️ 이미지 재사용(같은 내용): media %d", hit["id"])
+                _remember(src, sha)
+                return hit
+            media = _upload(data, _filename(src, sha, ctype), ctype)
+            _remember(src, sha, media)
+        logging.info("  🖼️ 이미지 업로드: media %d (%d KB)", media["id"], len(data) // 1024)
+        return media
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logging.warning("이미지 업로드 실패(원본 링크 유지, %s): %s", src, e)
+        return None
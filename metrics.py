@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+단계별 계측 (시간 · HTTP 호출/바이트 · 프롬프트/완성 토큰)
+• span(name, url=…) / @traced(name) 로 단계를 감싸면 그 안에서 일어난 HTTP·GPT 사용량이 자동 집계
+  (http_client · gpt 가 record_http / record_tokens 를 호출, 중첩 span은 바깥 span에도 합산)
+• 끝난 span은 JSON 한 줄씩 METRICS_JSONL 에 추가 (METRICS_JSONL_MAX_MB 넘으면 .1로 돌리고 새로 시작)
+• flush() 때 단계별 누계를 Prometheus textfile(METRICS_PROM)로 원자적 저장
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+
+# ────────── 환경 변수 ──────────
+JSONL_PATH = os.getenv("METRICS_JSONL", "metrics.jsonl")     # 빈 값이면 기록 안 함
+JSONL_MAX  = int(float(os.getenv("METRICS_JSONL_MAX_MB", "20")) * 1024 * 1024)   # 0이면 크기 제한 없음
+PROM_PATH  = os.getenv("METRICS_PROM", "metrics.prom")
+
+_stack = contextvars.ContextVar("metrics_stack", default=())
+_lock  = threading.Lock()
+
+# 단계별 누계: name → {"count", "errors", "seconds", "http_calls", "http_bytes", "prompt_tokens", "completion_tokens"}
+_totals = defaultdict(lambda: defaultdict(float))
+_hosts  = defaultdict(lambda: defaultdict(float))     # host → {"calls", "bytes"}
+_counters = defaultdict(float)                        # (이름, 라벨) → 값
+
+
+class Span:
+    __slots__ = ("name", "labels", "start", "http_calls", "http_bytes",
+                 "prompt_tokens", "completion_tokens", "cache_hits")
+
+    def __init__(self, name: str, labels: dict):
+        self.name, self.labels = name, labels
+        self.start = time.perf_counter()
+        self.http_calls = self.http_bytes = 0
+        self.prompt_tokens = self.completion_tokens = self.cache_hits = 0
+
+
+# ────────── span ──────────
+@contextmanager
+def span(name: str, **labels):
+    s = Span(name, {k: v for k, v in labels.items() if v is not None})
+    token = _stack.set(_stack.get() + (s,))
+    error = None
+    try:
+        yield s
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _stack.reset(token)
+        _finish(s, time.perf_counter() - s.start, error)
+
+
+def _label_from(args) -> str | None:
+    """첫 인자가 기사 dict면 url, URL 문자열이면 그대로"""
+    if not args:
+        return None
+    a = args[0]
+    if isinstance(a, dict):
+        return a.get("url")
+    if isinstance(a, str) and a.startswith("http"):
+        return a
+    return None
+
+
+def traced(name: str):
+    """함수 전체를 span으로 감싸는 데코레이터"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            with span(name, url=_label_from(a)):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+
+def run_in_context(fn):
+    """
+    스레드 풀에 넘길 함수에 현재 span 문맥을 실어 보냄.
+    제출할 때마다 새로 감쌀 것: pool.submit(run_in_context(fn), …)
+    """
+    ctx = contextvars.copy_context()
+    return lambda *a, **kw: ctx.run(fn, *a, **kw)
+
+
+# ────────── 기록 ──────────
+def record_http(host: str, nbytes: int):
+    with _lock:                 # 같은 span을 여러 작업 스레드가 공유할 수 있음
+        for s in _stack.get():
+            s.http_calls += 1
+            s.http_bytes += nbytes
+        _hosts[host]["calls"] += 1
+        _hosts[host]["bytes"] += nbytes
+
+
+def record_tokens(usage: dict | None, cached: bool = False):
+    """GPT 응답의 usage를 현재 span들에 합산 (캐시 적중은 토큰 대신 적중 수만)"""
+    with _lock:
+        for s in _stack.get():
+            if cached:
+                s.cache_hits += 1
+            elif usage:
+                s.prompt_tokens     += usage.get("prompt_tokens", 0) or 0
+                s.completion_tokens += usage.get("completion_tokens", 0) or 0
+
+
+def incr(name: str, value: float = 1, **labels):
+    """단계와 무관한 카운터 (예: incr("prefilter_rejected", cat="world"))"""
+    with _lock:
+        _counters[(name, tuple(sorted(labels.items())))] += value
+
+
+def _finish(s: Span, seconds: float, error: str | None):
+    with _lock:
+        t = _totals[s.name]
+        t["count"]             += 1
+        t["errors"]            += 1 if error else 0
+        t["seconds"]           += seconds
+        t["http_calls"]        += s.http_calls
+        t["http_bytes"]        += s.http_bytes
+        t["prompt_tokens"]     += s.prompt_tokens
+        t["completion_tokens"] += s.completion_tokens
+        if not JSONL_PATH:
+            return
+        line = {
+            "ts": round(time.time(), 3), "span": s.name, **s.labels,
+            "ms": round(seconds * 1000, 1), "http_calls": s.http_calls, "http_bytes": s.http_bytes,
+            "prompt_tokens": s.prompt_tokens, "completion_tokens": s.completion_tokens,
+            "cache_hits": s.cache_hits,
+        }
+        if error:
+            line["error"] = error
+        try:
+            with open(JSONL_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+                full = JSONL_MAX and f.tell() >= JSONL_MAX
+            if full:
+                # 데몬으로 오래 돌아도 파일이 끝없이 커지지 않도록 직전 파일 하나만 보관
+                os.replace(JSONL_PATH, JSONL_PATH + ".1")
+        except OSError as e:
+            logging.debug("metrics JSONL 기록 실패: %s", e)
+
+
+# ────────── 내보내기 ──────────
+def snapshot() -> dict:
+    with _lock:
+        return {"stages": {k: dict(v) for k, v in _totals.items()},
+                "hosts": {k: dict(v) for k, v in _hosts.items()},
+                "counters": {_counter_key(n, lb): v for (n, lb), v in _counters.items()}}
+
+
+def _counter_key(name: str, labels: tuple) -> str:
+    return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+        _hosts.clear()
+        _counters.clear()
+
+
+def _prom_name(s: str) -> str:
+    return "".join(ch if ch.isascii() and ch.isalnum() else "_" for ch in s).lower()
+
+
+def _prom_value(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def flush():
+    """단계별 누계를 Prometheus textfile 형식으로 저장 (tmp → rename)"""
+    if not PROM_PATH:
+        return
+    snap = snapshot()
+    out = []
+    stage_metrics = [
+        ("udf_stage_runs_total",              "count",             "단계 실행 횟수"),
+        ("udf_stage_errors_total",            "errors",            "예외로 끝난 단계 수"),
+        ("udf_stage_seconds_total",           "seconds",           "단계 누적 소요 시간"),
+        ("udf_stage_http_calls_total",        "http_calls",        "단계 안 HTTP 호출 수"),
+        ("udf_stage_http_bytes_total",        "http_bytes",        "단계 안 HTTP 송수신 바이트"),
+        ("udf_stage_prompt_tokens_total",     "prompt_tokens",     "단계 안 프롬프트 토큰"),
+        ("udf_stage_completion_tokens_total", "completion_tokens", "단계 안 완성 토큰"),
+    ]
+    for metric, key, help_ in stage_metrics:
+        out += [f"# HELP {metric} {help_}", f"# TYPE {metric} counter"]
+        out += [f'{metric}{{stage="{name}"}} {v.get(key, 0):g}' for name, v in sorted(snap["stages"].items())]
+    out += ["# HELP udf_http_requests_total 호스트별 HTTP 요청 수", "# TYPE udf_http_requests_total counter"]
+    out += [f'udf_http_requests_total{{host="{h}"}} {v["calls"]:g}' for h, v in sorted(snap["hosts"].items())]
+    out += ["# HELP udf_http_bytes_total 호스트별 HTTP 송수신 바이트", "# TYPE udf_http_bytes_total counter"]
+    out += [f'udf_http_bytes_total{{host="{h}"}} {v["bytes"]:g}' for h, v in sorted(snap["hosts"].items())]
+    with _lock:
+        counters = sorted(_counters.items())
+    typed = set()
+    for (name, labels), v in counters:
+        metric = f"udf_{_prom_name(name)}_total"
+        if metric not in typed:
+            typed.add(metric)
+            out.append(f"# TYPE {metric} counter")
+        lb = ",".join(f'{k}="{_prom_value(val)}"' for k, val in labels)
+        out.append(f"{metric}{{{lb}}} {v:g}" if lb else f"{metric} {v:g}")
+    out.append(f"udf_metrics_flush_timestamp_seconds {time.time():.0f}")
+
+    tmp = PROM_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(out) + "\n")
+    os.replace(tmp, PROM_PATH)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+리라이팅 프롬프트용 원문 전처리
+• #zooming 원본 HTML → 속성·스타일·이미지·스크립트 뺀 간결한 의미 HTML (p·h·li·blockquote·strong)
+• 로컬 토큰 수 계산 (tiktoken 설치 시 정확히, 없으면 문자 종류별 근사치)
+• 모델별 입력 예산(PROMPT_BUDGET) 초과 시 문단 단위로 가운데부터 잘라 앞(리드)·끝은 보존
+"""
+
+import os
+import re
+import logging
+from bs4 import NavigableString, Tag
+import html_doc
+
+# ────────── 환경 변수 ──────────
+# "모델=토큰,모델=토큰" 형식, 원문 본문에 쓸 최대 토큰 수
+BUDGET = {
+    m.strip(): int(v)
+    for m, _, v in (x.partition("=") for x in
+                    os.getenv("PROMPT_BUDGET", "gpt-4o=6000,gpt-4o-mini=3000").split(",") if "=" in x)
+}
+DEFAULT_BUDGET = 6000
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+KEEP_TAGS  = {"p", "h2", "h3", "h4", "ul", "ol", "li", "blockquote", "strong", "b", "em", "i"}
+DROP_TAGS  = {"script", "style", "noscript", "img", "picture", "source", "iframe", "figure",
+              "svg", "video", "audio", "form", "button", "input"}
+BLOCK_TAGS = {"p", "h2", "h3", "h4", "ul", "ol", "blockquote"}
+_WS       = re.compile(r"\s+")
+_BLOCK_RE = re.compile(r"<(p|h2|h3|h4|ul|ol|blockquote)>.*?</\1>", re.S)
+_encoders = {}
+
+
+# ────────── 토큰 수 ──────────
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    if tiktoken:
+        enc = _encoders.get(model)
+        if enc is None:
+            try:
+                enc = tiktoken.encoding_for_model(model)
+            except KeyError:
+                enc = tiktoken.get_encoding("o200k_base")
+            _encoders[model] = enc
+        return len(enc.encode(text))
+    # 근사치: ASCII ≈ 4자/토큰, 키릴 ≈ 2.5자/토큰, 한글 등 ≈ 1.2자/토큰
+    ascii_n = sum(1 for ch in text if ord(ch) < 128)
+    cyr_n   = sum(1 for ch in text if "Ѐ" <= ch <= "ӿ")
+    other_n = len(text) - ascii_n - cyr_n
+    return int(ascii_n / 4 + cyr_n / 2.5 + other_n / 1.2) + 1
+
+
+# ────────── HTML 압축 ──────────
+def _compact(node) -> str:
+    out = []
+    for ch in node.children:
+        if isinstance(ch, NavigableString):
+            if type(ch) is NavigableString:      # 주석·CDATA 등 제외
+                out.append(str(ch))
+            continue
+        if not isinstance(ch, Tag) or ch.name in DROP_TAGS:
+            continue
+        inner = _compact(ch)
+        if ch.name in KEEP_TAGS:
+            if not inner.strip():
+                continue
+            inner = inner.strip() if ch.name in BLOCK_TAGS or ch.name == "li" else inner
+            out.append(f"<{ch.name}>{inner}</{ch.name}>")
+        elif ch.name in ("div", "section", "article", "br"):
+            out.append(f"\n{inner}\n" if inner.strip() else "\n")
+        else:                                     # span·a 등은 텍스트만
+            out.append(inner)
+    return "".join(out)
+
+
+def compact_html(node) -> str:
+    """태그/문서/HTML 문자열 → 한 블록당 한 줄인 간결한 HTML"""
+    if isinstance(node, str):
+        node = html_doc.fragment(node)
+    body = _compact(node)
+    blocks, pos = [], 0
+
+    def loose(chunk):
+        # 블록 태그 밖에 남은 맨 텍스트는 줄 단위로 <p>로 감쌈
+        for line in chunk.split("\n"):
+            line = _WS.sub(" ", line).strip()
+            if line:
+                blocks.append(f"<p>{line}</p>")
+
+    for m in _BLOCK_RE.finditer(body):
+        loose(body[pos:m.start()])
+        blocks.append(_WS.sub(" ", m.group(0)).strip())
+        pos = m.end()
+    loose(body[pos:])
+    return "\n".join(blocks)
+
+
+# ────────── 예산 맞추기 ──────────
+def fit_budget(blocks: list[str], budget: int, model: str) -> list[str]:
+    """앞 2블록(리드)과 마지막 블록은 지키고 가운데부터 문단 단위로 제거"""
+    costs = [count_tokens(b, model) for b in blocks]
+    if sum(costs) <= budget:
+        return blocks
+    head, tail = 2, 1
+    keep = list(range(len(blocks)))
+    middle = keep[head:len(keep) - tail] if len(keep) > head + tail else []
+    total = sum(costs)
+    # 가운데 뒤쪽부터 제거 (앞쪽 맥락이 기사 이해에 더 중요)
+    for i in reversed(middle):
+        if total <= budget:
+            break
+        keep.remove(i)
+        total -= costs[i]
+    out, prev = [], None
+    for i in keep:
+        if prev is not None and i != prev + 1:
+            out.append("<p>…(중략)…</p>")
+        out.append(blocks[i])
+        prev = i
+    # 그래도 넘치면(거대한 단일 문단) 마지막 블록부터 글자 수로 자름
+    while out and sum(count_tokens(b, model) for b in out) > budget:
+        over = out.pop()
+        room = budget - sum(count_tokens(b, model) for b in out)
+        if room > 20:
+            out.append(over[: max(0, int(len(over) * room / max(1, count_tokens(over, model))))] + "…")
+            break
+    return out
+
+
+def prepare(article: dict, model: str = "gpt-4o") -> str:
+    """article → 프롬프트에 한 번만 넣을 본문 (article['compact:<모델>']에 캐시)"""
+    key = f"compact:{model}"
+    if key in article:
+        return article[key]
+    src = getattr(article, "doc", None)
+    body = compact_html(src if src is not None else article["html"])
+    budget = BUDGET.get(model, DEFAULT_BUDGET)
+    blocks = body.split("\n")
+    fitted = fit_budget(blocks, budget, model)
+    if len(fitted) != len(blocks):
+        logging.info("  ✂️ 원문 %d → %d블록 (예산 %d토큰)", len(blocks), len(fitted), budget)
+    article[key] = "\n".join(fitted)
+    return article[key]
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+호스트·모델별 적응형 동시성 제한 (AIMD)
+• Limiter: 동시에 나가는 요청 수 상한. 성공하면 조금씩(+1/상한) 늘리고,
+  429·503 또는 남은 요청 수가 바닥나면 절반으로 줄이고 Retry-After만큼 모든 스레드가 함께 쉼
+• TokenBudget: 모델별 분당 토큰(TPM) 예산. OpenAI x-ratelimit-*-tokens 헤더로 한도·잔량을 배우고,
+  요청 전 예상 토큰을 예약 → 응답 usage로 정산. 토큰 429면 쓰는 비율을 절반으로 (AIMD)
+• http_client가 호스트별 Limiter를 자동으로, gpt.chat이 모델별 Limiter(+TokenBudget)를 넘겨 사용
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import deque
+import metrics
+import preprocess
+
+# ────────── 환경 변수 ──────────
+def _pairs(raw: str) -> dict:
+    """ "키=값,키=값" → {키: float} """
+    return {k.strip(): float(v) for k, _, v in (x.partition("=") for x in raw.split(",") if "=" in x)}
+
+
+HOST_START   = _pairs(os.getenv("RATE_HOST_INFLIGHT", ""))                   # 호스트별 시작 동시 요청 수
+MODEL_START  = _pairs(os.getenv("RATE_MODEL_INFLIGHT", "gpt-4o=4,gpt-4o-mini=8"))
+MODEL_TPM    = _pairs(os.getenv("GPT_TPM", ""))                               # 헤더를 보기 전 TPM 가정값
+DEFAULT_START = float(os.getenv("RATE_DEFAULT_INFLIGHT", "8"))
+MAX_INFLIGHT = float(os.getenv("RATE_MAX_INFLIGHT", "32"))
+BACKOFF      = float(os.getenv("RATE_DECREASE", "0.5"))          # 감소 배율
+TPM_SHARE    = float(os.getenv("GPT_TPM_SHARE", "0.9"))          # 한도 중 쓸 최대 비율
+PAUSE_MAX    = float(os.getenv("RATE_PAUSE_MAX", "60"))          # 한 번에 쉬는 최대 시간(초)
+
+THROTTLE_STATUS = {429, 503}
+
+
+def _seconds(v: str | None) -> float | None:
+    """'1.5', '6m0s', '20ms', '1h2m3s' → 초"""
+    if not v:
+        return None
+    try:
+        return max(0.0, float(v))
+    except ValueError:
+        pass
+    total, found = 0.0, False
+    for num, unit in re.findall(r"([\d.]+)(ms|h|m|s)", v):
+        total += float(num) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+        found = True
+    return total if found else None
+
+
+def _int(v: str | None) -> int | None:
+    try:
+        return int(float(v)) if v is not None else None
+    except ValueError:
+        return None
+
+
+# ────────── 분당 토큰 예산 ──────────
+class TokenBudget:
+    """최근 60초 사용량(예약 포함) + 서버가 알려 준 잔량 안에서만 새 요청 허용"""
+
+    def __init__(self, name: str, tpm: float = 0):
+        self.name  = name
+        self.tpm   = tpm            # 0: 아직 모름 → 제한 없음
+        self.share = TPM_SHARE
+        self.used  = deque()        # (monotonic, 토큰)
+        self.remaining = None       # 서버 잔량
+        self.reset_at  = 0.0
+        self.cond  = threading.Condition()
+
+    def _window(self, now: float) -> float:
+        while self.used and now - self.used[0][0] > 60:
+            self.used.popleft()
+        return sum(n for _, n in self.used)
+
+    def _wait_time(self, n: int, now: float) -> float:
+        if self.remaining is not None and now < self.reset_at and self.remaining < n:
+            return self.reset_at - now
+        if self.tpm:
+            cap = self.tpm * self.share
+            used = self._window(now)
+            if used and used + n > cap:
+                return max(0.05, 60 - (now - self.used[0][0]))
+        return 0.0
+
+    def reserve(self, n: int) -> tuple:
+        """n 토큰 예약 (예산이 날 때까지 대기). 반환 토큰은 settle()에 넘김"""
+        with self.cond:
+            while True:
+                now  = time.monotonic()
+                wait = self._wait_time(n, now)
+                if wait <= 0:
+                    break
+                logging.debug("⏳ %s 토큰 예산 대기 %.1fs (예약 %d)", self.name, wait, n)
+                self.cond.wait(min(wait, PAUSE_MAX))
+            ticket = (now, n)
+            self.used.append(ticket)
+            if self.remaining is not None:
+                self.remaining -= n
+            return ticket
+
+    def settle(self, ticket: tuple, actual: int | None):
+        """예약을 실제 사용량으로 바꿈 (모르면 예약값 유지)"""
+        if actual is None:
+            return
+        with self.cond:
+            try:
+                i = self.used.index(ticket)
+            except ValueError:
+                return
+            self.used[i] = (ticket[0], actual)
+            if self.remaining is not None:
+                self.remaining += ticket[1] - actual
+            self.cond.notify_all()
+
+    def observe(self, headers, throttled: bool = False):
+        """x-ratelimit-limit/remaining/reset-tokens 반영, 토큰 429면 사용 비율 절반"""
+        limit = _int(headers.get("x-ratelimit-limit-tokens"))
+        left  = _int(headers.get("x-ratelimit-remaining-tokens"))
+        reset = _seconds(headers.get("x-ratelimit-reset-tokens"))
+        with self.cond:
+            if limit:
+                self.tpm = limit
+            if left is not None:
+                self.remaining = left
+                self.reset_at  = time.monotonic() + (reset if reset is not None else 60)
+            if throttled:
+                self.share = max(0.1, self.share * BACKOFF)
+                logging.info("🐢 %s 토큰 한도 초과 → TPM %.0f%%만 사용", self.name, self.share * 100)
+            else:
+                self.share = min(TPM_SHARE, self.share + 0.02)
+            self.cond.notify_all()
+
+
+# ────────── 동시 요청 수 (AIMD) ──────────
+class Limiter:
+    """동시 요청 상한을 성공 시 가산 증가, 스로틀 시 곱셈 감소"""
+
+    def __init__(self, name: str, start: float, tokens: TokenBudget = None):
+        self.name     = name
+        self.limit    = max(1.0, start)
+        self.inflight = 0
+        self.pause_until = 0.0
+        self.last_cut = 0.0
+        self.tokens   = tokens
+        self.cond     = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self.pause_until - time.monotonic()
+                if wait <= 0 and self.inflight < int(self.limit):
+                    break
+                self.cond.wait(wait if wait > 0 else None)
+            self.inflight += 1
+
+    def release(self):
+        with self.cond:
+            self.inflight -= 1
+            self.cond.notify_all()
+
+    def _cut(self, pause: float | None):
+        now = time.monotonic()
+        with self.cond:
+            # 같은 순간 몰려온 스로틀 응답들로 여러 번 깎지 않도록 1초에 한 번만
+            if now - self.last_cut >= 1.0:
+                self.limit = max(1.0, self.limit * BACKOFF)
+                self.last_cut = now
+                metrics.incr("throttled", target=self.name)
+                logging.info("🐢 %s 스로틀 → 동시 요청 %d개로", self.name, int(self.limit))
+            if pause:
+                self.pause_until = max(self.pause_until, now + min(pause, PAUSE_MAX))
+
+    def _grow(self):
+        with self.cond:
+            before = int(self.limit)
+            self.limit = min(MAX_INFLIGHT, self.limit + 1 / self.limit)
+            if int(self.limit) > before:
+                self.cond.notify_all()
+
+    def feedback(self, resp):
+        """응답 상태·x-ratelimit-*·Retry-After → 상한 조정 (토큰 예산도 갱신)"""
+        h = resp.headers
+        throttled = resp.status_code in THROTTLE_STATUS
+        if self.tokens is not None:
+            # 요청 수는 남았는데 429 → 토큰 한도 (헤더가 없으면 판단 보류)
+            left_tok = _int(h.get("x-ratelimit-remaining-tokens"))
+            left_req = _int(h.get("x-ratelimit-remaining-requests"))
+            token_hit = throttled and (left_tok == 0 or (left_req or 0) > 0)
+            self.tokens.observe(h, token_hit)
+        if throttled:
+            self._cut(_seconds(h.get("Retry-After")) or _seconds(h.get("x-ratelimit-reset-requests")))
+            return
+        left = _int(h.get("x-ratelimit-remaining-requests"))
+        if left is not None and left <= 0:
+            self._cut(_seconds(h.get("x-ratelimit-reset-requests")) or 1.0)
+            return
+        if resp.status_code < 500:
+            self._grow()
+
+    def state(self) -> dict:
+        out = {"limit": round(self.limit, 2), "inflight": self.inflight}
+        if self.tokens is not None:
+            out.update(tpm=self.tokens.tpm, share=round(self.tokens.share, 2))
+        return out
+
+
+# ────────── 레지스트리 ──────────
+_limiters = {}
+_reg_lock = threading.Lock()
+
+
+def _get(key: str, make) -> Limiter:
+    lim = _limiters.get(key)
+    if lim is None:
+        with _reg_lock:
+            lim = _limiters.get(key)
+            if lim is None:
+                lim = _limiters[key] = make()
+    return lim
+
+
+def host(name: str) -> Limiter:
+    return _get("host:" + name, lambda: Limiter(name, HOST_START.get(name, DEFAULT_START)))
+
+
+def model(name: str) -> Limiter:
+    return _get("model:" + name, lambda: Limiter(
+        name, MODEL_START.get(name, DEFAULT_START), TokenBudget(name, MODEL_TPM.get(name, 0))))
+
+
+def _rough_tokens(text: str) -> int:
+    """tiktoken 없을 때 넉넉한 근사: 한글·한자 등 1자 ≈ 1토큰, 키릴 2자, ASCII 3자"""
+    ascii_n = sum(1 for ch in text if ord(ch) < 128)
+    cyr_n   = sum(1 for ch in text if "Ѐ" <= ch <= "ӿ")
+    return len(text) - ascii_n - cyr_n + cyr_n // 2 + ascii_n // 3 + 1
+
+
+def estimate_tokens(data: dict) -> int:
+    """
+    요청 토큰 추정 = 메시지별 토큰(+4) + max_tokens.
+    모자라게 잡으면 TPM 예산을 넘겨 429가 나므로 tiktoken이 있으면 실제 인코딩, 없으면 _rough_tokens
+    """
+    model = data.get("model") or "gpt-4o"
+    n = 0
+    for m in data.get("messages", []):
+        text = str(m.get("content", ""))
+        n += 4 + (preprocess.count_tokens(text, model) if preprocess.tiktoken else _rough_tokens(text))
+    return n + int(data.get("max_tokens") or 1000)
+
+
+def snapshot() -> dict:
+    with _reg_lock:
+        return {k: lim.state() for k, lim in _limiters.items()}
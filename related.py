@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+관련 기사 로컬 인덱스
+• 게시된 글마다 (링크 · 제목 · 태그 ID · 상위 단어 빈도)를 state.db related_posts 테이블에 보관
+• wp_index 갱신 때 받은 글로 채우고, 게시 직후 add()로 즉시 반영
+• 순위 = RELATED_TAG_WEIGHT × 태그 자카드 + 나머지 × TF-IDF 코사인 → 상위 RELATED_N건
+  (publish() 때마다 하던 GET /posts?tags=… 호출 대체)
+"""
+
+import os
+import re
+import json
+import math
+import time
+import logging
+import threading
+from collections import Counter
+import state_store
+
+# ────────── 환경 변수 ──────────
+TOP_N      = int(os.getenv("RELATED_N", "3"))
+TAG_WEIGHT = float(os.getenv("RELATED_TAG_WEIGHT", "0.4"))
+MIN_SCORE  = float(os.getenv("RELATED_MIN_SCORE", "0.08"))
+MAX_TERMS  = 60             # 글당 보관할 단어 수 (빈도 상위)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS related_posts (
+    post_id    INTEGER PRIMARY KEY,
+    link       TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    tags       TEXT NOT NULL,
+    terms      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_WORD_RE  = re.compile(r"[가-힣]{2,}|[0-9a-zа-яёіў]{3,}")
+_JOSA     = set("은는이가을를의에도로와과")
+_TAG_RE   = re.compile(r"<[^>]+>")
+
+
+# ────────── 단어 ──────────
+def terms(text: str) -> Counter:
+    """소문자 단어 빈도 (한글은 끝 조사 한 글자 제거)"""
+    out = Counter()
+    for w in _WORD_RE.findall(text.lower()):
+        if len(w) > 2 and w[-1] in _JOSA and "가" <= w[0] <= "힣":
+            w = w[:-1]
+        out[w] += 1
+    return out
+
+
+def _top(c: Counter) -> dict:
+    return dict(c.most_common(MAX_TERMS))
+
+
+# ────────── 인덱스 ──────────
+class RelatedIndex:
+    """post id → (링크, 제목, 태그, 단어 빈도) + 문서 빈도(df)"""
+
+    def __init__(self):
+        self.docs = {}            # post_id → {"link", "title", "tags": set, "terms": dict}
+        self.df   = Counter()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        state_store.ensure_schema(_SCHEMA)
+        for pid, link, title, tags, tm in state_store.conn().execute(
+                "SELECT post_id, link, title, tags, terms FROM related_posts"):
+            self._put(pid, link, title, json.loads(tags), json.loads(tm))
+
+    def _put(self, pid, link, title, tags, tm):
+        old = self.docs.get(pid)
+        if old:
+            self.df.subtract(old["terms"].keys())
+        self.docs[pid] = {"link": link, "title": title, "tags": set(tags), "terms": tm}
+        self.df.update(tm.keys())
+
+    def __len__(self):
+        return len(self.docs)
+
+    # ── 쓰기 ──────────
+    def add(self, post_id: int, link: str, title: str, tag_ids: list[int], body: str):
+        """방금 게시한 글 반영 (body는 HTML이어도 됨)"""
+        self.update([{"id": post_id, "link": link, "title": title, "tags": tag_ids, "text": body}])
+
+    def update(self, posts: list[dict], full: bool = False):
+        """
+        wp_index 갱신 결과 반영. posts 항목: id · link · title · tags · text(또는 WP content)
+        full=True면 목록에 없는 글(삭제·휴지통)은 지움
+        """
+        rows = []
+        with self._lock:
+            if full:
+                keep = {p["id"] for p in posts}
+                for pid in [pid for pid in self.docs if pid not in keep]:
+                    self.df.subtract(self.docs.pop(pid)["terms"].keys())
+            for p in posts:
+                title = p.get("title") or ""
+                text  = _TAG_RE.sub(" ", p.get("text") or "")
+                tm    = _top(terms(title + " " + title + " " + text))   # 제목 가중 2배
+                tags  = [int(t) for t in p.get("tags") or []]
+                self._put(p["id"], p.get("link") or "", title, tags, tm)
+                rows.append((p["id"], p.get("link") or "", title,
+                             json.dumps(tags), json.dumps(tm, ensure_ascii=False), time.time()))
+            self.df += Counter()          # 0 이하 항목 정리
+        with state_store.tx() as c:
+            if full:
+                c.execute("DELETE FROM related_posts")
+            c.executemany(
+                "INSERT OR REPLACE INTO related_posts(post_id, link, title, tags, terms, updated_at) "
+                "VALUES(?, ?, ?, ?, ?, ?)", rows)
+        if full or len(rows) > 1:
+            logging.debug("🔗 관련 기사 인덱스 %d건 (%s %d건)", len(self.docs),
+                          "전체" if full else "증분", len(rows))
+
+    # ── 조회 ──────────
+    def _vec(self, tm: dict) -> dict:
+        n = len(self.docs) + 1
+        v = {t: (1 + math.log(c)) * math.log(n / (1 + self.df.get(t, 0)) + 1) for t, c in tm.items()}
+        norm = math.sqrt(sum(x * x for x in v.values())) or 1.0
+        return {t: x / norm for t, x in v.items()}
+
+    def top(self, title: str, body: str, tag_ids: list[int], n: int = None,
+            exclude: set = ()) -> list[dict]:
+        """관련도 순 상위 n건 [{"id", "link", "title", "score"}]"""
+        n = TOP_N if n is None else n
+        text = _TAG_RE.sub(" ", body or "")
+        with self._lock:
+            q    = self._vec(_top(terms(title + " " + title + " " + text)))
+            tags = set(tag_ids or [])
+            scored = []
+            for pid, d in self.docs.items():
+                if pid in exclude or not d["link"]:
+                    continue
+                dv  = self._vec(d["terms"])
+                cos = sum(w * dv.get(t, 0.0) for t, w in q.items())
+                jac = len(tags & d["tags"]) / len(tags | d["tags"]) if tags and d["tags"] else 0.0
+                score = TAG_WEIGHT * jac + (1 - TAG_WEIGHT) * cos
+                if score >= MIN_SCORE:
+                    scored.append((score, pid, d))
+        scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
+        return [{"id": pid, "link": d["link"], "title": d["title"], "score": round(s, 3)}
+                for s, pid, d in scored[:n]]
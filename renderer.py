@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPT 출력 → 최종 본문 HTML (BeautifulSoup 파싱·재직렬화 없이 한 번에)
+• 줄 규칙: 코드 펜스·📰·'소제목' 줄 제거, Markdown #~###### → <h1>~<h3> (미리 컴파일한 정규식 한 번)
+• 태그 토큰을 한 번 훑으며 첫 <h1>, 짧은 Q&A 답변(<li><strong>A.…), 첫 <img>, 평문을 함께 수집
+• 답변 교체 → 제목 교체 → 이미지 캡션 삽입을 토큰 목록에서 바로 하고 이어 붙임
+  (손대지 않은 원문 마크업은 그대로 통과)
+• GPT가 필요한 두 곳(답변 확장·한국어 제목)은 호출부가 콜백으로 넘김
+"""
+
+import re
+from html import escape, unescape
+
+# ────────── 미리 컴파일한 패턴 ──────────
+# 한 줄 단위: (버릴 줄) | (# 헤더). 줄바꿈까지 함께 잡아 버릴 줄은 통째로 사라지게
+_LINE_RE = re.compile(
+    r"^[^\S\n]*(?:(?:```|📰)[^\n]*|[^\n]*소제목[^\n]*|(#{1,6})[^\S\n]*([^\n]*?)[^\S\n]*)$(\n?)",
+    re.M)
+_TOKEN_RE = re.compile(
+    r"<!--.*?-->"                                           # 주석 (평문 아님)
+    r"|<(/?)([A-Za-z][^\s/>]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>"   # 시작·끝 태그
+    r"|[^<]+|<",                                            # 텍스트 (짝 없는 '<' 포함)
+    re.S)
+_SENT_RE = re.compile(r"[.!?]")
+_ANS_RE  = re.compile(r"^A\.\s*")
+_WS_RE   = re.compile(r"\s+")
+
+VOID = frozenset("area base br col embed hr img input link meta param source track wbr".split())
+CAPTION = "<em>Photo: UDF.name</em>"
+
+
+def _line(m: re.Match) -> str:
+    if m.group(1) is None:
+        return ""                                   # 버릴 줄
+    level = min(len(m.group(1)), 3)                 # 최대 h3
+    return f"<h{level}>{m.group(2)}</h{level}>{m.group(3)}"
+
+
+def lines(txt: str) -> str:
+    """줄 규칙만 적용 (splitlines → join 과 같은 결과: 끝 줄바꿈 없음)"""
+    out = _LINE_RE.sub(_line, txt.replace("\r\n", "\n").replace("\r", "\n"))
+    return out[:-1] if out.endswith("\n") else out
+
+
+# ────────── 토큰 한 번 훑기 ──────────
+class _Span:
+    """시작 토큰 ~ 끝 토큰 (끝 태그가 없으면 부모가 닫힐 때 직전 토큰까지)"""
+    __slots__ = ("start", "end", "texts", "strong")
+
+    def __init__(self, start: int):
+        self.start, self.end, self.texts, self.strong = start, None, [], None
+
+
+def _scan(markup: str):
+    """
+    → (토큰 목록, 텍스트 토큰 [(번호, 평문)], 첫 h1 _Span, 닫힌 li _Span 목록, 첫 img 번호, em 형제 여부)
+    태그 스택은 html.parser 트리빌더처럼: 끝 태그는 같은 이름이 열려 있을 때만 그까지 닫음
+    """
+    toks  = []
+    stack = []          # (태그 이름, _Span 또는 None)
+    texts = []
+    h1 = None
+    lis, open_li = [], []
+    img, img_depth, img_em = None, 0, False
+
+    for i, m in enumerate(_TOKEN_RE.finditer(markup)):
+        tok = m.group(0)
+        toks.append(tok)
+        if m.group(2) is None:
+            if tok.startswith("<!--"):
+                continue
+            # 텍스트
+            t = unescape(tok)
+            texts.append((i, t))
+            for li in open_li:
+                li.texts.append(t)
+            for name, sp in stack:
+                if sp is not None and name != "li":
+                    sp.texts.append(t)
+            continue
+        end, name, attrs = m.group(1), m.group(2).lower(), m.group(3)
+        if end:
+            if not any(n == name for n, _ in stack):
+                toks[i] = ""                                # 짝 없는 끝 태그는 버림 (soup과 같게)
+                continue
+            while stack:
+                n, sp = stack.pop()
+                if sp is not None:
+                    sp.end = i if n == name else i - 1
+                    if n == "li":
+                        open_li.remove(sp)
+                        lis.append(sp)
+                if img is not None and len(stack) < img_depth:
+                    img_depth = -1                          # img 부모가 닫힘 → 형제 검사 끝
+                if n == name:
+                    break
+            continue
+
+        if name == "img" and img is None:
+            img, img_depth = i, len(stack)
+        elif name == "em" and img is not None and len(stack) == img_depth:
+            img_em = True
+        if name in VOID or attrs.rstrip().endswith("/"):
+            continue
+        sp = None
+        if name == "h1" and h1 is None:
+            sp = h1 = _Span(i)
+        elif name == "li":
+            sp = _Span(i)
+            open_li.append(sp)
+        elif name == "strong":
+            for li in open_li:
+                if li.strong is None:
+                    li.strong = sp = sp or _Span(i)
+        stack.append((name, sp))
+
+    last = len(toks) - 1
+    for n, sp in stack:                                     # 끝까지 안 닫힌 태그
+        if sp is not None and sp.end is None:
+            sp.end = last
+            if n == "li":
+                lis.append(sp)
+    return toks, texts, h1, lis, img, img_depth, img_em
+
+
+def _thin(lis: list) -> list[_Span]:
+    """'<strong>A.' 로 시작하고 문장부호가 2개 미만인 li (문서 순서, 겹치면 바깥 것만)"""
+    out = []
+    for li in sorted(lis, key=lambda s: s.start):
+        st = li.strong
+        if st is None or st.end is None or (out and li.start <= out[-1].end):
+            continue
+        if not "".join(t.strip() for t in st.texts).startswith("A."):
+            continue
+        if len(_SENT_RE.findall("".join(li.texts))) < 2:
+            out.append(li)
+    return out
+
+
+# ────────── 진입점 ──────────
+def render(txt: str, *, url: str, image: str = None, fallback_title: str = "",
+           title: str = None, expand=None, retitle=None) -> tuple[str, str]:
+    """
+    GPT 결과 → (최종 제목, 본문 HTML).
+    expand(답변 평문 목록) → {번호: 확장문}  (짧은 Q&A 답변이 있을 때만 호출)
+    retitle(원제목, 본문 평문) → 제목      (title이 없을 때만 호출)
+    """
+    toks, texts, h1, lis, img, img_depth, img_em = _scan(lines(txt))
+    thin = _thin(lis)
+
+    # 1) 짧은 답변 확장 → li 안쪽을 <strong>머리</strong> + 확장문으로
+    done = {}
+    if thin and expand:
+        done = expand([" ".join(s for t in li.texts if (s := t.strip())) for li in thin]) or {}
+    repl, drop = {}, set()
+    for k, li in enumerate(thin):
+        if k not in done:
+            continue
+        new = _ANS_RE.sub("", done[k])
+        st  = li.strong
+        repl[li.start] = (toks[li.start] + "".join(toks[st.start:st.end + 1]) + " "
+                          + escape(new, quote=False) + "</li>")
+        drop.update(range(li.start + 1, li.end + 1))
+        texts = [(i, t) for i, t in texts if not (li.start < i <= li.end) or st.start < i <= st.end]
+        texts.append((li.end, new))
+    if done:
+        texts.sort(key=lambda x: x[0])
+
+    # 2) 제목: 첫 <h1>을 빼고 맨 앞에 새 <h1>
+    if h1 is not None:
+        drop.update(range(h1.start, h1.end + 1))
+    if not title:
+        orig = "".join(t.strip() for t in h1.texts) if h1 is not None else fallback_title
+        if retitle:
+            context = _WS_RE.sub(" ", " ".join(s for _, t in texts if (s := t.strip())))
+            title = retitle(orig, context)
+        else:
+            title = orig
+
+    # 3) 대표 이미지가 있으면 본문 첫 <img> 뒤 캡션 (이미 <em> 형제가 있으면 생략)
+    if image and img is not None and not img_em:
+        repl[img] = toks[img] + CAPTION
+
+    out = [f"<h1>{escape(title, quote=False)}</h1>"]
+    out += [repl.get(i, tok) for i, tok in enumerate(toks) if i not in drop or i in repl]
+    hidden  = f'<a href="{url}" style="display:none">src</a>\n'
+    img_tag = f'<p><img src="{image}" alt=""></p>\n' if image else ""
+    return title, hidden + img_tag + "".join(out)
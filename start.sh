@@ -1,2 +1,3 @@
 #!/bin/bash
-python3 udf.name.py
+# 한 번 실행: ./start.sh   상주 실행: ./start.sh --daemon
+exec python3 udf.name.py "$@"
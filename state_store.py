@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 상태 저장소
+• seen URL을 행 단위로 저장 (원문 URL · WP post id · 시각) → 기사당 O(1) INSERT
+• 트랜잭션 커밋이라 쓰기 도중 프로세스가 죽어도 파일이 깨지지 않음
+• 기존 seen_urls.json 은 첫 실행 때 자동 이관
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+# ────────── 환경 변수 ──────────
+DB_PATH   = os.getenv("STATE_DB", "state.db")
+SEEN_JSON = os.getenv("SEEN_FILE", "seen_urls.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    url          TEXT PRIMARY KEY,
+    post_id      INTEGER,
+    first_seen   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_post_id ON seen(post_id);
+-- 예전 DB의 content_hash 열은 쓰지 않음 (거의 같은 기사 판정은 dedupe.fingerprints)
+DROP INDEX IF EXISTS seen_hash;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_local       = threading.local()
+_schema_lock = threading.Lock()
+_schemas     = set()
+_journal     = {}       # 경로 → journal_mode (기본 WAL)
+
+
+# ────────── 연결 관리 ──────────
+def use_journal(path: str, mode: str):
+    """path를 WAL 대신 mode(DELETE 등)로 열도록 지정 — 그 파일에 첫 연결을 만들기 전에 호출"""
+    _journal[path] = mode
+
+
+def conn(path: str = None) -> sqlite3.Connection:
+    """스레드별 연결 (기본 WAL 모드, 명시적 트랜잭션)"""
+    path = path or DB_PATH
+    pool = getattr(_local, "conns", None)
+    if pool is None:
+        pool = _local.conns = {}
+    c = pool.get(path)
+    if c is None:
+        c = sqlite3.connect(path, timeout=30, isolation_level=None)
+        mode = _journal.get(path, "WAL")
+        c.execute(f"PRAGMA journal_mode={mode}")
+        # WAL이 아니면 커밋마다 디스크까지 (NORMAL은 WAL에서만 안전)
+        c.execute("PRAGMA synchronous=" + ("NORMAL" if mode == "WAL" else "FULL"))
+        c.execute("PRAGMA busy_timeout=30000")
+        if path == DB_PATH:
+            c.executescript(_SCHEMA)
+        pool[path] = c
+    return c
+
+
+def ensure_schema(sql: str, path: str = None):
+    """모듈별 테이블 정의를 한 번만 실행"""
+    path = path or DB_PATH
+    key = (path, sql)
+    if key in _schemas:
+        return
+    with _schema_lock:
+        if key not in _schemas:
+            conn(path).executescript(sql)
+            _schemas.add(key)
+
+
+@contextmanager
+def tx(path: str = None):
+    """BEGIN IMMEDIATE … COMMIT (예외 시 ROLLBACK)"""
+    c = conn(path)
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        yield c
+    except BaseException:
+        c.execute("ROLLBACK")
+        raise
+    c.execute("COMMIT")
+
+
+# ────────── key/value 메타 ──────────
+def get_meta(key: str, default=None):
+    row = conn().execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+
+def set_meta(key: str, value, c: sqlite3.Connection = None):
+    (c or conn()).execute(
+        "INSERT INTO meta(key, value) VALUES(?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        (key, json.dumps(value, ensure_ascii=False)))
+
+
+# ────────── seen 저장소 ──────────
+class SeenStore:
+    """처리 완료 URL 집합 (set 과 같은 in / add / discard 인터페이스)"""
+
+    def __init__(self, path: str = None):
+        self.path = path or DB_PATH
+        self._migrate_json()
+
+    def _migrate_json(self):
+        if not os.path.exists(SEEN_JSON):
+            return
+        try:
+            with open(SEEN_JSON, encoding="utf-8") as f:
+                urls = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("seen JSON 이관 실패(%s): %s", SEEN_JSON, e)
+            return
+        now = time.time()
+        with tx(self.path) as c:
+            c.executemany(
+                "INSERT OR IGNORE INTO seen(url, first_seen, updated_at) VALUES(?, ?, ?)",
+                [(u, now, now) for u in urls])
+        os.replace(SEEN_JSON, SEEN_JSON + ".migrated")
+        logging.info("📦 %s → %s 이관 완료: %d건", SEEN_JSON, self.path, len(urls))
+
+    def __contains__(self, url: str) -> bool:
+        return conn(self.path).execute(
+            "SELECT 1 FROM seen WHERE url=?", (url,)).fetchone() is not None
+
+    def __iter__(self):
+        return iter([r[0] for r in conn(self.path).execute("SELECT url FROM seen")])
+
+    def __len__(self):
+        return conn(self.path).execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def add(self, url: str, post_id: int = None):
+        now = time.time()
+        conn(self.path).execute(
+            "INSERT INTO seen(url, post_id, first_seen, updated_at) VALUES(?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET "
+            "  post_id=COALESCE(excluded.post_id, post_id), "
+            "  updated_at=excluded.updated_at",
+            (url, post_id, now, now))
+
+    def discard_many(self, urls):
+        with tx(self.path) as c:
+            c.executemany("DELETE FROM seen WHERE url=?", [(u,) for u in urls])
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WP 태그 이름 → ID 캐시 (udf.name.tag_id · yoast_meta.sync_tags 공용)
+• 최초 1회 /wp/v2/tags 전체를 페이지네이션으로 미리 읽어 SQLite에 보관
+• 이후엔 id 워터마크보다 새 태그만 내림차순으로 읽어 증분 갱신
+• 캐시에 없는 "진짜 새 이름"만 POST (term_exists 응답도 캐시에 반영)
+• 새 이름이 여럿이면 /batch/v1 한 번에 최대 BATCH_MAX개씩 생성
+  (WP 5.6 미만 등 배치를 못 쓰면 기억해 두고 이름별 POST로 대체)
+"""
+
+import os
+import html
+import time
+import logging
+import threading
+import requests
+import http_client
+import state_store
+
+# ────────── 환경 변수 ──────────
+WP_URL     = os.getenv("WP_URL", "https://belatri.info").rstrip("/")
+USER       = os.getenv("WP_USERNAME")
+APP_PW     = os.getenv("WP_APP_PASSWORD")
+TAGS_API   = f"{WP_URL}/wp-json/wp/v2/tags"
+BATCH_API  = f"{WP_URL}/wp-json/batch/v1"
+BATCH_MAX  = 25             # WP batch/v1 기본 요청 수 상한
+FULL_EVERY = float(os.getenv("TAG_CACHE_FULL_HOURS", "168")) * 3600   # 전체 재적재 주기(초)
+PER_PAGE   = 100
+RETRY_SECONDS = float(os.getenv("TAG_CACHE_RETRY_SECONDS", "300"))    # 미리 읽기 실패 후 재시도 간격
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (
+    name TEXT PRIMARY KEY,
+    id   INTEGER NOT NULL
+);
+"""
+
+_lock   = threading.Lock()
+_loaded = False
+_retry_at = 0.0             # 미리 읽기 실패 시 다음 시도 시각 (monotonic)
+
+
+# ────────── 캐시 입출력 ──────────
+def _cached(name: str) -> int | None:
+    row = state_store.conn().execute("SELECT id FROM tags WHERE name=?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _store(pairs, c=None):
+    (c or state_store.conn()).executemany(
+        "INSERT INTO tags(name, id) VALUES(?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET id=excluded.id", pairs)
+
+
+# ────────── 미리 읽기 ──────────
+def refresh(force_full: bool = False) -> bool:
+    """전체 또는 워터마크 이후 태그를 읽어 캐시 갱신"""
+    global _loaded, _retry_at
+    state_store.ensure_schema(_SCHEMA)
+    watermark = state_store.get_meta("tags.max_id", 0)
+    full = (force_full or not watermark or
+            time.time() - state_store.get_meta("tags.full_at", 0) > FULL_EVERY)
+
+    params = {"per_page": PER_PAGE, "orderby": "id",
+              "order": "asc" if full else "desc", "_fields": "id,name",
+              "hide_empty": "false"}
+    pairs, top, page, calls = [], watermark, 1, 0
+    try:
+        while True:
+            r = http_client.get(TAGS_API, params={**params, "page": page},
+                                auth=(USER, APP_PW), timeout=30)
+            calls += 1
+            if r.status_code == 400 and page > 1:
+                break
+            r.raise_for_status()
+            batch = r.json()
+            pairs += [(html.unescape(t["name"]), t["id"]) for t in batch]
+            top = max([top] + [t["id"] for t in batch])
+            # 증분: 이미 아는 id까지 내려왔으면 중단
+            if not full and any(t["id"] <= watermark for t in batch):
+                break
+            if page >= int(r.headers.get("X-WP-TotalPages", 1)):
+                break
+            page += 1
+    except (requests.RequestException, ValueError) as e:
+        logging.warning("태그 캐시 갱신 실패: %s", e)
+        # 캐시만으로 진행(없는 이름은 POST로 확인), RETRY_SECONDS 뒤 다시 미리 읽기
+        _retry_at = time.monotonic() + RETRY_SECONDS
+        return False
+
+    with state_store.tx() as c:
+        if full:
+            c.execute("DELETE FROM tags")
+            state_store.set_meta("tags.full_at", time.time(), c)
+        _store(pairs, c)
+        state_store.set_meta("tags.max_id", top, c)
+    _loaded = True
+    logging.info("🏷️ 태그 캐시 %s 갱신: +%d (HTTP %d회)", "전체" if full else "증분", len(pairs), calls)
+    return True
+
+
+def _ensure_loaded():
+    if not _loaded and time.monotonic() >= _retry_at:
+        with _lock:
+            if not _loaded and time.monotonic() >= _retry_at:
+                refresh()
+
+
+# ────────── 이름 → ID ──────────
+def resolve(name: str, slug: str = None) -> int | None:
+    """
+    - 캐시에 있으면 네트워크 없이 반환
+    - 없으면 생성, 'term_exists' 에러면 그 term_id 사용
+    """
+    _ensure_loaded()
+    tid = _cached(name)
+    if tid:
+        return tid
+
+    with _lock:                 # 같은 이름을 두 스레드가 동시에 만들지 않도록
+        tid = _cached(name)
+        if tid:
+            return tid
+        payload = {"name": name}
+        if slug:
+            payload["slug"] = slug
+        c = http_client.post(TAGS_API, json=payload, auth=(USER, APP_PW), timeout=10)
+
+        if c.status_code == 201:
+            tid = c.json().get("id")
+        elif c.status_code == 400 and c.json().get("code") == "term_exists":
+            tid = c.json()["data"]["term_id"]
+        else:
+            logging.warning("태그 '%s' 처리 실패: %s %s", name, c.status_code, c.text)
+            return None
+        _store([(name, tid)])
+        return tid
+
+
+def _batch_create(items: list[tuple[str, str | None]]) -> dict[str, int] | None:
+    """
+    새 태그 여러 개를 batch/v1 한 번으로 생성 → {이름: id}.
+    배치를 쓸 수 없으면 None (미지원이면 FULL_EVERY 동안 기억)
+    """
+    reqs = [{"method": "POST", "path": "/wp/v2/tags",
+             "body": {"name": n, **({"slug": s} if s else {})}} for n, s in items]
+    try:
+        r = http_client.post(BATCH_API, json={"requests": reqs}, auth=(USER, APP_PW), timeout=30)
+        if r.status_code in (404, 405, 501):
+            logging.info("🏷️ batch/v1 미지원(%s) → 태그를 하나씩 생성", r.status_code)
+            state_store.set_meta("tags.batch_off_at", time.time())
+            return None
+        r.raise_for_status()
+        responses = r.json()["responses"]
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logging.warning("태그 일괄 생성 실패: %s", e)
+        return None
+
+    out = {}
+    for (name, _), res in zip(items, responses):
+        body = res.get("body") or {}
+        if res.get("status") == 201 and body.get("id"):
+            out[name] = body["id"]
+        elif body.get("code") == "term_exists":
+            out[name] = body["data"]["term_id"]
+        elif body.get("code") == "rest_batch_not_allowed":
+            state_store.set_meta("tags.batch_off_at", time.time())
+            return out
+    return out
+
+
+def _batch_on() -> bool:
+    return time.time() - state_store.get_meta("tags.batch_off_at", 0) > FULL_EVERY
+
+
+def resolve_all(items: list[tuple[str, str | None]]) -> list[int]:
+    """
+    (이름, slug 또는 None) 목록 → ID 목록 (순서 유지, 중복·실패 제외).
+    캐시에 없는 이름이 둘 이상이면 batch/v1로 한꺼번에 만들고, 남은 것만 이름별 POST
+    """
+    _ensure_loaded()
+    items = list(dict((n, s) for n, s in items).items())
+    if sum(1 for n, _ in items if not _cached(n)) > 1 and _batch_on():
+        with _lock:
+            missing = [(n, s) for n, s in items if not _cached(n)]
+            for i in range(0, len(missing), BATCH_MAX):
+                got = _batch_create(missing[i:i + BATCH_MAX])
+                if got is None:
+                    break
+                _store(got.items())
+                logging.debug("🏷️ 태그 일괄 생성 %d/%d", len(got), len(missing[i:i + BATCH_MAX]))
+
+    ids = []
+    for n, s in items:
+        tid = resolve(n, s)
+        if tid:
+            ids.append(tid)
+    return list(dict.fromkeys(ids))
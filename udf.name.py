@@ -7,15 +7,32 @@ udf.name.py – v1.2
 • 제목 한국어 변환 · 중복 헤더 제거 · placeholder 이미지 필터
 """
 
-import os, sys, re, json, time, logging, random, textwrap
-from yoast_meta import generate_meta, push_meta
+import os, sys, re, json, time, logging, random, textwrap, signal, threading
+from html import escape as html_escape, unescape as html_unescape
+from yoast_meta import generate_meta, push_meta, normalize_meta, post_fields, sync_tags, tag_pairs
+from wp_index import SourceIndex
+from state_store import SeenStore
 from datetime import datetime
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 from zoneinfo import ZoneInfo
 from urllib.parse import urljoin, urlparse, urlunparse
 import xml.etree.ElementTree as ET
-import requests
-import feedparser
-from bs4 import BeautifulSoup
+import http_client
+import http_cache
+import gpt
+import preprocess
+import tag_cache
+import discovery
+import media
+import related
+import checkpoint
+import dedupe
+import leases
+import renderer
+import metrics
+import html_doc
+from html_doc import ParsedArticle
 from requests.exceptions import RequestException
 
 
@@ -29,9 +46,41 @@ BELARUS_KEYWORDS = [
     "лукашенко", "lukashenko", "루카셴코"
 ]
 
+# 키워드 전체를 한 번에 훑는 단일 정규식 (긴 것 먼저 → 가장 구체적인 키워드로 집계)
+_KEYWORD_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(BELARUS_KEYWORDS, key=len, reverse=True)), re.I)
+
 def is_belarus_related(text: str) -> bool:
-    low = text.lower()
-    return any(k in low for k in BELARUS_KEYWORDS)
+    return _KEYWORD_RE.search(text) is not None
+
+def keyword_hits(text: str) -> set[str]:
+    """본문에 실제로 걸린 키워드 (BELARUS_KEYWORDS 튜닝용 집계)"""
+    return {m.group(0).lower() for m in _KEYWORD_RE.finditer(text)}
+
+# ────────── DOM 없이 하는 1차 필터 ──────────
+_H1_RE      = re.compile(r"<h1[^>]*\bnewtitle\b", re.I)
+_ZOOM_RE    = re.compile(r"""\bid\s*=\s*["']?zooming\b""", re.I)
+_RELATED_RE = re.compile(r"(Читайте также|Чытайце таксама|함께 읽어보세요)", re.I)
+_TAG_RE     = re.compile(r"<[^>]*>")
+
+def prefilter(page: str) -> bool:
+    """
+    원시 HTML에서 제목(h1)부터 본문의 ‘Читайте также’ 직전까지만 잘라 태그를 걷어내고
+    키워드 정규식 한 번으로 검사. False면 DOM을 만들 필요 없이 무관 기사.
+    잘라낸 구간은 parse_html()이 검사하는 평문을 항상 포함하므로 관련 기사를 놓치지 않음
+    (구조를 못 찾으면 True → 판단을 전체 파싱에 맡김)
+    """
+    h1 = _H1_RE.search(page)
+    zoom = _ZOOM_RE.search(page, h1.start()) if h1 else None
+    if not zoom:
+        return True
+    end = len(page)
+    for m in _RELATED_RE.finditer(page, zoom.end()):
+        if page.rfind("<", 0, m.start()) < page.rfind(">", 0, m.start()):   # 태그 속성 안은 무시
+            end = m.start()
+            break
+    region = html_unescape(_TAG_RE.sub("", page[h1.start():end]))
+    return is_belarus_related(region)
     
 # ────────── 환경 변수 ──────────
 WP_URL      = os.getenv("WP_URL", "https://belatri.info").rstrip("/")
@@ -43,57 +92,110 @@ if not all([USER, APP_PW, OPEN_KEY]):
 
 POSTS_API   = f"{WP_URL}/wp-json/wp/v2/posts"
 TAGS_API    = f"{WP_URL}/wp-json/wp/v2/tags"
-UDF_BASE    = "https://udf.name/news/"
+UDF_BASE    = os.getenv("UDF_BASE", "https://udf.name/news/")
 HEADERS     = {"User-Agent": "UDFCrawler/3.8"}
-SEEN_FILE   = "seen_urls.json"
 TARGET_CAT_ID = 20
 
+# 단계별 동시 처리 수 (게시 단계는 순서 보장을 위해 항상 1)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "3"))
+GPT_WORKERS   = int(os.getenv("GPT_WORKERS", "4"))
+DEPTH_WORKERS = int(os.getenv("DEPTH_WORKERS", "3"))     # Q&A 개별 확장 동시 요청 수
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))     # 0이면 이미지 업로드 없이 원본 링크
+# --daemon: 새 기사가 있으면 간격을 줄이고, 조용하면 늘림
+POLL_MIN   = float(os.getenv("POLL_MIN_SECONDS", "60"))
+POLL_MAX   = float(os.getenv("POLL_MAX_SECONDS", "900"))
+POLL_START = float(os.getenv("POLL_START_SECONDS", "300"))
+SYNC_EVERY = float(os.getenv("DAEMON_SYNC_MINUTES", "30")) * 60   # WP 인덱스·seen 대조 주기
+# 1: 본문·제목·태그·Yoast 메타를 JSON 한 번으로 받는 구조화 모드
+GPT_STRUCTURED = os.getenv("GPT_STRUCTURED", "0") == "1"
+
 norm = lambda u: urlunparse(urlparse(u)._replace(query="", params="", fragment=""))
 
-# ────────── seen 관리 ──────────
+# ────────── seen 관리 (SQLite, seen_urls.json 자동 이관) ──────────
 def load_seen():
-    return set(json.load(open(SEEN_FILE))) if os.path.exists(SEEN_FILE) else set()
-def save_seen(s):
-    json.dump(list(s), open(SEEN_FILE, "w"), ensure_ascii=False, indent=2)
+    return SeenStore()
+
+# ────────── 게시 여부·관련 기사 인덱스 ──────────
+# state.db를 여는 인덱스는 처음 쓸 때 만듦 (모듈 import만으로 state.db가 생기지 않도록)
+_indexes    = None
+_index_lock = threading.Lock()
+
+def _load_indexes() -> tuple[SourceIndex, related.RelatedIndex]:
+    global _indexes
+    if _indexes is None:
+        with _index_lock:
+            if _indexes is None:
+                rel = related.RelatedIndex()
+                _indexes = (SourceIndex(on_posts=rel.update), rel)
+    return _indexes
+
+def wp_index() -> SourceIndex:
+    return _load_indexes()[0]
+
+def related_index() -> related.RelatedIndex:
+    return _load_indexes()[1]
+
+
+def wp_post_id(u) -> int | None:
+    # 인덱스 갱신에 성공했다면 로컬 조회만으로 판정, 아니면 검색 결과의 id
+    if wp_index().ok:
+        return wp_index().get(u)
+    r = http_client.get(POSTS_API, params={"search":u,"per_page":1,"_fields":"id"},
+                     auth=(USER,APP_PW), timeout=10)
+    hits = r.json() if r.ok else []
+    return hits[0]["id"] if hits else None
 
 def wp_exists(u):
-    r = requests.get(POSTS_API, params={"search":u,"per_page":1},
-                     auth=(USER,APP_PW), timeout=10)
-    return r.ok and bool(r.json())
+    return wp_post_id(u) is not None
 
 def sync_seen(seen):
-    synced = {u for u in seen if wp_exists(norm(u))}
-    if synced != seen:
-        save_seen(synced)
-    return synced
+    # 관련 기사 인덱스가 비어 있으면(첫 도입) 전체 재구축으로 채움
+    wp_index().refresh(force_full=not len(related_index()))
+    if not wp_index().ok:
+        # 인덱스가 없으면 URL별 검색으로 대조하는 대신 seen을 그대로 신뢰
+        return seen
+    stale = [u for u in seen if not wp_exists(norm(u))]
+    if stale:
+        logging.info("🧹 WP에서 사라진 seen %d건 정리", len(stale))
+        seen.discard_many(stale)
+    return seen
 
 # ────────── 링크 크롤링 ──────────
-def fetch_links():
-    try:
-        resp = requests.get(UDF_BASE, headers=HEADERS, timeout=15)  # 타임아웃 15초로 연장
-        resp.raise_for_status()
-        html = resp.text
-    except RequestException as e:
-        logging.warning("링크 크롤링 실패: %s", e)
-        return []  # 실패 시 빈 리스트 반환
-
-    soup = BeautifulSoup(html, "html.parser")
-    return list({
-        norm(urljoin(UDF_BASE, a["href"]))
-        for a in soup.select("div.article1 div.article_title_news a[href]")
-    })
+@metrics.traced("fetch_links")
+def fetch_links(seen=None):
+    """
+    RSS/Atom 피드 우선, 실패 시 목록 스크래핑 (discovery.py).
+    seen을 주면 목록이 밀린 만큼 이전 쪽을 보충해 폭주 때도 기사를 놓치지 않음
+    """
+    known = None
+    if seen is not None:
+        # 로컬 조회만 (WP 인덱스가 없을 때 URL마다 검색하지 않도록)
+        known = lambda u: u in seen or (wp_index().ok and u in wp_index())
+    # 페이지 순서 유지 (게시 순서가 실행마다 달라지지 않도록)
+    return discovery.discover(known)
 
 
 # ────────── 기사 파싱 ──────────
+@metrics.traced("parse")
 def parse(url):
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
+        r = http_cache.get(url, headers=HEADERS, timeout=10)
         r.raise_for_status()
     except RequestException as e:
         logging.warning("파싱 실패(%s): %s", url, e)
         return None
+    return parse_html(url, r.text)
+
+
+def parse_html(url: str, page: str):
+    """다운로드된 기사 HTML → ParsedArticle (네트워크 없음, 벤치마크에서도 사용)"""
+    cat = url.split("/news/")[1].split("/")[0] if "/news/" in url else ""
+    if not prefilter(page):
+        logging.debug("  🔴 벨라루스 불포함 스킵(1차): %s", url)
+        metrics.incr("prefilter_rejected", cat=cat)
+        return None
 
-    s = BeautifulSoup(r.text, "html.parser")
+    s = html_doc.soup(page)
     t = s.find("h1", class_="newtitle")
     b = s.find("div", id="zooming")
     if not (t and b):
@@ -101,8 +203,7 @@ def parse(url):
         return None
 
     # ── 1) ‘함께 읽어보세요’·관련기사 블록 제거 ─────────
-    for marker in b.find_all(string=re.compile(
-        r"(Читайте также|Чытайце таксама|함께 읽어보세요)", flags=re.I)):
+    for marker in b.find_all(string=_RELATED_RE):
         parent = marker.parent
         for nxt in list(parent.find_all_next()):
             nxt.decompose()
@@ -110,10 +211,15 @@ def parse(url):
     # ────────────────────────────────────────────────
 
     # ── 2) 벨라루스 관련 기사 필터 ─────────────────────
-    raw_txt = t.get_text(" ", strip=True) + " " + b.get_text(" ", strip=True)
-    if not is_belarus_related(raw_txt):
+    body_txt = html_doc.text_of(b)      # 평문은 여기서 한 번만 추출해 재사용
+    raw_txt  = t.get_text(" ", strip=True) + " " + body_txt
+    hits = keyword_hits(raw_txt)
+    if not hits:
         logging.debug("  🔴 벨라루스 불포함 스킵: %s", url)
+        metrics.incr("relevance_rejected", cat=cat)
         return None
+    for k in hits:
+        metrics.incr("keyword_hits", keyword=k)
     # ────────────────────────────────────────────────
 
     # ─── 3) 대표 이미지 추출 (lazyload / srcset / og:image 대응) ───
@@ -157,14 +263,16 @@ def parse(url):
         logging.debug("  ⚠️  대표 이미지 없음: %s", url)
     # ─────────────────────────────────────────────────────────
 
-    cat = url.split("/news/")[1].split("/")[0]
-    return {
-        "title": t.get_text(strip=True),
-        "html":  str(b),
-        "image": img_url,
-        "url":   url,
-        "cat":   cat
-    }
+    return ParsedArticle(
+        doc   = b,
+        title = t.get_text(strip=True),
+        html  = str(b),
+        image = img_url,
+        url   = url,
+        cat   = cat,
+        text  = body_txt,
+        fingerprint = dedupe.simhash(body_txt),     # 거의 같은 기사 판정용 (GPT 전)
+    )
 
 
 # ────────── 스타일 가이드 ──────────
@@ -200,10 +308,12 @@ STYLE_GUIDE = textwrap.dedent("""
 """).strip()
 
 # ─── GPT 리라이팅 (정책 안전 + 메타데이터 삽입) ──────────
-def rewrite(article):
+def rewrite_messages(article, model: str = "gpt-4o") -> list[dict]:
+    """STYLE_GUIDE·문체·태그 규칙을 담은 리라이팅 프롬프트"""
     # extra_context는 더 이상 사용하지 않습니다
     today            = datetime.now(tz=ZoneInfo("Asia/Seoul")).strftime("%Y.%m.%d")
-    views            = random.randint(7_000, 12_000)
+    # URL 기준 고정 난수 → 같은 기사는 같은 프롬프트 (GPT 캐시 재사용)
+    views            = random.Random(article["url"]).randint(7_000, 12_000)
     tags_placeholder = ""
 
     # STYLE_GUIDE의 플레이스홀더만 채워서 'filled'에 담기
@@ -215,14 +325,15 @@ def rewrite(article):
         tags=tags_placeholder
     )
 
-    # RAW_HTML만 치환하고, extra_context 제거
+    # 원문은 간결한 HTML로 줄여 한 번만 넣고, RAW_HTML 자리는 그 원문을 가리키게 함
+    source = preprocess.prepare(article, model)
     prompt_body = (
         filled
-        .replace("⟪RAW_HTML⟫", article["html"])
+        .replace("⟪RAW_HTML⟫", "⟪아래 원문을 100% 재배치해 정리⟫")
         + f"""
 
 원문:
-{article["html"]}
+{source}
 """
     )
 
@@ -266,12 +377,32 @@ def rewrite(article):
             "content": prompt_body
         }
     ]
+    return messages
 
-    headers = {
-        "Authorization": f"Bearer {OPEN_KEY}",
-        "Content-Type":  "application/json"
-    }
 
+# 초안에 반드시 있어야 하는 STYLE_GUIDE 섹션 (길이 보강 때 빠진 것만 이어 쓰기)
+REQUIRED_SECTIONS = [
+    ("✍️ 편집자 주",  "<h2>✍️ 편집자 주 — 이 기사, 이렇게 읽어요</h2> + 긴 문장 2개 단락"),
+    ("📝 개요",       "<h3>📝 개요</h3> + 500자 이상 단락"),
+    ("[gpt_latest_data]", "[gpt_latest_data] 숏코드 한 줄"),
+    ("💬 전문가 전망", "<h3>💬 전문가 전망</h3> + 4문장 이상 단락 2개"),
+    ("[gpt_related_qna]", "[gpt_related_qna] 숏코드 한 줄"),
+    ("🏷️ 태그",       "<p>🏷️ 태그: …</p> (태그 생성 규칙 그대로)"),
+]
+MIN_CHARS = 1500
+
+
+def _splice(draft: str, extra: str) -> str:
+    """보강 단락을 태그·출처 줄 앞에 끼워 넣기 (없으면 끝에 덧붙임)"""
+    m = re.search(r"<p>\s*🏷️", draft)
+    if not m:
+        return draft.rstrip() + "\n\n" + extra.strip()
+    return draft[:m.start()].rstrip() + "\n\n" + extra.strip() + "\n\n" + draft[m.start():]
+
+
+@metrics.traced("rewrite")
+def rewrite(article):
+    messages = rewrite_messages(article)
     data = {
         "model":       "gpt-4o",
         "messages":    messages,
@@ -279,34 +410,136 @@ def rewrite(article):
         "max_tokens":  1800
     }
 
-    # 4) 첫 요청
-    r = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers=headers,
-        json=data,
-        timeout=90
-    )
-    r.raise_for_status()
-    txt = r.json()["choices"][0]["message"]["content"].strip().replace("**", "")
-
-    # 5) 길이 보강
-    if len(txt) < 1500:
-        logging.info("  ↺ 길이 보강 재-요청")
-        data["temperature"] = 0.6
-        r2 = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=90
-        )
-        r2.raise_for_status()
-        txt = r2.json()["choices"][0]["message"]["content"].strip().replace("**", "")
-
-    return txt
-    
+    # 4) 첫 요청 (같은 요청은 gpt 캐시에서 재사용)
+    resp = gpt.chat(data, timeout=90)
+    raw  = gpt.content(resp).replace("**", "")
+    txt  = raw.strip()
+
+    # 5) 길이 보강: 전체 재생성 대신 초안에 이어 쓰기
+    if gpt.finish_reason(resp) == "length":
+        # max_tokens에서 잘린 경우 → 끊긴 지점부터 그대로 이어서
+        logging.info("  ↺ 잘린 초안 이어 쓰기")
+        ask, place = "방금 끊긴 지점부터 그대로 이어서 끝까지 작성하세요. 앞 내용은 반복하지 마세요.", "append"
+    elif len(txt) < MIN_CHARS:
+        missing = [desc for key, desc in REQUIRED_SECTIONS if key not in txt]
+        if missing:
+            logging.info("  ↺ 길이 보강: 빠진 섹션 %d개만 이어 쓰기", len(missing))
+            ask = ("위 초안에 빠진 아래 섹션만 STYLE_GUIDE 순서대로 이어서 작성하세요. "
+                   "이미 쓴 부분은 반복하지 마세요.\n- " + "\n- ".join(missing))
+            place = "splice"
+        else:
+            logging.info("  ↺ 길이 보강: 개요·전망 보강 단락 이어 쓰기")
+            ask = ("위 초안이 짧아요. 📝 개요와 💬 전문가 전망을 뒷받침하는 <p> 단락 2–3개만 "
+                   "새로 작성하세요. 헤더·태그·출처 줄은 다시 쓰지 마세요.")
+            place = "splice"
+    else:
+        return txt
+
+    more = {
+        **data,
+        "messages":   messages + [{"role": "assistant", "content": txt},
+                                  {"role": "user", "content": ask}],
+        "max_tokens": 900,
+    }
+    extra = gpt.content(gpt.chat(more, timeout=90)).replace("**", "")
+    if place == "append":
+        # 끊긴 지점의 공백을 그대로 살려 이어 붙임 (양쪽을 strip하면 단어가 붙어 버림)
+        return (raw + extra).strip()
+    return _splice(txt, extra.strip())
+
+
+# ─── 구조화 모드: 본문·제목·태그·Yoast 메타를 한 번에 ──────────
+STRUCTURED_FIELDS = {
+    # 필드: (타입, 설명)
+    "body":             (str,  "STYLE_GUIDE 순서를 지킨 본문 HTML (<h1>·🏷️ 태그 줄은 빼고)"),
+    "title":            (str,  "45자 이내 한국어 제목, 이모지 1–3개, 친근한 대화체"),
+    "tags":             (list, "태그 생성 규칙을 지킨 정확히 6개의 문자열 배열"),
+    "focus_keyphrase":  (str,  "검색량 높은 실제 키워드를 포함한 5–7어절 초점 키프레이즈"),
+    "seo_title":        (str,  "45자 이내, 핵심 키워드를 앞에 둔 SEO 제목 (이모지·특수문자 제외)"),
+    "slug":             (str,  "ASCII 소문자+하이픈 슬러그, 60바이트 이내"),
+    "meta_description": (str,  "140~155자 한 문장, 누가·무엇을·어디서·왜·어떻게"),
+}
+
+
+def _structured_spec(fields) -> str:
+    return "\n".join(f'- "{k}": {STRUCTURED_FIELDS[k][1]}' for k in fields)
+
+
+def validate_structured(out: dict) -> list[str]:
+    """스키마에 맞지 않거나 비어 있는 필드 목록"""
+    bad = []
+    for k, (typ, _) in STRUCTURED_FIELDS.items():
+        v = out.get(k)
+        if not isinstance(v, typ) or not v:
+            bad.append(k)
+        elif typ is list and not all(isinstance(x, str) and x.strip() for x in v):
+            bad.append(k)
+    return bad
+
+
+def _json_reply(data: dict, timeout: float) -> dict:
+    raw = gpt.content(gpt.chat(data, timeout=timeout))
+    try:
+        out = json.loads(raw)
+    except json.JSONDecodeError:
+        gpt.forget(data)
+        raise
+    return out if isinstance(out, dict) else {}
+
+
+@metrics.traced("rewrite")
+def rewrite_structured(article) -> dict:
+    """
+    GPT_STRUCTURED=1 일 때 rewrite·korean_title·generate_meta를 대신하는 단일 호출.
+    JSON 응답을 검증하고, 빠지거나 잘못된 필드만 골라 보정 요청을 한 번 더 보냄
+    """
+    messages = rewrite_messages(article)
+    messages.append({
+        "role": "system",
+        "content": "응답은 아래 키를 모두 가진 JSON 객체 하나로만 반환하세요.\n"
+                   + _structured_spec(STRUCTURED_FIELDS),
+    })
+    data = {
+        "model":           "gpt-4o",
+        "messages":        messages,
+        "temperature":     0.4,
+        "max_tokens":      2300,
+        "response_format": {"type": "json_object"},
+    }
+    out = _json_reply(data, timeout=90)
+
+    missing = validate_structured(out)
+    if "body" in missing:
+        raise ValueError("구조화 응답에 본문(body)이 없습니다")
+    if missing:
+        logging.info("  ↺ 구조화 응답 보정 요청: %s", ", ".join(missing))
+        repair = {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system",
+                 "content": "다음 기사에 대해 아래 키만 가진 JSON 객체 하나로 답하세요.\n"
+                            + _structured_spec(missing)},
+                {"role": "user",
+                 "content": f"기사 제목: {article['title']}\n"
+                            f"기사 본문 일부: {html_doc.article_text(article)[:600]}"},
+            ],
+            "temperature":     0.3,
+            "max_tokens":      400,
+            "response_format": {"type": "json_object"},
+        }
+        fixed = _json_reply(repair, timeout=30)
+        out.update({k: fixed[k] for k in missing if k in fixed})
+        still = validate_structured(out)
+        if still:
+            raise ValueError(f"구조화 응답 보정 실패: {still}")
+
+    out["body"] = out["body"].strip().replace("**", "")
+    return out
+
 # ─── 기타 유틸 및 게시 로직 (변경 없음) ──────────
 CYRILLIC = re.compile(r"[А-Яа-яЁё]")
 
+@metrics.traced("korean_title")
 def korean_title(src: str, context: str) -> str:
     if not CYRILLIC.search(src):
         return src
@@ -315,14 +548,10 @@ def korean_title(src: str, context: str) -> str:
         "45자 이내 한국어 제목을 만들고 이모지 1–3개를 자연스럽게 포함하세요.\n\n"
         f"원제목: {src}\n기사 일부: {context[:300]}"
     )
-    headers = {"Authorization":f"Bearer {OPEN_KEY}", "Content-Type":"application/json"}
     data = {"model":"gpt-4o-mini","messages":[{"role":"user","content":prompt}],
             "temperature":0.8,"max_tokens":60}
     try:
-        r = requests.post("https://api.openai.com/v1/chat/completions",
-                          headers=headers, json=data, timeout=20)
-        r.raise_for_status()
-        return r.json()["choices"][0]["message"]["content"].strip()
+        return gpt.content(gpt.chat(data, timeout=20)).strip()
     except:
         return src
 
@@ -367,137 +596,138 @@ def tag_names(txt: str) -> list[str]:
     raw_tags = [t.strip("–-#• ") for t in m.group(1).split(",")]
 
     # ③ 정제 → STOP 필터 → 최대 6개
+    return clean_tags(raw_tags)
+
+def clean_tags(raw_tags: list[str]) -> list[str]:
     cleaned = [t for t in sanitize_tags(raw_tags) if t and t not in STOP]
     return cleaned[:6]
 
 def tag_id(name: str) -> int | None:
     """
-    - 정확히 같은 이름(tag)이 이미 있으면 그 ID 사용
+    - 정확히 같은 이름(tag)이 이미 있으면 그 ID 사용 (tag_cache, 네트워크 없음)
     - 없으면 새로 생성
     - POST 시 'term_exists' 에러(이미 존재)면 그 term_id 사용
     """
-    # 1) 같은 이름이 존재하는지 먼저 검색 (여유 있게 100개까지)
-    r = requests.get(
-        TAGS_API,
-        params={"search": name, "per_page": 100},
-        auth=(USER, APP_PW),
-        timeout=10
-    )
-    if r.ok:
-        for term in r.json():
-            if term["name"] == name:        # 정확히 일치하는 이름
-                return term["id"]
-
-    # 2) 없으면 생성 시도
-    c = requests.post(
-        TAGS_API, json={"name": name},
-        auth=(USER, APP_PW), timeout=10
-    )
+    return tag_cache.resolve(name)
 
-    # 2-A) 새로 생성된 경우
-    if c.status_code == 201:
-        return c.json().get("id")
-
-    # 2-B) 이미 존재 → WP가 term_exists와 함께 기존 ID 반환
-    if c.status_code == 400 and c.json().get("code") == "term_exists":
-        return c.json()["data"]["term_id"]
-
-    logging.warning("태그 '%s' 처리 실패: %s %s", name, c.status_code, c.text)
-    return None
-
-def ensure_depth(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    modified = False
-    for li in soup.find_all("li"):
-        txt = li.get_text()
-        if "<strong>A." not in txt: continue
-        if len(re.findall(r"[.!?]", txt)) < 2:
-            prompt = f"아래 답변을 근거·숫자·전망 포함 3문장 이상으로 확장:\n{txt}"
-            headers={"Authorization":f"Bearer {OPEN_KEY}","Content-Type":"application/json"}
-            data={"model":"gpt-4o-mini","messages":[{"role":"user","content":prompt}],
-                  "temperature":0.7,"max_tokens":100}
-            try:
-                r = requests.post("https://api.openai.com/v1/chat/completions",
-                                  headers=headers, json=data, timeout=20)
-                r.raise_for_status()
-                li.string = r.json()["choices"][0]["message"]["content"].strip()
-                modified = True
-            except:
-                pass
-    return str(soup) if modified else html
-
-# ─── 게시 전 헤더 변환/필터링 & 게시 로직 ──────────
-def publish(article: dict, txt: str, tag_ids: list[int]):
-    # 1) Q&A 깊이 보강 유지
-    txt = ensure_depth(txt)
-
-    # 2) 원본 URL 숨김 + 대표 이미지 태그
-    hidden  = f'<a href="{article["url"]}" style="display:none">src</a>\n'
-    img_tag = f'<p><img src="{article["image"]}" alt=""></p>\n' if article["image"] else ""
-
-    # 3) Markdown 헤더(#, ##, ###)를 HTML <h1>-<h3>로 변환하고
-    #    코드블록, 기존 📰 헤더, '소제목' 주석은 제거
-    lines = []
-    for line in txt.splitlines():
-        s = line.lstrip()
-
-        # (가) 제거할 패턴
-        if s.startswith("```") or s.startswith("📰") or "소제목" in s:
-            continue
+def _expand_one(txt: str) -> str:
+    prompt = f"아래 답변을 근거·숫자·전망 포함 3문장 이상으로 확장:\n{txt}"
+    data={"model":"gpt-4o-mini","messages":[{"role":"user","content":prompt}],
+          "temperature":0.7,"max_tokens":100}
+    return gpt.content(gpt.chat(data, timeout=20)).strip()
 
-        # (나) Markdown 헤더 → HTML 헤더
-        m = re.match(r'^(#{1,6})\s*(.*)$', s)
-        if m:
-            level   = min(len(m.group(1)), 3)       # 최대 h3
-            content = m.group(2).strip()
-            lines.append(f"<h{level}>{content}</h{level}>")
-            continue
 
-        # (다) 일반 문장
-        lines.append(line)
-
-    # 4) BeautifulSoup으로 다시 파싱
-    soup = BeautifulSoup("\n".join(lines), "html.parser")
-
-    # 5) 제목 재삽입 (korean_title 변환 포함)
-    h1   = soup.find("h1")
-    orig = h1.get_text(strip=True) if h1 else article["title"]
-    title= korean_title(orig, soup.get_text(" ", strip=True))
-    if h1:
-        h1.decompose()
-    new_h1 = soup.new_tag("h1")
-    new_h1.string = title
-    soup.insert(0, new_h1)
-
-    # 6) 이미지 캡션
-    if img_tag:
-        img = soup.find("img")
-        if img and not img.find_next_sibling("em"):
-            cap = soup.new_tag("em")
-            cap.string = "Photo: UDF.name"
-            img.insert_after(cap)
-
-    # 7) 내부 관련 기사 링크 삽입
-    if tag_ids:
+def _expand_batch(texts: list[str]) -> dict[int, str]:
+    """짧은 답변 여러 개를 한 번에 확장 → {번호: 확장문}, 빠진 번호는 호출부가 개별 처리"""
+    items = "\n".join(f"{i}. {t}" for i, t in enumerate(texts))
+    data = {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content":
+            "아래 번호별 답변을 각각 근거·숫자·전망 포함 3문장 이상으로 확장하세요.\n"
+            '{"answers": [{"i": 번호, "text": "확장된 답변"}]} 형식의 JSON 하나로만 답하세요.\n\n'
+            + items}],
+        "temperature":     0.7,
+        "max_tokens":      120 * len(texts),
+        "response_format": {"type": "json_object"},
+    }
+    raw = gpt.content(gpt.chat(data, timeout=30))
+    try:
+        answers = json.loads(raw).get("answers", [])
+    except (json.JSONDecodeError, AttributeError):
+        gpt.forget(data)
+        raise ValueError(f"Q&A 일괄 확장 응답이 JSON이 아님: {raw[:40]}")
+    return {a["i"]: a["text"].strip() for a in answers
+            if isinstance(a, dict) and isinstance(a.get("i"), int)
+            and 0 <= a["i"] < len(texts) and str(a.get("text", "")).strip()}
+
+
+@metrics.traced("ensure_depth")
+def ensure_depth(texts: list[str]) -> dict[int, str]:
+    """
+    짧은 Q&A 답변 평문 목록 → {번호: 확장문} (renderer가 찾아 넘김).
+    한 번의 일괄 요청, 빠진 항목만 개별 요청(동시 DEPTH_WORKERS개). 실패한 번호는 빠짐 → 원문 유지
+    """
+    done = {}
+    if len(texts) > 1:
         try:
-            r = requests.get(
-                POSTS_API,
-                params={"tags": tag_ids[0], "per_page": 1},
-                auth=(USER, APP_PW),
-                timeout=10
-            )
-            if r.ok and r.json():
-                link = r.json()[0]["link"]
-                more = soup.new_tag("p")
-                a    = soup.new_tag("a", href=link)
-                a.string = "📚 관련 기사 더 보기"
-                more.append(a)
-                soup.append(more)
-        except:
-            pass
+            done = _expand_batch(texts)
+        except Exception as e:
+            logging.warning("Q&A 일괄 확장 실패, 개별 요청으로 대체: %s", e)
+
+    rest = [i for i in range(len(texts)) if i not in done]
+    if rest:
+        with ThreadPoolExecutor(min(DEPTH_WORKERS, len(rest))) as pool:
+            futs = {i: pool.submit(metrics.run_in_context(_expand_one), texts[i]) for i in rest}
+        for i, f in futs.items():
+            try:
+                done[i] = f.result()
+            except Exception as e:
+                logging.warning("Q&A 답변 %d 확장 실패(원문 유지): %s", i, e)
+    return done
+
+# ─── 게시 전 렌더링 ──────────
+def render(article: dict, txt: str, title: str = None) -> tuple[str, str]:
+    """
+    GPT 결과 → (최종 제목, 본문 HTML). GPT 보강 호출이 있어 GPT 단계에서 실행.
+    title을 주면(구조화 모드) korean_title 호출 없이 그대로 사용.
+    줄 규칙·Q&A 보강·제목 교체·이미지 캡션을 renderer가 토큰 한 번 훑기로 처리
+    """
+    return renderer.render(txt, url=article["url"], image=article["image"],
+                           fallback_title=article["title"], title=title,
+                           expand=ensure_depth, retitle=korean_title)
+
+
+# ─── 게시 로직 ──────────
+def with_media(article: dict, body: str, m: dict | None) -> str:
+    """본문 대표 이미지를 WP 사본으로 교체 (wp-image-ID 클래스 → WP가 srcset 자동 추가)"""
+    if not (m and article["image"]):
+        return body
+    old = f'<img src="{article["image"]}" alt="">'
+    new = f'<img src="{m["url"]}" alt="" class="wp-image-{m["id"]}">'
+    return body.replace(old, new, 1)
+
+
+def with_related(body: str, posts: list[dict]) -> str:
+    """관련 기사 링크 목록을 스타일 가이드의 <p class="related"> 자리에 (없으면 끝에) 삽입"""
+    if not posts:
+        return body
+    links = "<br>\n".join(f'<a href="{p["link"]}">{html_escape(p["title"]) or "관련 기사"}</a>'
+                           for p in posts)
+    block = f'<p class="related">📚 관련 기사<br>\n{links}</p>'
+    if '<p class="related"></p>' in body:
+        return body.replace('<p class="related"></p>', block, 1)
+    return body + "\n" + block
+
+
+def _meta_before_publish(article: dict) -> dict | None:
+    """compose 때 메타가 실패했으면 게시 전에 한 번 더 (실패하면 None → 게시 후 --retry meta)"""
+    try:
+        logging.debug("▶ Calling generate_meta()")
+        return generate_meta(article)
+    except Exception as e:
+        logging.warning("Yoast 메타 생성 실패(메타 없이 게시): %s", e)
+        return None
+
+
+@metrics.traced("publish")
+def publish(article: dict, title: str, body: str, tag_ids: list[int], meta: dict = None,
+            media: dict = None):
+    """
+    media: media.ingest() 결과 → featured_media 지정 + 본문 이미지 교체.
+    meta가 있으면 slug·SEO 제목·Yoast 필드·메타 태그까지 넣어 생성 요청 한 번으로 끝
+    """
+    url = norm(article["url"])
+    if meta is None:
+        meta = _meta_before_publish(article)
+    if meta:
+        # 태그 단계에서 이미 함께 만들어 둔 이름들 → 캐시 적중, 네트워크 없음
+        tag_ids = list(dict.fromkeys(tag_ids + sync_tags(meta.get("tags", []))))
+        title = meta.get("title") or title
+    body = with_media(article, body, media)
+    # 7) 내부 관련 기사 링크 삽입 (로컬 인덱스, 네트워크 없음)
+    body = with_related(body, related_index().top(title, body, tag_ids))
 
     # 8) 최종 게시 (한 번만 호출)
-    body = hidden + img_tag + str(soup)
     payload = {
         "title":      title,
         "content":    body,
@@ -505,74 +735,469 @@ def publish(article: dict, txt: str, tag_ids: list[int]):
         "categories": [TARGET_CAT_ID],
         "tags":       tag_ids
     }
-    r = requests.post(POSTS_API, json=payload, auth=(USER, APP_PW), timeout=30)
+    if meta:
+        payload.update(post_fields(meta))
+    if media:
+        payload["featured_media"] = media["id"]
+    # 게시 직후 죽어도 재시작 때 "내가 만든 글"인지 알 수 있도록 먼저 기록 (resumable 참고)
+    checkpoint.attach(url, publishing={"meta": bool(meta)})
+    # 5xx 뒤에 글이 이미 만들어졌을 수 있으므로 생성 요청은 재시도하지 않음
+    r = http_client.post(POSTS_API, json=payload, auth=(USER, APP_PW), timeout=30, retries=0)
     logging.info("  ↳ 게시 %s %s", r.status_code, r.json().get("id"))
     r.raise_for_status()
-    
-    # ▶ 디버그 1: publish() 진입 확인
-    logging.debug(f"▶ publish() 성공, 이제 Yoast 메타 자동화 시작(post_id={r.json()['id']})")
-
-    # ★ Yoast SEO 메타 자동 생성 & 업로드
+    wp_index().add(article["url"], r.json()["id"])
     post_id = r.json()["id"]
+    related_index().add(post_id, r.json().get("link", ""), title, tag_ids, body)
+    dedupe.remember(url, article.get("fingerprint"), post_id)
+    leases.finish(url, post_id)           # 다른 워커가 이 URL을 다시 잡지 않도록 바로 완료 표시
+
+    if meta:
+        checkpoint.save(url, "done", post_id=post_id, tag_ids=tag_ids)
+        logging.info("  🟢 Yoast 메타 포함 게시 완료")
+    else:
+        checkpoint.save(url, "posted", post_id=post_id, tag_ids=tag_ids)
+        checkpoint.fail(url, "meta", "메타 없이 게시됨")
+    return post_id
+
+
+def finish_meta(article: dict, post_id: int, meta: dict = None, tag_ids: list[int] = None) -> bool:
+    """★ 게시 후 Yoast 메타만 따로 적용 (--retry meta·재개용) → 체크포인트 done"""
+    url = norm(article["url"])
     try:
-        # ▶ 디버그 2: 메타 생성 호출 직전
-        logging.debug("▶ Calling generate_meta()")
-        meta = generate_meta(article)
-        # ▶ 디버그 3: 메타 생성 결과 확인
-        logging.debug(f"▶ generate_meta() 리턴값: {meta}")
-
-        push_meta(post_id, meta)
+        if meta is None:
+            # ▶ 디버그 2: 메타 생성 호출 직전
+            logging.debug("▶ Calling generate_meta()")
+            meta = generate_meta(article)
+            # ▶ 디버그 3: 메타 생성 결과 확인
+            logging.debug(f"▶ generate_meta() 리턴값: {meta}")
+
+        push_meta(post_id, meta, tag_ids)
         logging.info("  🟢 Yoast 메타 적용 완료")
     except Exception as e:
         logging.warning("Yoast 메타 실패: %s", e)
+        checkpoint.fail(url, "meta", e)
+        return False
+    checkpoint.save(url, "done")
+    return True
+
+
+# ─── 단계별 파이프라인 ──────────
+def _chain(upstream: Future, pool: ThreadPoolExecutor, fn) -> Future:
+    """upstream 결과가 나오면 pool에 fn(결과)를 넣고, 그 결과를 돌려줄 Future"""
+    out = Future()
+
+    def relay(f: Future):
+        if f.cancelled():
+            out.cancel()
+        elif f.exception():
+            out.set_exception(f.exception())
+        else:
+            out.set_result(f.result())
 
+    def on_done(f: Future):
+        if f.cancelled() or f.exception() or f.result() is None:
+            relay(f)
+            return
+        try:
+            pool.submit(fn, f.result()).add_done_callback(relay)
+        except RuntimeError:            # 종료 중(shutdown) → 다음 단계로 넘기지 않음
+            out.cancel()
 
-def main():
-    logging.basicConfig(
-        level=logging.DEBUG,                  # <<< DEBUG 로 변경
-        stream=sys.stdout,
-        format="%(asctime)s │ %(levelname)s │ %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    upstream.add_done_callback(on_done)
+    return out
 
-    seen  = sync_seen(load_seen())
-    links = fetch_links()
-    todo  = [u for u in links if norm(u) not in seen and not wp_exists(norm(u))]
-    logging.info("📰 새 기사 %d / 총 %d", len(todo), len(links))
 
-    for url in todo:
-        logging.info("▶ %s", url)
-        art = parse(url)
-        time.sleep(1)
+@metrics.traced("compose")
+def compose(art: dict) -> dict:
+    """GPT 단계: 리라이팅 → 본문 렌더링 → Yoast 메타 생성"""
+    if GPT_STRUCTURED:
+        return compose_structured(art)
+    try:
+        txt = rewrite(art)
+        logging.debug("  🟢 GPT OK | 길이: %d chars", len(txt))  # <<<
+    except Exception as e:
+        logging.warning("GPT 오류(%s): %s", art["url"], e)
+        return None
+    title, body = render(art, txt)
+    try:
+        meta = generate_meta(art)
+        logging.debug(f"▶ generate_meta() 리턴값: {meta}")
+    except Exception as e:
+        logging.warning("Yoast 메타 생성 실패(%s): %s", art["url"], e)
+        meta = {}
+    return {"art": art, "title": title, "body": body, "meta": meta,
+            "tags": tag_names(txt)}
 
-        # ─── [DEBUG] 파싱 결과 확인 ───────────────────────
-        if art:
-            logging.debug("  🟢 parse OK | 제목: %s | img: %s",
-                          art["title"], art["image"])
-        else:
-            logging.debug("  🔴 parse returned None")
-            continue
-        # ────────────────────────────────────────────────
 
-        # ─── GPT 리라이팅 ────────────────────────────────
+def compose_structured(art: dict) -> dict:
+    """구조화 모드: JSON 한 번(+필요 시 보정 1회)으로 compose()와 같은 결과"""
+    try:
+        out = rewrite_structured(art)
+        logging.debug("  🟢 GPT(구조화) OK | 길이: %d chars", len(out["body"]))
+    except Exception as e:
+        logging.warning("GPT 오류(%s): %s", art["url"], e)
+        return None
+    title, body = render(art, out["body"], title=out["title"])
+    meta = normalize_meta({k: out[k] for k in STRUCTURED_FIELDS if k != "body"})
+    return {"art": art, "title": title, "body": body, "meta": meta,
+            "tags": clean_tags(out["tags"])}
+
+
+# ─── 체크포인트 단계 ──────────
+ART_FIELDS = ("title", "html", "image", "url", "cat", "fingerprint")
+
+
+def note_update(post_id: int, article: dict):
+    """DEDUPE_MODE=update: 원문이 새 URL로 다시 올라오면 기존 글에 업데이트 안내만 갱신 (GPT 없음)"""
+    r = http_client.get(f"{POSTS_API}/{post_id}", params={"context": "edit", "_fields": "content"},
+                        auth=(USER, APP_PW), timeout=20)
+    r.raise_for_status()
+    raw  = r.json()["content"]["raw"]
+    today = datetime.now(tz=ZoneInfo("Asia/Seoul")).strftime("%Y.%m.%d")
+    note = (f'<p class="udf-update">🔄 원문 업데이트 {today}: '
+            f'<a href="{html_escape(article["url"])}">UDF.name</a></p>')
+    if '<p class="udf-update">' in raw:
+        raw = re.sub(r'<p class="udf-update">.*?</p>', lambda m: note, raw, count=1, flags=re.S)
+    else:
+        raw += "\n" + note
+    r = http_client.post(f"{POSTS_API}/{post_id}", json={"content": raw},
+                         auth=(USER, APP_PW), timeout=20)
+    r.raise_for_status()
+    logging.info("  🔄 기존 글 %d에 원문 업데이트 표시", post_id)
+
+
+def on_duplicate(url: str, art: dict, dup: dict, rec: dict = None):
+    metrics.incr("near_duplicate", cat=art.get("cat", ""))
+    if not dup["post_id"]:
+        logging.info("🪞 이번 실행에서 먼저 처리 중인 기사와 거의 같음(거리 %d) → 건너뜀: %s",
+                     dup["distance"], url)
+        return
+    logging.info("🪞 게시된 글 %d와 거의 같은 기사(거리 %d) → GPT 없이 %s: %s", dup["post_id"],
+                 dup["distance"], "업데이트 표시" if dedupe.MODE == "update" else "건너뜀", url)
+    if dedupe.MODE == "update":
         try:
-            txt = rewrite(art)
-            logging.debug("  🟢 GPT OK | 길이: %d chars", len(txt))  # <<<
-        except Exception as e:
-            logging.warning("GPT 오류: %s", e)
+            note_update(dup["post_id"], art)
+        except (RequestException, ValueError, KeyError) as e:
+            logging.warning("기존 글 업데이트 실패(post %d): %s", dup["post_id"], e)
+    if rec:
+        checkpoint.save(url, "done", post_id=dup["post_id"])
+    leases.finish(url, dup["post_id"])
+
+
+def parse_step(url: str):
+    """parsed 체크포인트가 있으면 원문 재다운로드·파싱 생략, 거의 같은 기사면 여기서 멈춤"""
+    rec = checkpoint.load(url)
+    if checkpoint.reached(rec, "parsed"):
+        logging.debug("  ⏩ 파싱 결과 재사용: %s", url)
+        art = rec["data"]["art"]
+    else:
+        art = parse(url)
+        if art is None:
+            return None
+    dup = dedupe.claim(url, art.get("fingerprint"))
+    if dup:
+        on_duplicate(url, art, dup, rec)
+        return None
+    if not checkpoint.reached(rec, "parsed"):
+        checkpoint.save(url, "parsed", art={k: art.get(k) for k in ART_FIELDS})
+    return art
+
+
+def compose_step(art: dict):
+    """rewritten 체크포인트가 있으면 GPT 호출 없이 저장된 결과 사용"""
+    url = norm(art["url"])
+    rec = checkpoint.load(url)
+    if checkpoint.reached(rec, "rewritten"):
+        logging.debug("  ⏩ GPT 결과 재사용: %s", url)
+        return {"art": art, **rec["data"]["composed"]}
+    done = compose(art)
+    if done is None:
+        checkpoint.fail(url, "rewrite", "GPT 단계 실패")
+        return None
+    checkpoint.save(url, "rewritten",
+                    composed={k: done[k] for k in ("title", "body", "meta", "tags")})
+    return done
+
+
+def media_step(art: dict):
+    url = norm(art["url"])
+    rec = checkpoint.load(url)
+    if rec and "media" in rec["data"]:
+        return rec["data"]["media"]
+    m = media.ingest(art)
+    if m:
+        checkpoint.attach(url, media=m)
+    return m
+
+
+def resume_meta(urls: list[str] = None) -> int:
+    """게시는 됐지만 Yoast 메타가 안 끝난 글만 메타 단계 재시도. 반환: 성공 수"""
+    if urls is None:
+        urls = [u for u, stage in checkpoint.pending() if stage == "posted"]
+    ok = 0
+    for url in urls:
+        rec = checkpoint.load(url)
+        if rec and rec["stage"] == "posted" and not rec["post_id"]:
+            # 예전에 id 없이 posted로 저장된 기록 → 누가 만든 글인지 알 수 없으니 메타는 덮어쓰지 않고 done
+            post_id = wp_post_id(url)
+            if post_id:
+                logging.info("✔ 게시자를 알 수 없는 글 → 메타 재시도 없이 완료 처리: %s (post %d)", url, post_id)
+                checkpoint.save(url, "done", post_id=post_id)
+            continue
+        if not (rec and rec["stage"] == "posted" and rec["post_id"]):
+            continue
+        art  = rec["data"].get("art")
+        meta = (rec["data"].get("composed") or {}).get("meta") or None
+        if art is None and meta is None:
+            logging.warning("메타 재시도 불가(원문·메타 없음): %s", url)
+            continue
+        logging.info("↻ 메타만 재시도: %s (post %d)", url, rec["post_id"])
+        ok += finish_meta(art or {"url": url}, rec["post_id"], meta, rec["data"].get("tag_ids"))
+    return ok
+
+
+def resumable() -> list[str]:
+    """
+    게시 전 단계에서 멈춘 기사. 이미 WP에 있으면 다시 게시하지 않음:
+    이 워커가 메타 없이 게시하다 죽은 경우만 posted(메타 재시도), 그 밖(메타 포함 게시·다른 워커가 게시)은 done.
+    다른 워커의 글에 이 워커의 GPT 메타(slug·제목·태그)를 덮어쓰면 게시된 URL이 깨짐
+    """
+    out = []
+    for url, stage in checkpoint.pending():
+        if stage == "posted":
+            continue
+        post_id = wp_post_id(url)
+        if post_id:
+            rec  = checkpoint.load(url)
+            mine = (rec or {}).get("data", {}).get("publishing")
+            if mine is not None and not mine["meta"]:
+                checkpoint.save(url, "posted", post_id=post_id)
+            else:
+                logging.info("✔ 이미 게시된 글 → 완료 처리: %s (post %d)", url, post_id)
+                checkpoint.save(url, "done", post_id=post_id)
             continue
+        out.append(url)
+    return out
+
+
+# ─── 한 번 실행 ──────────
+SHUTDOWN = threading.Event()    # SIGTERM·SIGINT → 새 기사는 그만, 진행 중인 것만 마무리
 
-        # ─── 태그 추출 & 게시 ────────────────────────────
-        tag_ids = [tid for n in tag_names(txt) if (tid := tag_id(n))]
+
+def run_once(seen, urls: list[str] = None) -> int:
+    """
+    목록 확인 → 새 기사 처리·게시 (중단됐던 기사는 마지막 완료 단계 다음부터).
+    urls를 주면 목록 확인 없이 그 기사들만. 반환: 이번에 찾은 새 기사 수
+    """
+    checkpoint.prune()
+    dedupe.prune()
+    leases.prune()
+    dedupe.begin_run()
+    resume_meta()
+    if urls is None:
+        links = fetch_links(seen)
+        todo  = [u for u in links if norm(u) not in seen and not wp_exists(norm(u))
+                 and not dedupe.known_duplicate(norm(u))]
+        logging.info("📰 새 기사 %d / 총 %d", len(todo), len(links))
+        found = len(todo)
+        todo  = [u for u in todo if not checkpoint.gave_up(u)]
+        if len(todo) < found:
+            logging.info("⛔ 재시도 상한을 넘긴 기사 %d건 건너뜀 (--retry 로 재시도)", found - len(todo))
+        again = [u for u in resumable() if u not in todo]
+        if again:
+            logging.info("⏯️ 중단됐던 기사 %d건 이어서 처리", len(again))
+        todo += again
+    else:
+        todo, found = [norm(u) for u in urls], 0
+    # 다른 워커(호스트)와 같은 기사를 잡지 않도록 처리 전에 URL별 임대 (_process가 LEASE_BATCH건씩)
+    try:
+        taken = _process(seen, todo)
+    finally:
+        leases.release()
+    if taken < len(todo) and not SHUTDOWN.is_set():
+        logging.info("🔒 다른 워커가 처리 중·완료한 기사 %d건 건너뜀", len(todo) - taken)
+    return found
+
+
+def _process(seen, todo: list[str]) -> int:
+    """
+    todo 앞에서부터 LEASE_BATCH건씩 임대를 잡아 파싱·GPT·게시 → 잡은 기사 수.
+    한 번에 다 잡지 않아 동시에 시작한 워커들이 목록을 나눠 갖고, 풀은 실행 내내 그대로 둔 채
+    처리 중인 기사가 BATCH건 이하로 줄면 다음 묶음을 미리 잡아 GPT·업로드가 쉬지 않게 함
+    """
+    # 파싱·GPT는 병렬, 이미지 업로드는 GPT와 동시에, 게시는 잡은 순서대로 한 건씩
+    rest, taken, jobs = todo, 0, deque()
+    with ThreadPoolExecutor(PARSE_WORKERS, thread_name_prefix="parse") as parse_pool, \
+         ThreadPoolExecutor(GPT_WORKERS, thread_name_prefix="gpt") as gpt_pool, \
+         ThreadPoolExecutor(max(1, MEDIA_WORKERS), thread_name_prefix="media") as media_pool:
+
+        def feed():
+            nonlocal rest, taken
+            mine = leases.claim(rest, leases.BATCH)
+            # BATCH건을 다 못 채웠으면 목록 끝까지 본 것 → 남은 건 다른 워커 몫
+            rest = rest[rest.index(mine[-1]) + 1:] if len(mine) == leases.BATCH else []
+            taken += len(mine)
+            for url in mine:
+                parsed = parse_pool.submit(parse_step, url)
+                images = _chain(parsed, media_pool, media_step) if MEDIA_WORKERS else None
+                jobs.append((url, _chain(parsed, gpt_pool, compose_step), images))
+
+        feed()
+        draining = False
+        while jobs:
+            if SHUTDOWN.is_set() and not draining:
+                # 아직 시작 안 한 작업은 취소, 이미 돈 들인(실행 중·완료) 기사는 끝까지 게시
+                draining = True
+                logging.info("🛑 종료 요청: 진행 중인 기사만 마무리")
+                for pool in (parse_pool, gpt_pool, media_pool):
+                    pool.shutdown(wait=False, cancel_futures=True)
+            if rest and not draining and len(jobs) <= leases.BATCH:
+                feed()
+            url, job, images = jobs.popleft()
+            _publish_job(seen, url, job, images)
+            leases.release([url])         # 게시 못 한 기사는 바로 다른 워커가 잡을 수 있게
+    return taken
+
+
+def _publish_job(seen, url: str, job: Future, images: Future | None):
+    """파싱·GPT가 끝난 기사 하나: 태그 → 임대 확인 → 이미지 → 게시"""
+    logging.info("▶ %s", url)
+    try:
+        done = job.result()
+    except CancelledError:
+        logging.debug("  ⏹️ 종료로 건너뜀")
+        return
+    except Exception as e:
+        logging.warning("처리 실패(%s): %s", url, e)
+        return
+    if not done:
+        logging.debug("  🔴 parse/GPT 단계에서 제외")
+        return
+    art = done["art"]
+    logging.debug("  🟢 parse OK | 제목: %s | img: %s", art["title"], art["image"])
+
+    # ─── 태그 추출 & 게시 ────────────────────────────
+    rec = checkpoint.load(url)
+    if checkpoint.reached(rec, "tagged"):
+        tag_ids = rec["data"]["tag_ids"]
+    else:
+        # 본문 태그 + 메타 태그의 새 이름을 batch/v1 한 번으로
+        meta_tags = tag_pairs((done["meta"] or {}).get("tags", []))
+        with metrics.span("tags", url=url):
+            tag_ids = tag_cache.resolve_all([(n, None) for n in done["tags"]] + meta_tags)
+        checkpoint.save(url, "tagged", tag_ids=tag_ids)
+    if not leases.holds(url):
+        # 이제 다른 워커가 맡은 기사 → 이 워커의 체크포인트는 지워 재시작 때 이어서 처리하지 않게
+        logging.warning("🔓 임대가 다른 워커로 넘어가 게시 안 함: %s", url)
+        checkpoint.drop(url)
+        return
+    image = None
+    if images:
+        try:
+            image = images.result()
+        except (CancelledError, Exception) as e:
+            logging.warning("이미지 단계 실패(원본 링크 유지): %r", e)
+    try:
+        post_id = publish(art, done["title"], done["body"], tag_ids,
+                          meta=done["meta"] or None, media=image)
+        logging.debug("  🟢 publish OK")                        # <<<
+        seen.add(norm(url), post_id=post_id)
+    except Exception as e:
+        logging.warning("업로드 실패: %s", e)
+        if not checkpoint.reached(checkpoint.load(url), "posted"):
+            checkpoint.fail(url, "publish", e)
+
+
+# ─── 데몬 모드 ──────────
+def _on_signal(signum, frame):
+    if SHUTDOWN.is_set():
+        logging.warning("⚠️ 두 번째 종료 신호 → 즉시 종료 (진행 중인 기사는 버림, 임대는 만료 후 회수)")
+        # sys.exit는 풀 스레드 join을 기다리므로 os._exit. 메인 스레드가 잠금을 쥔 채 끊겼을 수 있어
+        # 계측·로그 flush는 별도 스레드에서 최대 2초만
+        def flush():
+            metrics.flush()
+            for h in logging.getLogger().handlers:
+                h.flush()
+        t = threading.Thread(target=flush, daemon=True)
+        t.start()
+        t.join(2)
+        os._exit(1)
+    logging.info("🛑 종료 신호(%s) 수신", signal.Signals(signum).name)
+    SHUTDOWN.set()
+
+
+def next_interval(current: float, found: int) -> float:
+    """새 기사가 있으면 간격 절반(최소 POLL_MIN), 없으면 1.5배(최대 POLL_MAX)"""
+    nxt = current / 2 if found else current * 1.5
+    return min(POLL_MAX, max(POLL_MIN, nxt))
+
+
+def daemon():
+    """상태(HTTP 세션·태그 캐시·인덱스)를 메모리에 둔 채 적응형 간격으로 반복 실행"""
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+
+    seen = sync_seen(load_seen())
+    synced, interval = time.monotonic(), POLL_START
+    logging.info("🔁 데몬 시작 (간격 %.0f–%.0fs)", POLL_MIN, POLL_MAX)
+    while not SHUTDOWN.is_set():
+        if time.monotonic() - synced > SYNC_EVERY:
+            seen, synced = sync_seen(seen), time.monotonic()
         try:
-            publish(art, txt, tag_ids)
-            logging.debug("  🟢 publish OK")                        # <<<
-            seen.add(norm(url))
-            save_seen(seen)
+            found = run_once(seen)
         except Exception as e:
-            logging.warning("업로드 실패: %s", e)
+            logging.exception("실행 중 오류: %s", e)
+            found = 0
+        metrics.flush()
+        interval = next_interval(interval, found)
+        wait = interval * random.uniform(0.9, 1.1)
+        logging.info("💤 %.0fs 후 다시 확인", wait)
+        SHUTDOWN.wait(wait)
+    http_client.close()
+    logging.info("👋 데몬 종료")
+
+
+def retry(step: str = None):
+    """실패 기록이 있는 기사의 시도 횟수를 초기화하고 해당 단계부터 다시"""
+    rows = checkpoint.pending(failed=step, limit_attempts=False)
+    failed = [u for u, _ in rows if (checkpoint.load(u) or {}).get("failed")]
+    if not failed:
+        logging.info("재시도할 실패 기사 없음%s", f" ({step})" if step else "")
+        return
+    checkpoint.reset_attempts(failed)
+    meta_only = [u for u, stage in rows if u in failed and stage == "posted"]
+    logging.info("↻ 재시도 %d건 (메타만 %d건)", len(failed), len(meta_only))
+    resume_meta(meta_only)
+    rest = [u for u in failed if u not in meta_only]
+    if rest:
+        wp_index().refresh()
+        run_once(load_seen(), urls=rest)
+    metrics.flush()
 
-        time.sleep(1.5)
+
+def main():
+    logging.basicConfig(
+        level=logging.DEBUG,                  # <<< DEBUG 로 변경
+        stream=sys.stdout,
+        format="%(asctime)s │ %(levelname)s │ %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+    args = sys.argv[1:]
+    if "--daemon" in args:
+        return daemon()
+    if "--status" in args:
+        for k, n in sorted(checkpoint.summary().items()):
+            print(f"{k:<28} {n:>5}")
+        return
+    if "--retry" in args:
+        # --retry [meta|rewrite|publish]  실패한 단계만 다시 (생략 시 실패한 것 전부)
+        i = args.index("--retry")
+        step = args[i + 1] if i + 1 < len(args) and not args[i + 1].startswith("-") else None
+        return retry(step)
+
+    seen = sync_seen(load_seen())
+    run_once(seen)
+    metrics.flush()
 
 if __name__ == "__main__":
     main()
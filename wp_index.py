@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WordPress 원문 URL 인덱스
+• /wp/v2/posts 를 100개 단위 페이지로 일괄 조회 → 숨김 src 앵커에서 원문 URL 추출
+• modified_after 워터마크로 증분 갱신 (실행당 HTTP 호출 몇 번으로 끝)
+• 일정 주기마다 전체 재구축 → 삭제·휴지통 글 반영
+• 인덱스는 state_store(SQLite)의 wp_posts 테이블에 보관
+"""
+
+import os
+import re
+import html
+import time
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, urlunparse
+import requests
+import http_client
+import state_store
+
+# ────────── 환경 변수 ──────────
+WP_URL     = os.getenv("WP_URL", "https://belatri.info").rstrip("/")
+USER       = os.getenv("WP_USERNAME")
+APP_PW     = os.getenv("WP_APP_PASSWORD")
+POSTS_API  = f"{WP_URL}/wp-json/wp/v2/posts"
+FULL_EVERY = float(os.getenv("WP_INDEX_FULL_HOURS", "24")) * 3600   # 전체 재구축 주기(초)
+PER_PAGE   = 100
+
+# publish()가 본문 맨 앞에 넣는 <a href="원문" style="display:none">src</a>
+_SRC_RE = re.compile(r'<a\s[^>]*href="([^"]+)"[^>]*>\s*src\s*</a>', re.I)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wp_posts (
+    url     TEXT PRIMARY KEY,
+    post_id INTEGER NOT NULL
+);
+"""
+
+_norm = lambda u: urlunparse(urlparse(u)._replace(query="", params="", fragment=""))
+
+
+class SourceIndex:
+    """원문 URL → WP post id 로컬 인덱스"""
+
+    def __init__(self, on_posts=None):
+        self.urls      = {}       # 정규화 URL → post id
+        self.on_posts  = on_posts # 갱신 때 받은 글 목록을 넘겨받을 콜백 (관련 기사 인덱스 등)
+        self.watermark = None     # 마지막으로 본 글의 modified (사이트 현지시각 ISO8601)
+        self.built_at  = 0.0      # 마지막 전체 재구축 시각(epoch)
+        self.ok        = False    # 이번 실행에서 갱신 성공 여부
+        self._load()
+
+    # ── 저장소 입출력 ──────────
+    def _load(self):
+        state_store.ensure_schema(_SCHEMA)
+        rows = state_store.conn().execute("SELECT url, post_id FROM wp_posts")
+        self.urls      = dict(rows.fetchall())
+        self.watermark = state_store.get_meta("wp_index.watermark")
+        self.built_at  = state_store.get_meta("wp_index.built_at", 0.0)
+
+    def _store(self, full: bool, changed: dict):
+        with state_store.tx() as c:
+            if full:
+                c.execute("DELETE FROM wp_posts")
+            c.executemany(
+                "INSERT INTO wp_posts(url, post_id) VALUES(?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET post_id=excluded.post_id",
+                list(changed.items()))
+            state_store.set_meta("wp_index.watermark", self.watermark, c)
+            state_store.set_meta("wp_index.built_at", self.built_at, c)
+
+    # ── 조회 ──────────
+    def __contains__(self, url: str) -> bool:
+        return _norm(url) in self.urls
+
+    def __len__(self):
+        return len(self.urls)
+
+    def get(self, url: str) -> int | None:
+        return self.urls.get(_norm(url))
+
+    def add(self, url: str, post_id: int):
+        """방금 게시한 글을 즉시 반영 (다음 갱신 전까지의 공백 방지)"""
+        self.urls[_norm(url)] = post_id
+        state_store.conn().execute(
+            "INSERT OR REPLACE INTO wp_posts(url, post_id) VALUES(?, ?)",
+            (_norm(url), post_id))
+
+    # ── 갱신 ──────────
+    def refresh(self, force_full: bool = False) -> bool:
+        """워터마크 이후 수정된 글만 페이지 단위로 읽어 인덱스 갱신"""
+        full = force_full or not self.watermark or time.time() - self.built_at > FULL_EVERY
+        params = {
+            "per_page": PER_PAGE,
+            "orderby":  "modified",
+            "order":    "asc",
+            "_fields":  "id,modified,content" + (",link,title,tags" if self.on_posts else ""),
+        }
+        if not full:
+            # 같은 초에 수정된 글을 놓치지 않도록 1초 겹쳐 읽기
+            since = datetime.fromisoformat(self.watermark) - timedelta(seconds=1)
+            params["modified_after"] = since.isoformat()
+
+        changed, watermark, calls, posts = {}, self.watermark, 0, []
+        page = 1
+        try:
+            while True:
+                r = http_client.get(POSTS_API, params={**params, "page": page},
+                                 auth=(USER, APP_PW), timeout=30)
+                calls += 1
+                # 마지막 페이지 너머 → rest_post_invalid_page_number
+                if r.status_code == 400 and page > 1:
+                    break
+                r.raise_for_status()
+                for post in r.json():
+                    rendered = (post.get("content") or {}).get("rendered", "")
+                    if self.on_posts:
+                        posts.append({"id": post["id"], "link": post.get("link"),
+                                      "title": html.unescape((post.get("title") or {}).get("rendered", "")),
+                                      "tags": post.get("tags"), "text": rendered})
+                    m = _SRC_RE.search(rendered)
+                    if m:
+                        changed[_norm(html.unescape(m.group(1)))] = post["id"]
+                    if post.get("modified") and (not watermark or post["modified"] > watermark):
+                        watermark = post["modified"]
+                if page >= int(r.headers.get("X-WP-TotalPages", 1)):
+                    break
+                page += 1
+        except (requests.RequestException, ValueError) as e:
+            logging.warning("WP 인덱스 갱신 실패(%s): %s", "전체" if full else "증분", e)
+            self.ok = False
+            return False
+
+        self.urls = changed if full else {**self.urls, **changed}
+        self.watermark = watermark
+        if full:
+            self.built_at = time.time()
+        self._store(full, changed)
+        if self.on_posts:
+            self.on_posts(posts, full=full)
+        self.ok = True
+        logging.info("🗂️ WP 인덱스 %s 갱신: %d건 (HTTP %d회)",
+                     "전체" if full else "증분", len(self.urls), calls)
+        return True
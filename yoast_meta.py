@@ -3,7 +3,8 @@
 """
 Yoast SEO 메타데이터 자동화 모듈
 • GPT 호출 → 초점 키프레이즈·SEO 제목·슬러그·메타 설명 JSON 생성 (재시도 로직 포함)
-• WordPress REST PATCH로 _yoast_wpseo_* 필드 + title, tags 업로드
+• 게시 요청에 바로 넣을 slug·title·_yoast_wpseo_* 필드 (post_fields)
+• 이미 게시된 글은 WordPress REST PATCH로 _yoast_wpseo_* 필드 + title, tags 업로드 (메타 재시도용)
 """
 
 import time
@@ -11,9 +12,12 @@ import os
 import re
 import json
 import logging
-import requests
+import http_client
+import gpt
+import tag_cache
+import metrics
 from slugify import slugify
-from bs4 import BeautifulSoup
+import html_doc
 
 # ────────── 환경 변수 ──────────
 WP_URL    = os.getenv("WP_URL", "https://belatri.info").rstrip("/")
@@ -75,10 +79,6 @@ def extract_json(raw: str) -> dict:
 
 # ────────── GPT 호출 헬퍼 (재시도 3회) ──────────
 def _gpt(prompt: str) -> dict:
-    headers = {
-        "Authorization": f"Bearer {OPENKEY}",
-        "Content-Type":  "application/json",
-    }
     last_err = None
 
     for attempt in range(3):
@@ -93,19 +93,13 @@ def _gpt(prompt: str) -> dict:
                 "content": "응답을 순수 JSON 구조로만 다시 보내주세요."
             })
 
-        resp = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json={
-                "model":       "gpt-4o",
-                "messages":    messages,
-                "temperature": 0.4,
-                "max_tokens":  400,
-            },
-            timeout=60
-        )
-        resp.raise_for_status()
-        content = resp.json()["choices"][0]["message"]["content"]
+        data = {
+            "model":       "gpt-4o",
+            "messages":    messages,
+            "temperature": 0.4,
+            "max_tokens":  400,
+        }
+        content = gpt.content(gpt.chat(data, timeout=60))
         # 1) 우선 순수 JSON 직접 파싱
         try:
             return json.loads(content)
@@ -117,15 +111,16 @@ def _gpt(prompt: str) -> dict:
             except Exception as e:
                 last_err = e
                 logging.warning(f"content 기반 JSON 추출 실패(시도 {attempt+1}): {e}")
-                time.sleep(1)
+                gpt.forget(data)    # 깨진 응답은 캐시에 남기지 않음 (속도 조절은 gpt.chat 쪽 limiter 몫)
                 continue
 
     raise RuntimeError(f"GPT JSON 파싱 재시도 실패: {last_err}")
 
 # ────────── 메타 JSON 생성 ──────────
+@metrics.traced("generate_meta")
 def generate_meta(article: dict) -> dict:
-    text    = BeautifulSoup(article["html"], "html.parser").get_text(" ", strip=True)
-    snippet = re.sub(r"\s+", " ", text)[:600]
+    # parse()에서 이미 뽑아 둔 평문 재사용 (일반 dict면 여기서 추출)
+    snippet = html_doc.article_text(article)[:600]
 
     prompt = (
         MASTER_PROMPT
@@ -134,7 +129,11 @@ def generate_meta(article: dict) -> dict:
     )
     meta = _gpt(prompt)
     logging.debug(f"▶ Generated meta: {meta}")
+    return normalize_meta(meta)
 
+
+def normalize_meta(meta: dict) -> dict:
+    """GPT가 만든 메타 JSON의 슬러그·설명 길이 보정 (구조화 모드와 공용)"""
     # 슬러그 보정 (ASCII 슬러그)
     meta['slug'] = slugify(
         meta.get('slug', ''),
@@ -149,49 +148,44 @@ def generate_meta(article: dict) -> dict:
     return meta
 
 # ────────── WP 태그 동기화 ──────────
-def sync_tags(names: list[str]) -> list[int]:
-    clean_names = []
+def tag_pairs(names: list[str]) -> list[tuple[str, str]]:
+    """메타 태그 이름 → (정리된 이름, 영문 slug) — tag_cache.resolve_all 입력"""
+    out = []
     for n in names:
         c = re.sub(r"<[^>]+>", "", n).strip()
         if c:
-            clean_names.append(c)
-
-    resp = requests.get(TAGS_API, params={"per_page":100})
-    resp.raise_for_status()
-    existing = {t["name"]: t["id"] for t in resp.json()}
-
-    ids = []
-    for name in clean_names:
-        if name in existing:
-            ids.append(existing[name])
-        else:
-            payload = {"name": name, "slug": slugify(name, lowercase=True, allow_unicode=False)}
-            try:
-                r = requests.post(TAGS_API, auth=(USER, APP_PW), json=payload)
-                r.raise_for_status()
-                ids.append(r.json()["id"])
-            except requests.exceptions.HTTPError as e:
-                logging.warning(f"태그 생성 실패 '{name}': {e}. 기존 태그 재조회합니다.")
-                r2 = requests.get(TAGS_API, params={"search": name})
-                if r2.ok and r2.json():
-                    ids.append(r2.json()[0]["id"])
-                else:
-                    logging.error(f"태그 '{name}' 검색에도 실패했습니다.")
-    return ids
+            out.append((c, slugify(c, lowercase=True, allow_unicode=False)))
+    return out
 
-# ────────── WP 메타 + title, tags PATCH ──────────
-def push_meta(post_id: int, meta: dict):
-    payload = {
-        "slug":  meta["slug"],
-        "title": meta.get("title", ""),
-        "tags":  sync_tags(meta.get("tags", [])),
+
+def sync_tags(names: list[str]) -> list[int]:
+    # 전체 태그를 미리 읽어 둔 공용 캐시 → 새 이름만 POST(여럿이면 batch/v1)
+    return tag_cache.resolve_all(tag_pairs(names))
+
+# ────────── 게시 요청용 필드 ──────────
+def post_fields(meta: dict) -> dict:
+    """slug · title(있으면) · Yoast meta → /wp/v2/posts 생성·수정 payload 일부"""
+    out = {
+        "slug": meta["slug"],
         "meta": {
             "_yoast_wpseo_focuskw":  meta.get("focus_keyphrase", ""),
             "_yoast_wpseo_title":    meta.get("seo_title", ""),
             "_yoast_wpseo_metadesc": meta.get("meta_description", ""),
         }
     }
-    r = requests.post(
+    if meta.get("title"):
+        out["title"] = meta["title"]
+    return out
+
+# ────────── WP 메타 + title, tags PATCH ──────────
+@metrics.traced("push_meta")
+def push_meta(post_id: int, meta: dict, tag_ids: list[int] = None):
+    """게시 후 메타만 따로 적용 (tag_ids: 기존 본문 태그 → 메타 태그와 합침)"""
+    payload = {
+        **post_fields(meta),
+        "tags": list(dict.fromkeys((tag_ids or []) + sync_tags(meta.get("tags", [])))),
+    }
+    r = http_client.post(
         f"{POSTS_API}/{post_id}",
         json=payload,
         auth=(USER, APP_PW),